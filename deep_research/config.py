@@ -8,8 +8,10 @@ import sys
 import warnings
 import time
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from types import MappingProxyType
+from typing import Optional, Dict, Mapping
 
 from .settings_manager import settings
 from .constants import DEFAULT_DOCX_STYLES, MODEL_FALLBACKS
@@ -276,6 +278,8 @@ EXCLUDED_DOMAINS = settings.get_nested("search", "excluded_domains") or []
 MAX_RESULTS_PER_QUERY = settings.get_nested("search", "max_results_per_query", default=5)
 MAX_SEARCH_QUERIES = settings.get_nested("search", "max_search_queries", default=5)
 SMART_SEARCH_ENABLED = settings.is_true("smart_search_enabled")
+# Tareas de búsqueda simultáneas en searcher_node (override: env SEARCHER_CONCURRENCY)
+SEARCHER_CONCURRENCY = int(settings.get_env("SEARCHER_CONCURRENCY") or settings.get_nested("search", "searcher_concurrency", default=8))
 
 # ==========================================
 # CONTEXT & EVALUATOR
@@ -301,6 +305,10 @@ FIRECRAWL_MAX_CHARS_PER_SOURCE = settings.get_nested("firecrawl", "max_chars_per
 FIRECRAWL_TIMEOUT_SECONDS = settings.get_nested("firecrawl", "timeout_seconds", default=30)
 FIRECRAWL_MAX_CALLS_PER_ITEM = settings.get_nested("firecrawl", "max_calls_per_item", default=7)
 FIRECRAWL_MIN_EXISTING_CONTENT_CHARS = settings.get_nested("firecrawl", "min_existing_content_chars", default=3000)
+# Scrapes simultáneos en firecrawl_node (override: env FIRECRAWL_CONCURRENCY)
+FIRECRAWL_CONCURRENCY = int(settings.get_env("FIRECRAWL_CONCURRENCY") or settings.get_nested("firecrawl", "concurrency", default=3))
+# Peticiones por minuto a Firecrawl (token bucket en el cliente; 0 = sin límite; override: env FIRECRAWL_RPM)
+FIRECRAWL_REQUESTS_PER_MINUTE = int(settings.get_env("FIRECRAWL_RPM") or settings.get_nested("firecrawl", "requests_per_minute", default=0))
 
 # ==========================================
 # TOKEN LIMITS LOGIC
@@ -312,11 +320,32 @@ EVAL_ELITE_FAST_TRACK_ENABLED = settings.is_true("elite_fast_track_enabled", "ev
 EVAL_GRAY_ZONE_ENABLED = settings.is_true("gray_zone_enabled", "evaluator")
 EVAL_GRAY_ZONE_LOW_REJECT = settings.get_nested("evaluator", "gray_zone_low_reject", default=5.5)
 EVAL_GRAY_ZONE_HIGH_ACCEPT = settings.get_nested("evaluator", "gray_zone_high_accept", default=7.5)
+# Reranker local (cross-encoder) para decidir la zona gris sin LLM; vacío = desactivado
+EVAL_GRAY_ZONE_RERANKER_MODEL = settings.get_nested("evaluator", "gray_zone_reranker_model", default="")
+EVAL_GRAY_ZONE_RERANKER_ACCEPT = settings.get_nested("evaluator", "gray_zone_reranker_accept", default=0.7)
+EVAL_GRAY_ZONE_RERANKER_REJECT = settings.get_nested("evaluator", "gray_zone_reranker_reject", default=0.3)
 EVAL_CONSULTING_MIN_RELEVANCE = settings.get_nested("evaluator", "consulting_min_relevance", default=7.0)
 EVAL_INSTITUTIONAL_MIN_RELEVANCE = settings.get_nested("evaluator", "institutional_min_relevance", default=5.5)
 EVAL_GENERAL_MEDIA_MIN_RELEVANCE = settings.get_nested("evaluator", "general_media_min_relevance", default=8.5)
 EVAL_GENERAL_MEDIA_MAX_RATIO = settings.get_nested("evaluator", "general_media_max_ratio", default=0.1)
 EVAL_CONSULTING_MAX_RATIO = settings.get_nested("evaluator", "consulting_max_ratio", default=0.3)
+EVAL_MIMO_BATCH_SIZE = settings.get_nested("evaluator", "mimo_batch_size", default=8)
+# Evaluación por niveles: primero las max_accepted_sources × factor fuentes mejor pre-rankeadas
+# (tier de dominio, longitud de snippet); el resto solo si no se llega a min_accepted_sources (0 = off)
+EVAL_TIERED_FACTOR = int(settings.get_nested("evaluator", "tiered_evaluation_factor", default=0))
+# Máximo de llamadas LLM simultáneas del evaluador (MiMo + Judge); env EVAL_CONCURRENCY tiene prioridad
+EVAL_CONCURRENCY = int(settings.get_env("EVAL_CONCURRENCY") or settings.get_nested("evaluator", "concurrency", default=8))
+# Peticiones por minuto del evaluador (MiMo + Judge; 0 = sin límite); env EVAL_RPM tiene prioridad
+EVAL_REQUESTS_PER_MINUTE = int(settings.get_env("EVAL_RPM") or settings.get_nested("evaluator", "requests_per_minute", default=0))
+# Presupuesto de tokens por minuto del evaluador (token bucket; 0 = sin límite)
+EVAL_TOKENS_PER_MINUTE = int(settings.get_nested("evaluator", "tokens_per_minute", default=0))
+# Acuerdos MiMo/Judge seguidos en un dominio para dejar de escalar sus casos dudosos (0 = siempre escalar)
+EVAL_MIMO_TRUST_STREAK = int(settings.get_nested("evaluator", "mimo_trust_streak", default=5))
+# Streaming de MiMo/Judge: se corta la generación en cuanto llega un JSON completo
+EVAL_STREAM_LLM = settings.get_nested("evaluator", "stream_llm", default=True)
+# Structured output (response_format json_schema) para MiMo/Judge en clientes OpenAI-compatibles
+EVAL_STRUCTURED_OUTPUT = settings.get_nested("evaluator", "structured_output", default=True)
+EVAL_LOG_LEVEL = (settings.get_env("EVAL_LOG_LEVEL") or settings.get_nested("evaluator", "log_level", default="INFO")).upper()
 
 AUTHENTICITY_THRESHOLD = settings.get_nested("evaluator", "authenticity_threshold", default=6)
 RELIABILITY_THRESHOLD = settings.get_nested("evaluator", "reliability_threshold", default=6)
@@ -334,31 +363,56 @@ QUERY_EXPANSION_ENABLED = settings.get_nested("optimizations", "query_expansion_
 URL_VALIDATION_ENABLED = settings.get_nested("optimizations", "url_validation_enabled", default=True)
 CONTEXT_QUERY_VARIANTS_ENABLED = settings.get_nested("optimizations", "context_query_variants_enabled", default=True)
 EXTRACTOR_ENABLED = settings.get_nested("optimizations", "extractor_enabled", default=True)
+EXTRACTOR_BATCH_SIZE = settings.get_nested("optimizations", "extractor_batch_size", default=8)
+EXTRACTOR_BATCH_WAIT_MS = settings.get_nested("optimizations", "extractor_batch_wait_ms", default=50)
+# Límites del proveedor para el extractor (env LLM_RPM / LLM_CONCURRENCY tienen prioridad; RPM 0 = sin límite)
+EXTRACTOR_RPM = int(settings.get_env("LLM_RPM") or settings.get_nested("optimizations", "extractor_rpm", default=120))
+EXTRACTOR_CONCURRENCY = int(settings.get_env("LLM_CONCURRENCY") or settings.get_nested("optimizations", "extractor_concurrency", default=3))
+# Streaming del extractor con corte al recibir el JSON completo (sin pagar texto posterior)
+EXTRACTOR_STREAM_LLM = settings.get_nested("optimizations", "extractor_stream_llm", default=True)
+# response_format json_schema en el extractor (fallback a JSON por prompt si el modelo no lo soporta)
+EXTRACTOR_STRUCTURED_OUTPUT = settings.get_nested("optimizations", "extractor_structured_output", default=True)
+# Tope de tokens de salida por fuente del extractor (se fija con temperature=0 al crear el batcher)
+EXTRACTOR_MAX_TOKENS = int(settings.get_nested("optimizations", "extractor_max_tokens", default=2000))
+# Extraer evidencias de las fuentes validadas mientras se evalúan las demás (requiere cache ENABLED;
+# también extrae fuentes que el Quality Gate pueda recortar después)
+EXTRACTOR_OVERLAP_EVALUATION = settings.get_nested("optimizations", "extractor_overlap_evaluation", default=False)
+# Reutilizar estrategias del Planner con entradas idénticas (override: env PLAN_CACHE_ENABLED)
+PLAN_CACHE_ENABLED = str(settings.get_env("PLAN_CACHE_ENABLED") or settings.get_nested("optimizations", "plan_cache_enabled", default=True)).lower() in ("true", "1", "yes", "on")
+# Tope de caracteres de entrada del Planner: cola más reciente de las fuentes existentes y
+# comienzo del brief (0 = sin tope)
+PLANNER_EXISTING_SOURCES_MAX_CHARS = int(settings.get_env("PLANNER_EXISTING_SOURCES_MAX_CHARS") or settings.get_nested("optimizations", "planner_existing_sources_max_chars", default=20000))
+PLANNER_BRIEF_MAX_CHARS = int(settings.get_nested("optimizations", "planner_brief_max_chars", default=4000))
 
 # Dynamic Config Support
 CRITICAL_REPORT_TYPES = ["Strategy", "Financial", "Due_Diligence"]
 
-def get_dynamic_config(report_type: Optional[str] = None) -> Dict[str, int]:
-    """Obtains dynamic configurations based on report type."""
+@lru_cache(maxsize=16)
+def get_dynamic_config(report_type: Optional[str] = None) -> Mapping[str, int]:
+    """Obtains dynamic configurations based on report type.
+
+    Memoized per report_type (every node calls it on entry); the result is a
+    read-only mapping because the same object is shared by all callers.
+    """
     is_critical = report_type in CRITICAL_REPORT_TYPES if report_type else False
     if is_critical:
-        return {
+        return MappingProxyType({
             "max_retries": 3,
             "max_search_queries": 8,
             "max_results_per_query": 5,
             "max_firecrawl_calls": 7,
             "min_accepted_sources": 10,
             "max_accepted_sources": 15,
-        }
+        })
     else:
-        return {
+        return MappingProxyType({
             "max_retries": 2,
             "max_search_queries": 6,
             "max_results_per_query": 3,
             "max_firecrawl_calls": 5,
             "min_accepted_sources": 7,
             "max_accepted_sources": 10,
-        }
+        })
 
 # ==========================================
 # TOKEN LIMITS LOGIC
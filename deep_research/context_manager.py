@@ -733,6 +733,34 @@ def filter_results(
 
 
 
+def _rerank_terms(context: ProjectContext) -> List[Tuple[str, float, float]]:
+    """
+    Tabla única (término, peso en título, peso en snippet) de sector, geografía,
+    competidores y cliente; un término repetido en varias listas suma sus pesos.
+    """
+    weights: Dict[str, List[float]] = {}
+
+    def add(term: str, title_weight: float, snippet_weight: float):
+        w = weights.setdefault(term, [0.0, 0.0])
+        w[0] += title_weight
+        w[1] += snippet_weight
+
+    # Sector keywords (title > snippet)
+    for kw in context.sector_keywords or []:
+        add(str(kw).lower(), 3.0, 1.5)
+    # Geography hints
+    for g in context.geography or []:
+        if isinstance(g, str) and g:
+            add(g.lower(), 1.5, 0.75)
+    # Competitors
+    for comp in context.competitors or []:
+        add(str(comp).lower(), 4.0, 2.0)
+    # Client
+    if context.client_company:
+        add(context.client_company.lower(), 6.0, 3.0)
+    return [(term, w[0], w[1]) for term, w in weights.items()]
+
+
 def rerank_results(
     results: List[Dict],
     context: ProjectContext,
@@ -742,7 +770,10 @@ def rerank_results(
     if not context:
         return results
     
-    geo_terms = [g.lower() for g in (context.geography or []) if isinstance(g, str)]
+    # Términos y patrones se preparan una vez por llamada, no por resultado
+    terms = _rerank_terms(context)
+    # Penalización si coincide cualquier patrón de filtrado: una sola regex en alternancia
+    penalty_re = re.compile("|".join(f"(?:{pat.pattern})" for pat in context.filter_patterns), re.I) if context.filter_patterns else None
     
     for r in results:
         if not r:  # Skip None results
@@ -750,48 +781,11 @@ def rerank_results(
         title = (r.get('title', '') or '').lower()
         snippet = (r.get('snippet', '') or '').lower()
 
-        score = 0.0
-
-        # Sector keywords (title > snippet)
-        sector_keywords = context.sector_keywords or []
-        for kw in sector_keywords:
-            k = str(kw).lower()
-            if k in title:
-                score += 3.0
-            if k in snippet:
-                score += 1.5
-
-        # Geography hints
-        for g in geo_terms:
-            if g and g in title:
-                score += 1.5
-            if g and g in snippet:
-                score += 0.75
-
-        # Competitors
-        competitors = context.competitors or []
-        for comp in competitors:
-            c = str(comp).lower()
-            if c in title:
-                score += 4.0
-            if c in snippet:
-                score += 2.0
-
-        # Client
-        if context.client_company:
-            cc = context.client_company.lower()
-            if cc in title:
-                score += 6.0
-            if cc in snippet:
-                score += 3.0
+        score = float(sum(tw for term, tw, _ in terms if term in title) + sum(sw for term, _, sw in terms if term in snippet))
 
         # Penalty if matches filter patterns (soft, because filter already removed many)
-        if context.filter_patterns:
-            content = f"{title} {snippet}"
-            for pat in context.filter_patterns:
-                if pat.search(content):
-                    score -= 10.0
-                    break
+        if penalty_re is not None and penalty_re.search(f"{title} {snippet}"):
+            score -= 10.0
 
         r["_score"] = score
 
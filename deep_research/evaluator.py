@@ -6,152 +6,357 @@ Módulo Evaluator: Evalúa la calidad de las fuentes con optimizaciones.
 """
 import json
 import asyncio
+import atexit
+import contextvars
+import hashlib
+import logging
+import math
+import queue
 import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
+from itertools import chain
+from logging.handlers import QueueHandler, QueueListener
+from typing import Annotated, Any, Dict, Iterator, Optional, List, Tuple
+
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
 from .config import (
     llm_judge, llm_judge_cheap, llm_judge_premium, llm_planner, llm_mimo_cheap, 
     TOTAL_SCORE_THRESHOLD, RELEVANCE_THRESHOLD, 
     AUTHENTICITY_THRESHOLD, RELIABILITY_THRESHOLD, USE_CHEAP_OPENROUTER_MODELS,
     EVAL_ELITE_FAST_TRACK_ENABLED, EVAL_GRAY_ZONE_ENABLED,
     EVAL_GRAY_ZONE_LOW_REJECT, EVAL_GRAY_ZONE_HIGH_ACCEPT,
+    EVAL_GRAY_ZONE_RERANKER_MODEL, EVAL_GRAY_ZONE_RERANKER_ACCEPT, EVAL_GRAY_ZONE_RERANKER_REJECT,
     EVAL_CONSULTING_MIN_RELEVANCE, EVAL_INSTITUTIONAL_MIN_RELEVANCE,
     EVAL_GENERAL_MEDIA_MIN_RELEVANCE, EVAL_GENERAL_MEDIA_MAX_RATIO,
+    EVAL_MIMO_BATCH_SIZE, EVAL_CONCURRENCY, EVAL_REQUESTS_PER_MINUTE, EVAL_TOKENS_PER_MINUTE, EVAL_MIMO_TRUST_STREAK, EVAL_STREAM_LLM, EVAL_STRUCTURED_OUTPUT, EVAL_LOG_LEVEL,
     JUDGE_ESCALATE_SCORE_LOW, JUDGE_ESCALATE_SCORE_HIGH
 )
 from .source_quality import (
     get_elite_domain_scores,
+    CACHE_MODE,
+    CacheMissError,
+    CacheMode,
     get_cached_evaluation,
-    cache_evaluation,
+    get_cached_evaluations,
+    queue_cache_evaluation,
+    flush_cache_evaluations,
+    has_pending_cache_writes,
+    get_semantic_cached_evaluation,
+    cache_semantic_evaluation,
     calculate_confidence_score,
     format_confidence_badge
 )
+from .utils import AsyncTokenBucket, LoopLocal, canonicalize_url, is_response_format_rejection, json_loads, astream_json as _astream_json
+
+# ==========================================
+# LOGGING DIFERIDO
+# ==========================================
+# Los mensajes por fuente se formatean solo si el nivel está activo y se escriben
+# desde un hilo aparte (QueueListener), fuera del event loop de evaluación.
+# Los resúmenes (print_*) se emiten como un único registro INFO.
+_logger = logging.getLogger(__name__)
+
+
+def _setup_logger() -> None:
+    """Conecta el logger del módulo a stdout vía cola (idempotente)."""
+    if _logger.handlers:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    _logger.addHandler(QueueHandler(log_queue))
+    _logger.setLevel(getattr(logging, EVAL_LOG_LEVEL, logging.INFO))
+    _logger.propagate = False
+
+
+_setup_logger()
 
 # ==========================================
 # MÉTRICAS DE TRACKING: MiMo vs Gemini
 # ==========================================
-# Contadores globales para tracking de evaluaciones
-_mimo_judge_metrics = {
-    'mimo_accepted': 0,  # Fuentes aceptadas por MiMo
-    'mimo_accepted_then_judge_rejected': 0,  # MiMo aceptó pero Gemini rechazó
-    'mimo_accepted_then_judge_accepted': 0,  # MiMo aceptó y Gemini también aceptó
-    'mimo_rejected': 0,  # Fuentes rechazadas por MiMo (no van a Judge)
-    'judge_only_evaluations': 0,  # Fuentes que van directo a Judge (sin MiMo)
-}
+# Contadores globales para tracking de evaluaciones: un array('q') contiguo + un lock,
+# porque "+= 1" sobre un dict no es atómico si el batch corre desde varios hilos.
+_MIMO_JUDGE_METRIC_KEYS = (
+    'mimo_accepted',  # Fuentes aceptadas por MiMo
+    'mimo_accepted_then_judge_rejected',  # MiMo aceptó pero Gemini rechazó
+    'mimo_accepted_then_judge_accepted',  # MiMo aceptó y Gemini también aceptó
+    'mimo_rejected',  # Fuentes rechazadas por MiMo (no van a Judge)
+    'judge_only_evaluations',  # Fuentes que van directo a Judge (sin MiMo)
+)
+_MIMO_JUDGE_METRIC_IDX = {key: i for i, key in enumerate(_MIMO_JUDGE_METRIC_KEYS)}
+_mimo_judge_counters = array('q', [0] * len(_MIMO_JUDGE_METRIC_KEYS))
+_mimo_judge_lock = threading.Lock()
+
+
+def _incr_mimo_judge_metric(key: str) -> None:
+    """Incrementa un contador de métricas MiMo vs Gemini de forma segura entre hilos."""
+    idx = _MIMO_JUDGE_METRIC_IDX[key]
+    with _mimo_judge_lock:
+        _mimo_judge_counters[idx] += 1
 
 def get_mimo_judge_metrics() -> Dict[str, int]:
-    """Retorna las métricas actuales de MiMo vs Gemini."""
-    return _mimo_judge_metrics.copy()
+    """Retorna las métricas actuales de MiMo vs Gemini (snapshot consistente como dict)."""
+    with _mimo_judge_lock:
+        return dict(zip(_MIMO_JUDGE_METRIC_KEYS, _mimo_judge_counters))
 
 def reset_mimo_judge_metrics():
     """Resetea las métricas (útil para testing)."""
-    global _mimo_judge_metrics
-    _mimo_judge_metrics = {
-        'mimo_accepted': 0,
-        'mimo_accepted_then_judge_rejected': 0,
-        'mimo_accepted_then_judge_accepted': 0,
-        'mimo_rejected': 0,
-        'judge_only_evaluations': 0,
-    }
+    with _mimo_judge_lock:
+        for i in range(len(_mimo_judge_counters)):
+            _mimo_judge_counters[i] = 0
 
 def print_mimo_judge_metrics():
     """Imprime un resumen de las métricas MiMo vs Gemini."""
-    metrics = _mimo_judge_metrics
+    metrics = get_mimo_judge_metrics()
     total_mimo_evaluated = metrics['mimo_accepted'] + metrics['mimo_rejected']
     total_judge_evaluated = metrics['mimo_accepted_then_judge_rejected'] + metrics['mimo_accepted_then_judge_accepted'] + metrics['judge_only_evaluations']
     
-    print("\n" + "=" * 80)
-    print("📊 MÉTRICAS: MiMo vs Gemini Judge")
-    print("=" * 80)
+    lines = []
+    lines.append("\n" + "=" * 80)
+    lines.append("📊 MÉTRICAS: MiMo vs Gemini Judge")
+    lines.append("=" * 80)
     
     if total_mimo_evaluated > 0:
-        print(f"\n🔍 EVALUACIONES CON MIMO:")
-        print(f"   Total evaluadas por MiMo: {total_mimo_evaluated}")
-        print(f"   ✓ Aceptadas por MiMo: {metrics['mimo_accepted']} ({metrics['mimo_accepted']/total_mimo_evaluated*100:.1f}%)")
-        print(f"   ✗ Rechazadas por MiMo: {metrics['mimo_rejected']} ({metrics['mimo_rejected']/total_mimo_evaluated*100:.1f}%)")
+        lines.append(f"\n🔍 EVALUACIONES CON MIMO:")
+        lines.append(f"   Total evaluadas por MiMo: {total_mimo_evaluated}")
+        lines.append(f"   ✓ Aceptadas por MiMo: {metrics['mimo_accepted']} ({metrics['mimo_accepted']/total_mimo_evaluated*100:.1f}%)")
+        lines.append(f"   ✗ Rechazadas por MiMo: {metrics['mimo_rejected']} ({metrics['mimo_rejected']/total_mimo_evaluated*100:.1f}%)")
     
     if metrics['mimo_accepted'] > 0:
-        print(f"\n🎯 FUENTES ACEPTADAS POR MIMO QUE FUERON A GEMINI:")
-        print(f"   Total que escalaron a Gemini: {metrics['mimo_accepted_then_judge_rejected'] + metrics['mimo_accepted_then_judge_accepted']}")
-        print(f"   ✓ Aceptadas también por Gemini: {metrics['mimo_accepted_then_judge_accepted']}")
-        print(f"   ✗ Rechazadas por Gemini: {metrics['mimo_accepted_then_judge_rejected']}")
+        lines.append(f"\n🎯 FUENTES ACEPTADAS POR MIMO QUE FUERON A GEMINI:")
+        lines.append(f"   Total que escalaron a Gemini: {metrics['mimo_accepted_then_judge_rejected'] + metrics['mimo_accepted_then_judge_accepted']}")
+        lines.append(f"   ✓ Aceptadas también por Gemini: {metrics['mimo_accepted_then_judge_accepted']}")
+        lines.append(f"   ✗ Rechazadas por Gemini: {metrics['mimo_accepted_then_judge_rejected']}")
         
         if metrics['mimo_accepted_then_judge_rejected'] + metrics['mimo_accepted_then_judge_accepted'] > 0:
             rejection_rate = (metrics['mimo_accepted_then_judge_rejected'] / 
                             (metrics['mimo_accepted_then_judge_rejected'] + metrics['mimo_accepted_then_judge_accepted'])) * 100
-            print(f"\n   📉 TASA DE RECHAZO DE GEMINI:")
-            print(f"      {rejection_rate:.1f}% de las fuentes aceptadas por MiMo fueron rechazadas por Gemini")
+            lines.append(f"\n   📉 TASA DE RECHAZO DE GEMINI:")
+            lines.append(f"      {rejection_rate:.1f}% de las fuentes aceptadas por MiMo fueron rechazadas por Gemini")
     
     if total_judge_evaluated > 0:
-        print(f"\n⚖️  EVALUACIONES CON GEMINI (JUDGE):")
-        print(f"   Total evaluadas por Gemini: {total_judge_evaluated}")
-        print(f"   (Incluye escalamientos desde MiMo + evaluaciones directas)")
+        lines.append(f"\n⚖️  EVALUACIONES CON GEMINI (JUDGE):")
+        lines.append(f"   Total evaluadas por Gemini: {total_judge_evaluated}")
+        lines.append(f"   (Incluye escalamientos desde MiMo + evaluaciones directas)")
     
-    print("=" * 80 + "\n")
+    lines.append("=" * 80 + "\n")
+    
+    # Un solo registro: el bloque sale entero y en orden con el resto del log del evaluador
+    _logger.info("%s", "\n".join(lines))
 
 
 # ==========================================
 # POLICY 2: CHEAP DETERMINISTIC SCORING HELPERS
 # ==========================================
 
-def classify_source_category(url: str, domain: str = "") -> str:
+# Buckets de keywords (bitfield). Cada keyword se etiqueta con los buckets en los que aparece,
+# de modo que una sola pasada sobre la URL/dominio resuelve categoría, metodología y prioridad.
+_BUCKET_CONSULTING = 1 << 0
+_BUCKET_CONSULTING_HI = 1 << 1
+_BUCKET_CONSULTING_MED = 1 << 2
+_BUCKET_INSTITUTIONAL = 1 << 3
+_BUCKET_ACADEMIC = 1 << 4
+_BUCKET_GENERAL_MEDIA = 1 << 5
+_BUCKET_METHODOLOGICAL = 1 << 6
+
+# Consulting firms
+_CONSULTING_KEYWORDS = (
+    'mckinsey', 'bcg', 'bain', 'oliverwyman', 'accenture', 
+    'deloitte', 'pwc', 'kpmg', 'ey', 'ernst', 'arthur', 'andersen',
+    'strategy', 'roland', 'berger', 'atkearney', 'booz', 'capgemini'
+)
+
+# Alta prioridad: consultoras especializadas reconocidas
+# Big 4: Deloitte, PwC, KPMG, EY - para industria, operaciones, supply chain, transformación digital
+# MBB: McKinsey, BCG, Bain - para estrategia, implementación, transformación organizacional
+_CONSULTING_HIGH_PRIORITY_KEYWORDS = (
+    'deloitte', 'pwc', 'kpmg', 'ey', 'ernst',  # Big 4 (industria, operaciones, supply chain)
+    'mckinsey', 'bcg', 'bain',  # MBB (estrategia, implementación)
+)
+
+# Prioridad media: otras consultoras reconocidas
+_CONSULTING_MEDIUM_PRIORITY_KEYWORDS = (
+    'accenture', 'oliverwyman', 'roland', 'berger', 'atkearney', 'booz', 'capgemini'
+)
+
+# Institutional (.gov, .eu, international orgs)
+_INSTITUTIONAL_KEYWORDS = (
+    '.gov', '.gob.es', 'europa.eu', 'ec.europa.eu', 'oecd', 
+    'un.org', 'worldbank', 'imf.org', 'iea.org', 'wto.org',
+    'ecb.europa.eu', 'eba.europa.eu', 'echa.europa.eu', 'eur-lex',
+    'boe.es', 'miteco.gob.es', 'epa.gov', 'fda.gov', 'sec.gov'
+)
+
+# Academic (.edu, journals, publishers)
+_ACADEMIC_KEYWORDS = (
+    '.edu', '.ac.uk', 'arxiv', 'nature.com', 'science.org',
+    'ieee.org', 'springer.com', 'elsevier.com', 'wiley.com',
+    'acm.org', 'jstor.org', 'scholar.google', 'pubmed', 'doi.org'
+)
+
+# General media / Confidenciales (medios generalistas y confidenciales)
+# Estos deben tener umbrales más estrictos y priorizarse menos que fuentes primarias
+_GENERAL_MEDIA_KEYWORDS = (
+    'confidencial', 'confidencialdigital', 'elconfidencial', 'elconfidencialdigital',
+    'elmundo', 'elpais', 'abc.es', 'lavanguardia', 'elmundo.es',
+    'expansion', 'cinco dias', 'publico', 'elperiodico',
+    # Medios digitales generalistas españoles
+    'okdiario', 'elespanol', 'libertaddigital', 'vozpopuli',
+    'news', 'times', 'post', 'guardian', 'bbc',  # Medios generalistas internacionales
+    'cnn', 'msnbc', 'foxnews', 'telegraph', 'independent',
+    # Excluir medios financieros premium (se detectan por otros keywords antes)
+)
+
+_METHODOLOGICAL_KEYWORDS = (
+    # Organismos internacionales y agencias gubernamentales (datos oficiales)
+    'eurostat', 'ec.europa.eu/eurostat',  # Eurostat (estadísticas oficiales EU)
+    'worldbank.org', 'world bank',  # World Bank
+    'imf.org', 'international monetary fund',  # IMF
+    'oecd.org', 'oecd',  # OECD
+    'un.org', 'united nations',  # UN
+    'wto.org', 'world trade organization',  # WTO
+    'iea.org', 'international energy agency',  # IEA (energía)
+    'who.int', 'world health organization',  # WHO (salud)
+    'itu.int', 'international telecommunication union',  # ITU (tecnología)
+    'icao.int', 'international civil aviation organization',  # ICAO (transporte)
+    
+    # Agencias gubernamentales (datos oficiales)
+    'defense.gov', 'dod.gov', 'pentagon',  # US DoD (defensa)
+    'eda.europa.eu', 'eda',  # European Defence Agency (defensa)
+    'nato.int', 'nato',  # NATO (defensa)
+    'epa.gov', 'environmental protection agency',  # EPA (medio ambiente)
+    'fda.gov', 'food and drug administration',  # FDA (salud)
+    'sec.gov', 'securities and exchange commission',  # SEC (finanzas)
+    'ftc.gov', 'federal trade commission',  # FTC (competencia)
+    'eia.gov', 'energy information administration',  # EIA (energía)
+    'bls.gov', 'bureau of labor statistics',  # BLS (laboral)
+    'census.gov', 'us census bureau',  # Census (demografía)
+    
+    # Think tanks tier-1 (metodología robusta, múltiples sectores)
+    'rand.org', 'rand',  # RAND Corporation (defensa, tecnología, salud, etc.)
+    'brookings.edu', 'brookings',  # Brookings Institution (política, economía)
+    'csis.org', 'csis',  # Center for Strategic and International Studies (geopolítica)
+    'chathamhouse.org', 'chatham house',  # Chatham House (internacional)
+    'cfr.org', 'council on foreign relations',  # CFR (relaciones internacionales)
+    'sipri.org', 'sipri',  # Stockholm International Peace Research Institute (defensa)
+    'iiss.org', 'iiss',  # International Institute for Strategic Studies (defensa)
+    'petersoninstitute.org', 'peterson institute',  # PIIE (economía)
+    'carnegieendowment.org', 'carnegie',  # Carnegie Endowment (internacional)
+    
+    # Instituciones de investigación con metodología robusta
+    'nber.org', 'national bureau of economic research',  # NBER (economía)
+    'cepr.org', 'centre for economic policy research',  # CEPR (economía)
+    'bruegel.org', 'bruegel',  # Bruegel (economía EU)
+    'ecb.europa.eu', 'european central bank',  # ECB (finanzas)
+    'bis.org', 'bank for international settlements',  # BIS (finanzas)
+)
+
+
+def _build_keyword_buckets() -> Tuple[Tuple[str, int], ...]:
+    """Fusiona todas las listas de keywords en una tabla (keyword, bitmask de buckets)."""
+    buckets: Dict[str, int] = {}
+    for keywords, bit in (
+        (_CONSULTING_KEYWORDS, _BUCKET_CONSULTING),
+        (_CONSULTING_HIGH_PRIORITY_KEYWORDS, _BUCKET_CONSULTING_HI),
+        (_CONSULTING_MEDIUM_PRIORITY_KEYWORDS, _BUCKET_CONSULTING_MED),
+        (_INSTITUTIONAL_KEYWORDS, _BUCKET_INSTITUTIONAL),
+        (_ACADEMIC_KEYWORDS, _BUCKET_ACADEMIC),
+        (_GENERAL_MEDIA_KEYWORDS, _BUCKET_GENERAL_MEDIA),
+        (_METHODOLOGICAL_KEYWORDS, _BUCKET_METHODOLOGICAL),
+    ):
+        for kw in keywords:
+            buckets[kw] = buckets.get(kw, 0) | bit
+    return tuple(buckets.items())
+
+
+_KEYWORD_BUCKETS = _build_keyword_buckets()
+
+
+@lru_cache(maxsize=4096)
+def _url_domain_lower(url: str, domain: str) -> Tuple[str, str]:
+    """(url, dominio) en minúsculas; cacheado para fuentes que se re-evalúan (reintentos, duplicados)."""
+    return url.lower(), domain.lower()
+
+
+def _match_source_buckets(url: str, domain: str = "") -> int:
     """
-    Clasifica la fuente en una categoría determinística.
+    Recorre URL + dominio una sola vez contra la tabla fusionada de keywords.
     
     Returns:
-        'consulting' | 'institutional' | 'academic' | 'general_media' | 'other'
+        Bitfield con los buckets (_BUCKET_*) que tienen al menos una coincidencia
     """
-    url_lower = url.lower()
-    domain_lower = (domain or url_lower).lower()
-    
-    # Consulting firms
-    consulting_keywords = [
-        'mckinsey', 'bcg', 'bain', 'oliverwyman', 'accenture', 
-        'deloitte', 'pwc', 'kpmg', 'ey', 'ernst', 'arthur', 'andersen',
-        'strategy', 'roland', 'berger', 'atkearney', 'booz', 'capgemini'
-    ]
-    if any(kw in url_lower or kw in domain_lower for kw in consulting_keywords):
+    url_lower, domain_lower = _url_domain_lower(url, domain or url)
+    # '\n' no aparece en ninguna keyword: equivale a "kw in url_lower or kw in domain_lower"
+    hay = f"{url_lower}\n{domain_lower}"
+    bits = 0
+    for kw, mask in _KEYWORD_BUCKETS:
+        if kw in hay:
+            bits |= mask
+    return bits
+
+
+def _category_from_buckets(bits: int) -> str:
+    """Resuelve la categoría por precedencia: consulting > institutional > academic > general_media."""
+    if bits & _BUCKET_CONSULTING:
         return 'consulting'
-    
-    # Institutional (.gov, .eu, international orgs)
-    institutional_keywords = [
-        '.gov', '.gob.es', 'europa.eu', 'ec.europa.eu', 'oecd', 
-        'un.org', 'worldbank', 'imf.org', 'iea.org', 'wto.org',
-        'ecb.europa.eu', 'eba.europa.eu', 'echa.europa.eu', 'eur-lex',
-        'boe.es', 'miteco.gob.es', 'epa.gov', 'fda.gov', 'sec.gov'
-    ]
-    if any(kw in url_lower or kw in domain_lower for kw in institutional_keywords):
+    if bits & _BUCKET_INSTITUTIONAL:
         return 'institutional'
-    
-    # Academic (.edu, journals, publishers)
-    academic_keywords = [
-        '.edu', '.ac.uk', 'arxiv', 'nature.com', 'science.org',
-        'ieee.org', 'springer.com', 'elsevier.com', 'wiley.com',
-        'acm.org', 'jstor.org', 'scholar.google', 'pubmed', 'doi.org'
-    ]
-    if any(kw in url_lower or kw in domain_lower for kw in academic_keywords):
+    if bits & _BUCKET_ACADEMIC:
         return 'academic'
-    
-    # General media / Confidenciales (medios generalistas y confidenciales)
-    # Estos deben tener umbrales más estrictos y priorizarse menos que fuentes primarias
-    general_media_keywords = [
-        'confidencial', 'confidencialdigital', 'elconfidencial', 'elconfidencialdigital',
-        'elmundo', 'elpais', 'abc.es', 'lavanguardia', 'elmundo.es',
-        'expansion', 'cinco dias', 'publico', 'elperiodico',
-        # Medios digitales generalistas españoles
-        'okdiario', 'elespanol', 'libertaddigital', 'vozpopuli',
-        'news', 'times', 'post', 'guardian', 'bbc',  # Medios generalistas internacionales
-        'cnn', 'msnbc', 'foxnews', 'telegraph', 'independent',
-        # Excluir medios financieros premium (se detectan por otros keywords antes)
-    ]
     # Solo clasificar como general_media si NO es una fuente primaria (ya clasificada arriba)
-    # y coincide con patrones de medios generalistas/confidenciales
-    if any(kw in url_lower or kw in domain_lower for kw in general_media_keywords):
+    if bits & _BUCKET_GENERAL_MEDIA:
         return 'general_media'
-    
     return 'other'
 
 
+def _consulting_priority_from_buckets(bits: int) -> int:
+    """Resuelve la prioridad de consultora (2/1/0) a partir del bitfield."""
+    if bits & _BUCKET_CONSULTING_HI:
+        return 2
+    if bits & _BUCKET_CONSULTING_MED:
+        return 1
+    return 0
+
+
+@lru_cache(maxsize=4096)
+def classify_source(url: str, domain: str = "") -> Tuple[str, bool, int]:
+    """
+    Clasificación fusionada en una sola pasada sobre URL/dominio.
+    
+    Returns:
+        Tuple (category, is_methodological, consulting_priority)
+    """
+    bits = _match_source_buckets(url, domain)
+    return (
+        _category_from_buckets(bits),
+        bool(bits & _BUCKET_METHODOLOGICAL),
+        _consulting_priority_from_buckets(bits),
+    )
+
+
+def classify_source_category(url: str, domain: str = "") -> str:
+    """
+    Clasifica la fuente en una categoría determinística.
+    
+    Returns:
+        'consulting' | 'institutional' | 'academic' | 'general_media' | 'other'
+    """
+    return _category_from_buckets(_match_source_buckets(url, domain))
+
+
 def is_methodological_source(url: str, domain: str = "") -> bool:
     """
     Identifica fuentes con metodología robusta (organismos internacionales, think tanks tier-1, 
@@ -162,54 +367,7 @@ def is_methodological_source(url: str, domain: str = "") -> bool:
     Returns:
         True si es una fuente metodológica reconocida
     """
-    url_lower = url.lower()
-    domain_lower = (domain or url_lower).lower()
-    
-    methodological_keywords = [
-        # Organismos internacionales y agencias gubernamentales (datos oficiales)
-        'eurostat', 'ec.europa.eu/eurostat',  # Eurostat (estadísticas oficiales EU)
-        'worldbank.org', 'world bank',  # World Bank
-        'imf.org', 'international monetary fund',  # IMF
-        'oecd.org', 'oecd',  # OECD
-        'un.org', 'united nations',  # UN
-        'wto.org', 'world trade organization',  # WTO
-        'iea.org', 'international energy agency',  # IEA (energía)
-        'who.int', 'world health organization',  # WHO (salud)
-        'itu.int', 'international telecommunication union',  # ITU (tecnología)
-        'icao.int', 'international civil aviation organization',  # ICAO (transporte)
-        
-        # Agencias gubernamentales (datos oficiales)
-        'defense.gov', 'dod.gov', 'pentagon',  # US DoD (defensa)
-        'eda.europa.eu', 'eda',  # European Defence Agency (defensa)
-        'nato.int', 'nato',  # NATO (defensa)
-        'epa.gov', 'environmental protection agency',  # EPA (medio ambiente)
-        'fda.gov', 'food and drug administration',  # FDA (salud)
-        'sec.gov', 'securities and exchange commission',  # SEC (finanzas)
-        'ftc.gov', 'federal trade commission',  # FTC (competencia)
-        'eia.gov', 'energy information administration',  # EIA (energía)
-        'bls.gov', 'bureau of labor statistics',  # BLS (laboral)
-        'census.gov', 'us census bureau',  # Census (demografía)
-        
-        # Think tanks tier-1 (metodología robusta, múltiples sectores)
-        'rand.org', 'rand',  # RAND Corporation (defensa, tecnología, salud, etc.)
-        'brookings.edu', 'brookings',  # Brookings Institution (política, economía)
-        'csis.org', 'csis',  # Center for Strategic and International Studies (geopolítica)
-        'chathamhouse.org', 'chatham house',  # Chatham House (internacional)
-        'cfr.org', 'council on foreign relations',  # CFR (relaciones internacionales)
-        'sipri.org', 'sipri',  # Stockholm International Peace Research Institute (defensa)
-        'iiss.org', 'iiss',  # International Institute for Strategic Studies (defensa)
-        'petersoninstitute.org', 'peterson institute',  # PIIE (economía)
-        'carnegieendowment.org', 'carnegie',  # Carnegie Endowment (internacional)
-        
-        # Instituciones de investigación con metodología robusta
-        'nber.org', 'national bureau of economic research',  # NBER (economía)
-        'cepr.org', 'centre for economic policy research',  # CEPR (economía)
-        'bruegel.org', 'bruegel',  # Bruegel (economía EU)
-        'ecb.europa.eu', 'european central bank',  # ECB (finanzas)
-        'bis.org', 'bank for international settlements',  # BIS (finanzas)
-    ]
-    
-    return any(kw in url_lower or kw in domain_lower for kw in methodological_keywords)
+    return bool(_match_source_buckets(url, domain) & _BUCKET_METHODOLOGICAL)
 
 
 def get_consulting_priority(url: str, domain: str = "") -> int:
@@ -222,31 +380,31 @@ def get_consulting_priority(url: str, domain: str = "") -> int:
         1: Prioridad media (otras consultoras reconocidas)
         0: Baja prioridad (consultoras no reconocidas o genéricas)
     """
-    url_lower = url.lower()
-    domain_lower = (domain or url_lower).lower()
-    
-    # Alta prioridad: consultoras especializadas reconocidas
-    # Big 4: Deloitte, PwC, KPMG, EY - para industria, operaciones, supply chain, transformación digital
-    # MBB: McKinsey, BCG, Bain - para estrategia, implementación, transformación organizacional
-    high_priority = [
-        'deloitte', 'pwc', 'kpmg', 'ey', 'ernst',  # Big 4 (industria, operaciones, supply chain)
-        'mckinsey', 'bcg', 'bain',  # MBB (estrategia, implementación)
-    ]
-    
-    if any(kw in url_lower or kw in domain_lower for kw in high_priority):
-        return 2
-    
-    # Prioridad media: otras consultoras reconocidas
-    medium_priority = [
-        'accenture', 'oliverwyman', 'roland', 'berger', 'atkearney', 'booz', 'capgemini'
-    ]
-    
-    if any(kw in url_lower or kw in domain_lower for kw in medium_priority):
-        return 1
-    
-    return 0
+    return _consulting_priority_from_buckets(_match_source_buckets(url, domain))
+
+
+# Relevancia neutra cuando no hay texto suficiente para comparar
+_NEUTRAL_RELEVANCE = 5.0
 
+# Simple stopwords (minimal set)
+_RELEVANCE_STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must', 'can'})
+_TOKEN_RE = re.compile(r'\b\w{3,}\b')
 
+
+def _tokenize(text: str) -> frozenset:
+    """Tokeniza y limpia texto (minúsculas, sin stopwords ni tokens muy cortos)."""
+    if not text:
+        return frozenset()
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower()) if t not in _RELEVANCE_STOPWORDS)
+
+
+@lru_cache(maxsize=64)
+def _context_tokens(context: str) -> frozenset:
+    """Tokens del contexto: es el mismo para todas las fuentes de un batch, se tokeniza una vez."""
+    return _tokenize(context)
+
+
+@lru_cache(maxsize=4096)
 def quick_relevance_score(context: str, title: str, snippet: str) -> float:
     """
     Calcula un score de relevancia rápido usando Jaccard overlap ponderado.
@@ -255,31 +413,20 @@ def quick_relevance_score(context: str, title: str, snippet: str) -> float:
         float 0-10
     """
     if not context or (not title and not snippet):
-        return 5.0
-    
-    # Simple stopwords (minimal set)
-    stopwords = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must', 'can'}
-    
-    def tokenize(text: str) -> set:
-        """Tokeniza y limpia texto."""
-        if not text:
-            return set()
-        # Convertir a minúsculas, tokenizar, filtrar stopwords y tokens muy cortos
-        tokens = re.findall(r'\b\w{3,}\b', text.lower())
-        return {t for t in tokens if t not in stopwords}
+        return _NEUTRAL_RELEVANCE
     
-    context_tokens = tokenize(context)
-    content_tokens = tokenize(f"{title} {snippet}")
+    context_tokens = _context_tokens(context)
+    content_tokens = _tokenize(f"{title} {snippet}")
     
     if not context_tokens or not content_tokens:
-        return 5.0
+        return _NEUTRAL_RELEVANCE
     
-    # Jaccard similarity
+    # Jaccard similarity (la unión se calcula aritméticamente, sin materializar el set)
     intersection = len(context_tokens & content_tokens)
-    union = len(context_tokens | content_tokens)
+    union = len(context_tokens) + len(content_tokens) - intersection
     
     if union == 0:
-        return 5.0
+        return _NEUTRAL_RELEVANCE
     
     jaccard = intersection / union
     
@@ -290,6 +437,9 @@ def quick_relevance_score(context: str, title: str, snippet: str) -> float:
     return round(score, 1)
 
 
+_YEAR_RE = re.compile(r'\b(20[0-3][0-9])\b')
+
+
 def estimate_currency_score(title: str, snippet: str) -> float:
     """
     Estima currency score basándose en años detectados en título/snippet.
@@ -297,17 +447,22 @@ def estimate_currency_score(title: str, snippet: str) -> float:
     Returns:
         float 0-10 (más reciente = más alto)
     """
+    return _currency_score(title, snippet, datetime.now().year)
+
+
+@lru_cache(maxsize=4096)
+def _currency_score(title: str, snippet: str, current_year: int) -> float:
+    """Cálculo memoizado (el año actual forma parte de la clave para no cachear entre años)."""
     text = f"{title} {snippet}".lower()
     
     # Buscar años 2000-2035
-    years = re.findall(r'\b(20[0-3][0-9])\b', text)
+    years = _YEAR_RE.findall(text)
     
     if not years:
         return 5.0  # Default si no hay año
     
     try:
         max_year = max(int(y) for y in years)
-        current_year = datetime.now().year
         
         # Score: más reciente = más alto
         age = current_year - max_year
@@ -344,13 +499,18 @@ def evaluate_source_fast(source: Dict, context: str = "") -> bool:
     snippet = source.get('snippet', '')
     domain = source.get('source_domain', '')
     
-    # Categoría y pre-scores
-    category = classify_source_category(url, domain)
-    relevance = quick_relevance_score(context or "general research", title, snippet)
+    # Categoría y pre-scores (una sola pasada de clasificación sobre URL/dominio)
+    category, is_methodological, _ = classify_source(url, domain)
+    if not (title or snippet):
+        # Placeholders sin título ni snippet (habituales en algunos proveedores):
+        # la relevancia es el default neutro, no hace falta tokenizar.
+        relevance = _NEUTRAL_RELEVANCE
+    else:
+        relevance = quick_relevance_score(context or "general research", title, snippet)
     
     # Umbral de éxito rápido (Policy 2):
     # Si es institucional/metodológica/académica + relevancia mínima, aceptamos
-    if category in ['institutional', 'academic'] or is_methodological_source(url, domain):
+    if category in ['institutional', 'academic'] or is_methodological:
         return relevance >= 4.0
         
     # Si es consultora Tier 1 y relevancia media, aceptamos
@@ -365,210 +525,87 @@ def evaluate_source_fast(source: Dict, context: str = "") -> bool:
 # EVALUACIÓN INDIVIDUAL (con optimizaciones)
 # ==========================================
 
-async def evaluate_source(source: Dict, context: str) -> Optional[Dict]:
+# Semáforo de llamadas LLM (MiMo + Judge): se crea por event loop para evitar
+# errores "attached to a different loop" entre ejecuciones
+_eval_semaphore = LoopLocal(lambda: asyncio.Semaphore(max(1, EVAL_CONCURRENCY)))
+
+
+def _get_eval_semaphore() -> asyncio.Semaphore:
+    """Obtiene el semáforo que limita las llamadas LLM concurrentes a EVAL_CONCURRENCY."""
+    return _eval_semaphore.get()
+
+
+# Token buckets del evaluador (por event loop): tokens LLM por minuto, reservando la
+# estimación de cada petición (prompt + respuesta), y peticiones por minuto (1 por llamada)
+_token_bucket = LoopLocal(lambda: AsyncTokenBucket(EVAL_TOKENS_PER_MINUTE))
+_request_bucket = LoopLocal(lambda: AsyncTokenBucket(EVAL_REQUESTS_PER_MINUTE))
+
+# Tokens de respuesta reservados por llamada (JSON de evaluación)
+_RESPONSE_TOKEN_ESTIMATE = 300
+
+
+def _get_token_bucket() -> Optional[AsyncTokenBucket]:
+    """Token bucket del evaluador para el event loop actual (None si tokens_per_minute = 0)."""
+    if EVAL_TOKENS_PER_MINUTE <= 0:
+        return None
+    return _token_bucket.get()
+
+
+def _get_request_bucket() -> Optional[AsyncTokenBucket]:
     """
-    Evalúa la calidad y relevancia de una fuente usando método multidimensional.
-    
-    OPTIMIZACIONES:
-    1. Cache hit: Retorna evaluación previa si existe
-    2. Fast-track élite: Dominios de élite saltan LLM
-    3. Auto-reject: Dominios en blacklist se rechazan sin LLM
-    
-    Args:
-        source: Dict con info de la fuente (title, url, snippet, source_domain)
-        context: Contexto/tema para evaluar relevancia
-    
-    Returns:
-        Dict con scores multidimensionales, keep y reasoning, o None si error
+    Bucket de peticiones por minuto del evaluador (cada llamada reserva 1) para el
+    event loop actual; None si requests_per_minute = 0.
     """
-    if not source.get("url"):
+    if EVAL_REQUESTS_PER_MINUTE <= 0:
         return None
+    return _request_bucket.get()
+
+
+def _estimate_request_tokens(messages: List[Dict]) -> int:
+    """Estimación barata (~4 caracteres por token) de los tokens de una petición."""
+    chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return chars // 4 + _RESPONSE_TOKEN_ESTIMATE
+
+
+@dataclass
+class LLMUsage:
+    """Tokens consumidos por las llamadas LLM del evaluador dentro de track_llm_usage()."""
+    total_tokens: int = 0
+    estimated_calls: int = 0  # Llamadas sin usage del proveedor (streaming): se suma la estimación
+
+
+_current_usage: contextvars.ContextVar[Optional[LLMUsage]] = contextvars.ContextVar("evaluator_llm_usage", default=None)
+
+
+@contextmanager
+def track_llm_usage() -> Iterator[LLMUsage]:
+    """
+    Acumula los tokens de las llamadas MiMo/Judge hechas dentro del bloque, incluidas
+    las de tareas creadas en él (heredan el contexto).
+    """
+    usage = LLMUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
 
-    url = source.get('url', '')
-    domain = source.get('source_domain', '')
-    
-    # ==========================================
-    # PASO 1: CHECK CACHE
-    # ==========================================
-    cached = get_cached_evaluation(url)
-    if cached:
-        print(f"   💾 Cache hit: {domain[:30]}")
-        # Merge cached evaluation con source data
-        result = {**source, **cached}
-        result["score"] = cached.get("total_score", 0)
-        result["reason"] = cached.get("reasoning", "")
-        result["from_cache"] = True
-        return result
-    
-    # ==========================================
-    # PASO 2: CHECK DOMINIO ÉLITE / AUTO-REJECT
-    # ==========================================
-    elite_info = get_elite_domain_scores(url)
-    
-    if elite_info:
-        # Auto-reject
-        if elite_info.get('auto_reject'):
-            print(f"   🚫 Auto-reject: {elite_info.get('domain', domain)}")
-            result = {
-                **source,
-                "authenticity_score": 0,
-                "reliability_score": 0,
-                "relevance_score": 0,
-                "currency_score": 0,
-                "total_score": 0,
-                "is_clickbait": False,
-                "keep": False,
-                "reasoning": elite_info.get('reason', 'Dominio en lista de rechazo automático'),
-                "score": 0,
-                "reason": elite_info.get('reason', 'Auto-rejected'),
-                "fast_track": "auto_reject"
-            }
-            cache_evaluation(url, result)
-            return result
-        
-        # POLICY 2: Elite pre-score (no auto-keep)
-        if EVAL_ELITE_FAST_TRACK_ENABLED:
-            print(f"   ⚡ Pre-score élite: {elite_info.get('domain', domain)} (Tier {elite_info.get('tier', '?')})")
-            
-            # Compute deterministic pre-scores
-            title = source.get('title', '')
-            snippet = source.get('snippet', '')
-            category = classify_source_category(url, domain)
-            relevance = quick_relevance_score(context, title, snippet)
-            currency = estimate_currency_score(title, snippet)
-            authenticity = float(elite_info.get('authenticity', 9))
-            reliability = float(elite_info.get('reliability', 8))
-            
-            # Calculate total_score
-            total_score = (authenticity + reliability + relevance + currency) / 4.0
-            
-            # Apply category adjustments with prioritization
-            # PRIORIZACIÓN: Fuentes metodológicas tienen máxima prioridad (aplicable a TODOS los sectores)
-            if is_methodological_source(url, domain):
-                total_score += 1.0  # Bonus significativo para fuentes metodológicas (organismos internacionales, think tanks tier-1, agencias gubernamentales - multisector)
-            elif category == 'consulting':
-                # Priorizar consultoras específicas (Deloitte/PwC/KPMG para industria; McKinsey/BCG/Bain para estrategia)
-                consulting_priority = get_consulting_priority(url, domain)
-                if consulting_priority == 2:  # Alta prioridad
-                    if relevance >= EVAL_CONSULTING_MIN_RELEVANCE:
-                        total_score += 0.3  # Bonus para consultoras prioritarias con buena relevancia
-                    else:
-                        total_score -= 0.75  # Penalización si relevancia baja
-                elif consulting_priority == 1:  # Prioridad media
-                    if relevance < EVAL_CONSULTING_MIN_RELEVANCE:
-                        total_score -= 0.75
-                else:  # Baja prioridad o no reconocida
-                    if relevance < EVAL_CONSULTING_MIN_RELEVANCE:
-                        total_score -= 1.0  # Penalización mayor para consultoras no prioritarias
-                    else:
-                        total_score -= 0.25  # Pequeña penalización incluso si relevancia es buena
-            elif category == 'institutional':
-                total_score += 0.5  # Bonus para institucionales (fuentes primarias)
-            elif category == 'academic':
-                total_score += 0.5  # Bonus para académicas (fuentes primarias)
-            elif category == 'general_media':
-                # Penalizar medios generalistas/confidenciales (priorizar fuentes primarias)
-                total_score -= 0.5  # Penalización para priorizar fuentes primarias
-                if relevance < EVAL_GENERAL_MEDIA_MIN_RELEVANCE:
-                    total_score -= 0.75  # Penalización adicional si relevancia baja
-            
-            total_score = round(max(0.0, min(10.0, total_score)), 1)
-            
-            # Gray zone decision
-            needs_llm_review = False
-            if EVAL_GRAY_ZONE_ENABLED:
-                if total_score <= EVAL_GRAY_ZONE_LOW_REJECT:
-                    keep_value = False
-                    reasoning_pre = f"Pre-score rechazado (total={total_score:.1f} <= {EVAL_GRAY_ZONE_LOW_REJECT})"
-                elif total_score >= EVAL_GRAY_ZONE_HIGH_ACCEPT:
-                    # Fast accept, but apply hard rules
-                    keep_value = True
-                    reasoning_pre = f"Pre-score aceptado (total={total_score:.1f} >= {EVAL_GRAY_ZONE_HIGH_ACCEPT})"
-                else:
-                    # Gray zone: needs LLM review
-                    needs_llm_review = True
-                    keep_value = None  # Undecided, LLM will decide
-                    reasoning_pre = f"Gray zone (total={total_score:.1f}), requiere LLM"
-            else:
-                # No gray zone: use standard thresholds
-                keep_value = (total_score >= TOTAL_SCORE_THRESHOLD and relevance >= RELEVANCE_THRESHOLD)
-                reasoning_pre = f"Pre-score evaluado (total={total_score:.1f}, relevance={relevance:.1f})"
-            
-            # Apply hard rules (even for fast accept)
-            if keep_value is not False:  # If not already rejected
-                if category == 'consulting' and relevance < EVAL_CONSULTING_MIN_RELEVANCE:
-                    keep_value = False
-                    reasoning_pre += f" | Regla hard: consulting requiere relevance>={EVAL_CONSULTING_MIN_RELEVANCE}"
-                elif category == 'general_media' and relevance < EVAL_GENERAL_MEDIA_MIN_RELEVANCE:
-                    keep_value = False
-                    reasoning_pre += f" | Regla hard: medios generalistas/confidenciales requieren relevance>={EVAL_GENERAL_MEDIA_MIN_RELEVANCE} | Priorizar fuentes primarias"
-                elif category == 'institutional' and relevance >= EVAL_INSTITUTIONAL_MIN_RELEVANCE:
-                    # Institutional may pass with lower relevance if other scores are strong
-                    if total_score >= TOTAL_SCORE_THRESHOLD - 0.5:
-                        keep_value = True
-                        reasoning_pre += " | Regla hard: institutional con scores fuertes"
-            
-            # If not in gray zone or LLM unavailable, return pre-score result
-            if not needs_llm_review:
-                result = {
-                    **source,
-                    "authenticity_score": authenticity,
-                    "reliability_score": reliability,
-                    "relevance_score": relevance,
-                    "currency_score": currency,
-                    "total_score": total_score,
-                    "is_clickbait": False,
-                    "keep": keep_value,
-                    "reasoning": f"Policy 2 pre-score [{category}]: {reasoning_pre}",
-                    "score": total_score,
-                    "reason": f"Elite pre-score: {elite_info.get('domain', domain)}",
-                    "fast_track": "elite_prescore",
-                    "source_category": category
-                }
-                cache_evaluation(url, result)
-                return result
-            # Else: continue to LLM evaluation (fall through to MiMo/Judge flow below)
-    
-    # ==========================================
-    # PASO 3: PRE-FILTRO HARD (Fuentes internas de la empresa)
-    # ==========================================
-    url_lower = url.lower()
-    domain_lower = domain.lower()
-    title_lower = source.get('title', '').lower()
-    
-    # NOTA: El filtrado de fuentes internas ahora se hace basándose en el contexto de Airtable
-    # No se usa COMPANY_CONTEXT del JSON, se usa project_specific_context de Airtable
-    # Por ahora, no filtramos por nombre de empresa (el contexto de Airtable puede contener esta información)
-    # Si necesitas filtrar fuentes internas, añade esa lógica basándose en project_specific_context
-    company_name = ""  # Ya no se usa COMPANY_CONTEXT del JSON
-    
-    # Filtrar fuentes internas si el nombre de la empresa está disponible
-    # (Esta lógica se puede mejorar para usar el contexto de Airtable)
-    if company_name and (company_name in url_lower or company_name in domain_lower or company_name in title_lower):
-        print(f"   🚫 Pre-filtro interno: {domain}")
-        result = {
-            **source,
-            "authenticity_score": 10,
-            "reliability_score": 10,
-            "relevance_score": 0,
-            "currency_score": 0,
-            "total_score": 4,
-            "is_clickbait": False,
-            "keep": False,
-            "reasoning": f"Rechazada: Fuente interna de la empresa (contexto proporcionado internamente).",
-            "score": 4,
-            "reason": "Internal source filtered",
-            "fast_track": "internal_filter"
-        }
-        cache_evaluation(url, result)
-        return result
-    
-    # ==========================================
-    # PASO 4: EVALUACIÓN PRELIMINAR CON MIMO (Pre-juez barato)
-    # ==========================================
-    
-    # Primera evaluación rápida con MiMo-V2-Flash
-    mimo_system_msg = f"""Eres un Pre-Analista de Calidad. Evalúa rápidamente la fuente y determina si necesita evaluación detallada.
+
+def _record_usage(response, messages: List[Dict]):
+    """Suma usage_metadata.total_tokens de la respuesta (o la estimación si no viene)."""
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    total_tokens = (getattr(response, "usage_metadata", None) or {}).get("total_tokens")
+    if total_tokens:
+        usage.total_tokens += int(total_tokens)
+    else:
+        usage.total_tokens += _estimate_request_tokens(messages)
+        usage.estimated_calls += 1
+
+
+# Pre-juez MiMo: prompt de sistema estático (idéntico en cada llamada)
+_MIMO_SYSTEM_MSG = """Eres un Pre-Analista de Calidad. Evalúa rápidamente la fuente y determina si necesita evaluación detallada.
 
 EVALUACIÓN RÁPIDA (Cada criterio: 0-10):
 - authenticity_score: ¿Es fuente verificable?
@@ -577,7 +614,7 @@ EVALUACIÓN RÁPIDA (Cada criterio: 0-10):
 - currency_score: ¿Información actual?
 
 OUTPUT JSON OBLIGATORIO:
-{{
+{
   "authenticity_score": <int 0-10>,
   "reliability_score": <int 0-10>,
   "relevance_score": <int 0-10>,
@@ -587,7 +624,7 @@ OUTPUT JSON OBLIGATORIO:
   "confidence": "HIGH|PARTIAL|UNCERTAIN",
   "needs_detailed_review": <bool>,
   "reasoning": "<explicación breve>"
-}}
+}
 
 REGLA: needs_detailed_review = true si:
 - confidence = "PARTIAL" o "UNCERTAIN"
@@ -599,286 +636,92 @@ REGLA: confidence = "UNCERTAIN" si:
 - Información ambigua o contradictoria
 - Fuente poco conocida con scores medios
 - Contexto insuficiente para decidir claramente"""
-    
-    mimo_user_msg = f"""TEMA DE INVESTIGACIÓN: {context}
-    
-FUENTE CANDIDATA:
-- URL: {source.get('url', 'N/A')}
-- Título: {source.get('title', 'N/A')}
-- Dominio: {source.get('source_domain', 'N/A')}
-- Snippet: {source.get('snippet', 'N/A')[:300]}...
 
-Evalúa rápidamente esta fuente y responde ÚNICAMENTE en formato JSON."""
 
+# Variante batch: mismo prefijo estático + instrucciones para evaluar varias fuentes a la vez
+_MIMO_BATCH_SYSTEM_MSG = _MIMO_SYSTEM_MSG + """
+
+MODO BATCH:
+- Recibirás VARIAS fuentes candidatas, cada una con un "index" numérico.
+- Responde ÚNICAMENTE con un objeto JSON {"evaluations": [...]} con un objeto por fuente (mismo formato de arriba).
+- Cada objeto DEBE incluir "index" con el índice de la fuente evaluada."""
+
+
+def _detect_test_mode() -> bool:
+    """True si el perfil activo es TEST (en TEST no se usa el Judge premium)."""
     try:
-        # ==========================================
-        # FASE 1: Evaluación preliminar con MiMo-V2-Flash (barato)
-        # ==========================================
-        print(f"   🔍 Pre-evaluación con MiMo: {domain[:30]}")
-        
-        # Manejo de errores con reintentos para errores transitorios (429, 502, etc.)
-        mimo_response = None
-        mimo_max_retries = 3
-        
-        # Usar llm_mimo_cheap para pre-evaluación (más económico)
-        # Si no está disponible, usar llm_planner como fallback
-        llm_pre_eval = llm_mimo_cheap if llm_mimo_cheap else llm_planner
-        
-        for attempt in range(mimo_max_retries):
-            try:
-                mimo_response = await llm_pre_eval.ainvoke([
-                    {"role": "system", "content": mimo_system_msg},
-                    {"role": "user", "content": mimo_user_msg}
-                ])
-                break  # Éxito, salir del loop
-            except Exception as e:
-                error_str = str(e).lower()
-                error_msg = str(e)
-                
-                # Detectar errores transitorios (429 rate limit, 502 bad gateway, 503 service unavailable)
-                is_transient_error = (
-                    "429" in error_msg or "rate limit" in error_str or "rate-limited" in error_str or
-                    "502" in error_msg or "bad gateway" in error_str or
-                    "503" in error_msg or "service unavailable" in error_str or
-                    "provider returned error" in error_str
-                )
-                
-                if is_transient_error and attempt < mimo_max_retries - 1:
-                    wait_time = (2 ** attempt) * 2  # 2, 4, 8 segundos
-                    print(f"   ⚠️ Error transitorio (intento {attempt + 1}/{mimo_max_retries}): {error_msg[:100]}... Esperando {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    # Último intento fallido o error no transitorio
-                    if attempt == mimo_max_retries - 1:
-                        # En modo económico, no escalar - rechazar fuente
-                        if USE_CHEAP_OPENROUTER_MODELS:
-                            print(f"   ⚠️ Error persistente después de {mimo_max_retries} intentos con MiMo, rechazando fuente (modo económico)")
-                            mimo_response = None
-                            break
-                        else:
-                            print(f"   ⚠️ Error persistente después de {mimo_max_retries} intentos con MiMo, escalando a Judge")
-                            # Si es el último intento y falló, escalar directamente a Judge
-                            mimo_response = None
-                            break
-                    raise  # Re-lanzar el error para que sea manejado por el bloque except exterior
-        
-        # Si mimo_response es None, decidir qué hacer según modo
-        if mimo_response is None:
-            # En modo económico, no escalar - rechazar fuente
-            if USE_CHEAP_OPENROUTER_MODELS:
-                needs_detailed_review = False
-            else:
-                needs_detailed_review = True
-            mimo_evaluation = {}
-        else:
-            mimo_content = mimo_response.content if hasattr(mimo_response, 'content') else str(mimo_response)
-            
-            # Limpiar markdown si existe
-            if "```" in mimo_content:
-                if "```json" in mimo_content:
-                    mimo_content = mimo_content.split("```json")[-1].split("```")[0].strip()
-                else:
-                    mimo_content = mimo_content.split("```")[1].split("```")[0].strip()
-            
-            try:
-                mimo_evaluation = json.loads(mimo_content)
-                
-                # Validar y completar campos requeridos con valores por defecto razonables
-                mimo_required_fields = ["authenticity_score", "reliability_score", "relevance_score", "currency_score", "total_score", "is_clickbait"]
-                mimo_missing_fields = [f for f in mimo_required_fields if f not in mimo_evaluation]
-                
-                # Completar campos faltantes con valores por defecto basados en campos existentes
-                if mimo_missing_fields:
-                    print(f"   ⚠️ Evaluación preliminar incompleta para {domain}. Faltan: {', '.join(mimo_missing_fields)}")
-                    
-                    # Calcular valores por defecto basados en campos existentes
-                    existing_scores = [mimo_evaluation.get(f, 0) for f in ["authenticity_score", "reliability_score", "relevance_score", "currency_score"] if f in mimo_evaluation]
-                    avg_existing = sum(existing_scores) / len(existing_scores) if existing_scores else 5  # Default medio si no hay ninguno
-                    
-                    # Completar campos faltantes
-                    if "relevance_score" not in mimo_evaluation:
-                        # Si falta relevance_score, estimar basado en el contexto y otros scores
-                        mimo_evaluation["relevance_score"] = int(round(avg_existing)) if existing_scores else 5
-                        print(f"      🔧 Completando relevance_score: {mimo_evaluation['relevance_score']}")
-                    
-                    if "authenticity_score" not in mimo_evaluation:
-                        mimo_evaluation["authenticity_score"] = int(round(avg_existing)) if existing_scores else 5
-                    
-                    if "reliability_score" not in mimo_evaluation:
-                        mimo_evaluation["reliability_score"] = int(round(avg_existing)) if existing_scores else 5
-                    
-                    if "currency_score" not in mimo_evaluation:
-                        mimo_evaluation["currency_score"] = int(round(avg_existing)) if existing_scores else 7  # Default más alto para currency
-                    
-                    if "total_score" not in mimo_evaluation:
-                        # Calcular total_score como promedio de los scores individuales
-                        scores = [
-                            mimo_evaluation.get("authenticity_score", 0),
-                            mimo_evaluation.get("reliability_score", 0),
-                            mimo_evaluation.get("relevance_score", 0),
-                            mimo_evaluation.get("currency_score", 0)
-                        ]
-                        mimo_evaluation["total_score"] = int(round(sum(scores) / len(scores)))
-                    
-                    if "is_clickbait" not in mimo_evaluation:
-                        # Inferir clickbait basado en scores (baja relevancia pero alta confiabilidad puede ser clickbait)
-                        relevance = mimo_evaluation.get("relevance_score", 5)
-                        reliability = mimo_evaluation.get("reliability_score", 5)
-                        mimo_evaluation["is_clickbait"] = reliability >= 7 and relevance < 4
-                    
-                    print(f"      ✅ Campos completados. Evaluación ahora completa.")
-                    mimo_missing_fields = []  # Ya no faltan campos
-                
-                # Si aún faltan campos críticos después de completar, decidir según modo
-                if mimo_missing_fields:
-                    # Si falla MiMo, decidir según modo
-                    if USE_CHEAP_OPENROUTER_MODELS:
-                        needs_detailed_review = False  # En económico, rechazar fuente incompleta
-                    else:
-                        needs_detailed_review = True  # En producción, escalar a Judge
-                else:
-                    # Extraer valores de la evaluación preliminar
-                    confidence = mimo_evaluation.get("confidence", "HIGH")
-                    needs_detailed_review = mimo_evaluation.get("needs_detailed_review", False)
-                    
-                    # Determinar si necesita revisión detallada basándose en criterios
-                    total_score_pre = float(mimo_evaluation.get("total_score", 0))
-                    reliability_score_pre = float(mimo_evaluation.get("reliability_score", 0))
-                    relevance_score_pre = float(mimo_evaluation.get("relevance_score", 0))
-                    authenticity_score_pre = float(mimo_evaluation.get("authenticity_score", 0))
-                    
-                    # Criterios para escalamiento (solo en modo producción, no en económico):
-                    # En modo económico, MiMo es suficiente para todas las evaluaciones
-                    # 1. Confidence es PARTIAL o UNCERTAIN
-                    # 2. Scores en zona gris (5-7)
-                    # 3. Contradicciones (alta fiabilidad pero baja relevancia)
-                    # 4. Baja autenticidad pero alta fiabilidad (necesita verificación)
-                    
-                    # En modo económico, no escalar - MiMo es suficiente
-                    if USE_CHEAP_OPENROUTER_MODELS:
-                        # En modo económico, usar evaluación MiMo directamente sin escalamiento
-                        needs_detailed_review = False
-                    elif confidence in ["PARTIAL", "UNCERTAIN"]:
-                        needs_detailed_review = True
-                        print(f"      ⚠️ Confianza {confidence} - escalando a Judge (producción)")
-                    elif 5 <= total_score_pre <= 7:
-                        needs_detailed_review = True
-                        print(f"      ⚠️ Score en zona gris ({total_score_pre:.1f}) - escalando a Judge (producción)")
-                    elif reliability_score_pre >= 8 and relevance_score_pre < 6:
-                        needs_detailed_review = True
-                        print(f"      ⚠️ Contradicción detectada (fiabilidad alta, relevancia baja) - escalando a Judge (producción)")
-                    elif authenticity_score_pre < 6 and reliability_score_pre >= 7:
-                        needs_detailed_review = True
-                        print(f"      ⚠️ Baja autenticidad con alta fiabilidad - escalando a Judge (producción)")
-            except json.JSONDecodeError:
-                # Solo escalar en modo producción, en económico reintentar o rechazar
-                if USE_CHEAP_OPENROUTER_MODELS:
-                    print(f"   ⚠️ Error parseando JSON de MiMo, rechazando fuente (modo económico)")
-                    needs_detailed_review = False
-                else:
-                    print(f"   ⚠️ Error parseando JSON de MiMo, escalando a Judge")
-                    needs_detailed_review = True
-                mimo_evaluation = {}
-            except Exception as e:
-                # Solo escalar en modo producción, en económico reintentar o rechazar
-                if USE_CHEAP_OPENROUTER_MODELS:
-                    print(f"   ⚠️ Error en evaluación preliminar: {e}, rechazando fuente (modo económico)")
-                    needs_detailed_review = False
-                else:
-                    print(f"   ⚠️ Error en evaluación preliminar: {e}, escalando a Judge")
-                    needs_detailed_review = True
-                mimo_evaluation = {}
-        
-        # ==========================================
-        # FASE 2: Evaluación detallada con Judge (Cheap vs Premium)
-        # ==========================================
-        # Judge Cheap (DeepSeek): Por defecto para evaluaciones normales
-        # Judge Premium (Claude/Gemini): Solo para casos muy críticos
-        if needs_detailed_review:
-            # Seleccionar modelo de judge según criticidad
-            # Usar judge_cheap (DeepSeek) por defecto, judge_premium solo para casos muy críticos
-            use_premium_judge = False  # Por defecto usar cheap
-            
-            # Criterios para usar judge premium:
-            # - Fuentes de élite (Tier 1/2) con scores muy ambiguos
-            # - Contradicciones muy marcadas (alta fiabilidad + muy baja relevancia)
-            # - Casos donde MiMo tuvo muy baja confianza
-            if 'mimo_evaluation' in locals() and mimo_evaluation:
-                confidence = mimo_evaluation.get("confidence", "HIGH")
-                total_score_pre = float(mimo_evaluation.get("total_score", 0))
-                reliability_score_pre = float(mimo_evaluation.get("reliability_score", 0))
-                relevance_score_pre = float(mimo_evaluation.get("relevance_score", 0))
-                
-                # Usar premium si:
-                # 1. Confianza muy baja (UNCERTAIN)
-                # 2. Score en zona de escalado (entre JUDGE_ESCALATE_SCORE_LOW y JUDGE_ESCALATE_SCORE_HIGH)
-                # 3. Contradicción extrema (reliability >= 9 y relevance < 5)
-                if confidence == "UNCERTAIN" or (JUDGE_ESCALATE_SCORE_LOW <= total_score_pre <= JUDGE_ESCALATE_SCORE_HIGH) or (reliability_score_pre >= 9 and relevance_score_pre < 5):
-                    use_premium_judge = True
-            
-            # Seleccionar modelo
-            # En modo TEST, NO usar Claude Sonnet (llm_judge_premium), solo usar modelos de TEST
-            try:
-                from .model_routing import get_active_profile, Profile
-                active_profile = get_active_profile()
-                is_test_mode = (active_profile == Profile.TEST)
-            except ImportError:
-                is_test_mode = False
-            
-            if is_test_mode:
-                # En modo TEST, NO usar premium judge (Claude Sonnet), usar solo judge de TEST
-                if llm_judge:
-                    selected_judge = llm_judge
-                    judge_model_name = "TEST (xiaomi/mimo-v2-flash:free)"
-                elif llm_judge_cheap:
-                    selected_judge = llm_judge_cheap
-                    judge_model_name = "Cheap (MiMo)"
-                else:
-                    selected_judge = llm_judge
-                    judge_model_name = "Judge (TEST)"
-            elif use_premium_judge and llm_judge_premium:
-                selected_judge = llm_judge_premium
-                judge_model_name = "Premium (Claude Sonnet)"
-            elif llm_judge_cheap:
-                selected_judge = llm_judge_cheap
-                judge_model_name = "Cheap (MiMo)"
-            else:
-                # Fallback al judge por defecto de config.toml
-                selected_judge = llm_judge
-                judge_model_name = getattr(llm_judge, 'model_name', 'Judge') if hasattr(llm_judge, 'model_name') else 'Judge'
-                try:
-                    from .config import CURRENT_JUDGE_MODEL
-                    judge_model_name = CURRENT_JUDGE_MODEL
-                except:
-                    pass
-            
-            print(f"   🎯 Evaluación detallada con Judge {judge_model_name}: {domain[:30]}")
-            
-            # TRACKING: Guardar decisión de MiMo si existe para comparar después
-            # Recuperar de evaluation dict si existe (se creó arriba con _mimo_keep)
-            mimo_keep_for_tracking = None
-            if 'evaluation' in locals() and isinstance(locals().get('evaluation'), dict):
-                mimo_keep_for_tracking = locals().get('evaluation', {}).get('_mimo_keep')
-            elif 'mimo_keep_value' in locals():
-                mimo_keep_for_tracking = locals().get('mimo_keep_value')
-            
-            system_msg = f"""Eres un Analista de Calidad Senior especializado en Due Diligence y Evaluación de Fuentes.
-Tu misión es evaluar fuentes de información usando un método multidimensional estricto.
+        from .model_routing import get_active_profile, Profile
+        return get_active_profile() == Profile.TEST
+    except ImportError:
+        return False
 
-EVALUACIÓN MULTIDIMENSIONAL (Cada criterio: 0-10):
 
-1. AUTHENTICITY (Autenticidad):
-   - ¿Es la fuente genuina y verificable?
-   - ¿Puede verificarse la autoría y origen?
-   - 8-10: Fuentes oficiales verificables, documentos públicos, instituciones reconocidas
-   - 5-7: Fuentes con autoría clara pero menos verificables
-   - 0-4: Fuentes anónimas, no verificables, o sospechosas
+# El perfil se fija al arrancar (igual que los clientes LLM de config.py)
+_IS_TEST_MODE = _detect_test_mode()
 
-2. RELIABILITY (Fiabilidad):
-   - ¿Es una institución/autor reconocido y confiable?
-   - 8-10: Organismos oficiales, Think Tanks de élite, Papers académicos peer-reviewed, Consultoras de élite (McKinsey, BCG, Bain)
-   - 6-7: Consultoras especializadas, empresas líderes del sector con contenido educativo
+
+def refresh_profile() -> bool:
+    """Vuelve a leer el perfil activo (p.ej. tras cambiar ENV_PROFILE en tests)."""
+    global _IS_TEST_MODE
+    _IS_TEST_MODE = _detect_test_mode()
+    return _IS_TEST_MODE
+
+
+def _build_judge_router() -> Dict[Tuple[bool, bool], Tuple[object, str]]:
+    """
+    Tabla de selección del Judge: (is_test_mode, use_premium) -> (llm, nombre).
+    Los clientes LLM se crean al importar config, así que la tabla se construye una vez.
+    """
+    # En modo TEST, NO usar premium judge (Claude Sonnet), usar solo judge de TEST
+    if llm_judge:
+        test_route = (llm_judge, "TEST (xiaomi/mimo-v2-flash:free)")
+    elif llm_judge_cheap:
+        test_route = (llm_judge_cheap, "Cheap (MiMo)")
+    else:
+        test_route = (llm_judge, "Judge (TEST)")
+    
+    if llm_judge_cheap:
+        default_route = (llm_judge_cheap, "Cheap (MiMo)")
+    else:
+        # Fallback al judge por defecto de config.toml
+        try:
+            from .config import CURRENT_JUDGE_MODEL
+            judge_name = CURRENT_JUDGE_MODEL
+        except ImportError:
+            judge_name = getattr(llm_judge, 'model_name', 'Judge')
+        default_route = (llm_judge, judge_name)
+    
+    premium_route = (llm_judge_premium, "Premium (Claude Sonnet)") if llm_judge_premium else default_route
+    
+    return {
+        (True, False): test_route,
+        (True, True): test_route,
+        (False, False): default_route,
+        (False, True): premium_route,
+    }
+
+
+_JUDGE_ROUTER = _build_judge_router()
+
+
+# Judge: prompt de sistema estático (thresholds fijados al importar). Todo lo
+# variable va en el mensaje de usuario para que el prefijo sea cacheable
+_JUDGE_SYSTEM_MSG = f"""Eres un Analista de Calidad Senior especializado en Due Diligence y Evaluación de Fuentes.
+Tu misión es evaluar fuentes de información usando un método multidimensional estricto.
+
+EVALUACIÓN MULTIDIMENSIONAL (Cada criterio: 0-10):
+
+1. AUTHENTICITY (Autenticidad):
+   - ¿Es la fuente genuina y verificable?
+   - ¿Puede verificarse la autoría y origen?
+   - 8-10: Fuentes oficiales verificables, documentos públicos, instituciones reconocidas
+   - 5-7: Fuentes con autoría clara pero menos verificables
+   - 0-4: Fuentes anónimas, no verificables, o sospechosas
+
+2. RELIABILITY (Fiabilidad):
+   - ¿Es una institución/autor reconocido y confiable?
+   - 8-10: Organismos oficiales, Think Tanks de élite, Papers académicos peer-reviewed, Consultoras de élite (McKinsey, BCG, Bain)
+   - 6-7: Consultoras especializadas, empresas líderes del sector con contenido educativo
    - 5-7: Prensa financiera global, Big 4
    - 0-4: Blogs personales, foros, contenido puramente comercial
 
@@ -918,256 +761,1372 @@ REGLA CRÍTICA: keep = true SOLO si:
 
 EXCEPCIÓN: Si reliability_score >= 8 y total_score >= {TOTAL_SCORE_THRESHOLD} y relevance_score >= 6:
 - keep = true SOLO si authenticity_score >= {AUTHENTICITY_THRESHOLD}"""
-            
-            user_msg = f"""TEMA DE INVESTIGACIÓN: {context}
+
+
+def _judge_system_content(judge_llm):
+    """
+    Contenido del mensaje de sistema del Judge.
+    Para modelos Claude se marca como cacheable (cache_control), el resto de
+    proveedores cachean el prefijo automáticamente.
+    """
+    model_name = str(getattr(judge_llm, 'model_name', '') or '').lower()
+    if 'claude' in model_name or 'anthropic' in model_name:
+        return [{"type": "text", "text": _JUDGE_SYSTEM_MSG, "cache_control": {"type": "ephemeral"}}]
+    return _JUDGE_SYSTEM_MSG
+
+
+def _strip_markdown_json(content: str) -> str:
+    """
+    Quita los bloques markdown (```json ... ```) que envuelven la respuesta JSON del LLM.
+    
+    Con str.find + un único slice (sin listas intermedias); si falta el cierre
+    (respuesta truncada) se devuelve el resto del bloque.
+    """
+    start = content.find("```")
+    if start == -1:
+        return content
+    start += 3
+    if content.startswith("json", start):
+        start += 4
+    end = content.find("```", start)
+    return (content[start:end] if end != -1 else content[start:]).strip()
+
+
+class _SafeDict(dict):
+    """Dict para format_map: los campos que falten se rellenan con 'N/A'."""
+    def __missing__(self, key):
+        return 'N/A'
+
+
+# Mensajes de usuario por fuente: plantilla común + instrucción final de cada juez
+_SOURCE_USER_TPL = """TEMA DE INVESTIGACIÓN: {context}
     
 FUENTE CANDIDATA:
-- URL: {source.get('url', 'N/A')}
-- Título: {source.get('title', 'N/A')}
-- Dominio: {source.get('source_domain', 'N/A')}
-- Snippet: {source.get('snippet', 'N/A')[:300]}...
+- URL: {url}
+- Título: {title}
+- Dominio: {domain}
+- Snippet: {snippet}...
 
-Evalúa esta fuente detalladamente y responde ÚNICAMENTE en formato JSON."""
+"""
+_MIMO_USER_TPL = _SOURCE_USER_TPL + "Evalúa rápidamente esta fuente y responde ÚNICAMENTE en formato JSON."
+_JUDGE_USER_TPL = _SOURCE_USER_TPL + "Evalúa esta fuente detalladamente y responde ÚNICAMENTE en formato JSON."
 
-            response = await selected_judge.ainvoke([
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": user_msg}
-            ])
-            
-            content = response.content if hasattr(response, 'content') else str(response)
+
+def _source_prompt_fields(source: Dict, context: str) -> _SafeDict:
+    """Campos de la fuente para las plantillas (snippet recortado una sola vez para MiMo y Judge)."""
+    fields = _SafeDict(context=context)
+    for key, field in (('url', 'url'), ('title', 'title'), ('source_domain', 'domain')):
+        if key in source:
+            fields[field] = source[key]
+    if 'snippet' in source:
+        fields['snippet'] = (source['snippet'] or '')[:300]
+    return fields
+
+
+def _build_mimo_batch_user_msg(sources: List[Dict], context: str) -> str:
+    """Mensaje de usuario para pre-evaluar varias fuentes en una sola llamada MiMo."""
+    records = [
+        {
+            "index": i,
+            "url": source.get('url', 'N/A'),
+            "title": source.get('title', 'N/A'),
+            "domain": source.get('source_domain', 'N/A'),
+            "snippet": (source.get('snippet') or 'N/A')[:300],
+        }
+        for i, source in enumerate(sources)
+    ]
+    return f"""TEMA DE INVESTIGACIÓN: {context}
+
+FUENTES CANDIDATAS ({len(records)}):
+{json.dumps(records, ensure_ascii=False, indent=1)}
+
+Evalúa rápidamente cada fuente y responde ÚNICAMENTE con el objeto JSON {{"evaluations": [...]}}."""
+
+
+async def evaluate_source(source: Dict, context: str) -> Optional[Dict]:
+    """
+    Evalúa la calidad y relevancia de una fuente usando método multidimensional.
+    
+    OPTIMIZACIONES:
+    1. Cache hit: Retorna evaluación previa si existe
+    2. Fast-track élite: Dominios de élite saltan LLM
+    3. Auto-reject: Dominios en blacklist se rechazan sin LLM
+    4. Pre-juez MiMo: solo los casos dudosos escalan a Judge
+    
+    Args:
+        source: Dict con info de la fuente (title, url, snippet, source_domain)
+        context: Contexto/tema para evaluar relevancia
+    
+    Returns:
+        Dict con scores multidimensionales, keep y reasoning, o None si error
+    
+    Raises:
+        CacheMissError: en modo de cache REPLAY, si la fuente necesitaría LLM
+    """
+    if not source.get("url"):
+        return None
+    
+    result = _evaluate_without_llm(source, context)
+    if result is not None:
+        return result
+    
+    if CACHE_MODE is CacheMode.REPLAY:
+        raise CacheMissError(f"Sin evaluación cacheada (modo REPLAY): {source.get('url')}")
+    
+    return await _evaluate_with_llm(source, context)
+
+
+# Pre-filtro barato: marcadores de clickbait en el título (el Judge nunca acepta clickbait)
+_CLICKBAIT_RE = re.compile(
+    r"\b(shocking|you won'?t believe|this one trick|top \d+ (?:reasons|secrets|tricks)|goes viral"
+    r"|no creerás|increíble truco|te sorprenderá)\b",
+    re.I
+)
+_TITLE_LEN_MIN = 20
+
+
+def _cheap_prefilter_reason(title: str, snippet: str) -> Optional[str]:
+    """
+    Motivo de rechazo sin LLM para fuentes no-élite, o None si deben evaluarse.
+    
+    - Título con marcadores de clickbait
+    - Título muy corto y sin snippet: no hay nada que evaluar
+    """
+    title = (title or "").strip()
+    if title and _CLICKBAIT_RE.search(title):
+        return "clickbait"
+    if len(title) < _TITLE_LEN_MIN and not (snippet or "").strip():
+        return "sin contenido evaluable"
+    return None
+
+
+# Escritor en segundo plano del cache por URL: las evaluaciones se encolan en memoria
+# (visibles ya para las lecturas) y una única tarea las vuelca a disco en un hilo
+_cache_flush_task: Optional[asyncio.Task] = None
+
+
+def _cache_write(url: str, evaluation: Dict, context: str):
+    """Encola la evaluación en el cache y programa su volcado fuera del camino crítico."""
+    global _cache_flush_task
+    queue_cache_evaluation(url, evaluation, context)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_cache_evaluations()
+        return
+    if _cache_flush_task is None or _cache_flush_task.done() or _cache_flush_task.get_loop() is not loop:
+        _cache_flush_task = loop.create_task(_cache_writer())
+
+
+async def _cache_writer():
+    """Vuelca en bloque lo encolado hasta vaciar la cola (una lectura+escritura por vuelta)."""
+    while has_pending_cache_writes():
+        await asyncio.to_thread(flush_cache_evaluations)
+
+
+async def flush_pending_cache_writes():
+    """Espera a que todas las evaluaciones encoladas estén escritas en disco."""
+    task = _cache_flush_task
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        await task
+    if has_pending_cache_writes():
+        await asyncio.to_thread(flush_cache_evaluations)
+
+
+def _mentions_company(company_name: str, url: str, domain: str, title: str) -> bool:
+    """True si la URL, el dominio o el título mencionan a la empresa (fuente interna)."""
+    url_lower, domain_lower = _url_domain_lower(url, domain)
+    return company_name in url_lower or company_name in domain_lower or company_name in title.lower()
+
+
+def _evaluate_without_llm(
+    source: Dict, context: str, url_cache: Optional[Dict[str, Dict]] = None
+) -> Optional[Dict]:
+    """
+    Pasos sin LLM: auto-reject, cache, pre-score de dominio élite, pre-filtro de fuentes
+    internas y pre-filtro barato (clickbait / sin contenido).
+    
+    Args:
+        url_cache: evaluaciones cacheadas ya leídas en batch (get_cached_evaluations);
+            None para consultar el cache de esta URL
+    
+    Returns:
+        Resultado final o None si la fuente necesita evaluación con LLM
+    """
+    url = source.get('url', '')
+    domain = source.get('source_domain', '')
+    
+    # ==========================================
+    # PASO 1: AUTO-REJECT (determinista, antes de cualquier cache)
+    # ==========================================
+    elite_info = get_elite_domain_scores(url)
+    
+    if elite_info and elite_info.get('auto_reject'):
+        _logger.debug("   🚫 Auto-reject: %s", elite_info.get('domain', domain))
+        # Sin cache_evaluation: la decisión sale de la lista en cada ejecución
+        return {
+            **source,
+            "authenticity_score": 0,
+            "reliability_score": 0,
+            "relevance_score": 0,
+            "currency_score": 0,
+            "total_score": 0,
+            "is_clickbait": False,
+            "keep": False,
+            "reasoning": elite_info.get('reason', 'Dominio en lista de rechazo automático'),
+            "score": 0,
+            "reason": elite_info.get('reason', 'Auto-rejected'),
+            "fast_track": "auto_reject"
+        }
+    
+    # ==========================================
+    # PASO 1b: CHECK CACHE
+    # ==========================================
+    cached = get_cached_evaluation(url, context) if url_cache is None else url_cache.get(url)
+    if cached:
+        _logger.debug("   💾 Cache hit: %s", domain[:30])
+        # Merge cached evaluation con source data
+        result = {**source, **cached}
+        result["score"] = cached.get("total_score", 0)
+        result["reason"] = cached.get("reasoning", "")
+        result["from_cache"] = True
+        return result
+    
+    # PASO 1c: misma fuente (título+snippet) ya evaluada para este tema en otra URL
+    category = classify_source(url, domain)[0]
+    cached = get_semantic_cached_evaluation(context, source.get('title', ''), source.get('snippet', ''), category)
+    if cached:
+        _logger.debug("   💾 Cache hit (contenido, sim=%s): %s", cached['semantic_similarity'], domain[:30])
+        if cached['semantic_similarity'] < 1.0:
+            # Match aproximado: los scores vienen escalados por la similitud, recalcular keep
+            _apply_keep_rules(cached, category)
+        result = {**source, **cached}
+        result["score"] = cached.get("total_score", 0)
+        result["reason"] = cached.get("reasoning", "")
+        result["from_cache"] = True
+        return result
+    
+    # ==========================================
+    # PASO 2: DOMINIO ÉLITE (pre-score)
+    # ==========================================
+    if elite_info:
+        # POLICY 2: Elite pre-score (no auto-keep)
+        if EVAL_ELITE_FAST_TRACK_ENABLED:
+            result = _elite_prescore(source, context, elite_info)
+            if result is not None:
+                return result
+            # Else: continue to LLM evaluation (fall through to MiMo/Judge flow below)
+    
+    # ==========================================
+    # PASO 3: PRE-FILTRO HARD (Fuentes internas de la empresa)
+    # ==========================================
+    # NOTA: El filtrado de fuentes internas ahora se hace basándose en el contexto de Airtable
+    # No se usa COMPANY_CONTEXT del JSON, se usa project_specific_context de Airtable
+    # Por ahora, no filtramos por nombre de empresa (el contexto de Airtable puede contener esta información)
+    # Si necesitas filtrar fuentes internas, añade esa lógica basándose en project_specific_context
+    company_name = ""  # Ya no se usa COMPANY_CONTEXT del JSON
+    
+    # Filtrar fuentes internas si el nombre de la empresa está disponible
+    # (Esta lógica se puede mejorar para usar el contexto de Airtable)
+    # Las versiones en minúsculas solo se calculan si hay empresa que filtrar
+    if company_name and _mentions_company(company_name, url, domain, source.get('title', '')):
+        _logger.debug("   🚫 Pre-filtro interno: %s", domain)
+        result = {
+            **source,
+            "authenticity_score": 10,
+            "reliability_score": 10,
+            "relevance_score": 0,
+            "currency_score": 0,
+            "total_score": 4,
+            "is_clickbait": False,
+            "keep": False,
+            "reasoning": f"Rechazada: Fuente interna de la empresa (contexto proporcionado internamente).",
+            "score": 4,
+            "reason": "Internal source filtered",
+            "fast_track": "internal_filter"
+        }
+        _cache_write(url, result, context)
+        return result
+    
+    # ==========================================
+    # PASO 4: PRE-FILTRO BARATO (clickbait / sin contenido evaluable)
+    # ==========================================
+    # Solo fuentes no-élite: las élite en zona gris siempre llegan al LLM
+    reject_reason = None if elite_info else _cheap_prefilter_reason(source.get('title', ''), source.get('snippet', ''))
+    if reject_reason:
+        _logger.debug("   🚫 Pre-filtro barato: %s (%s)", domain[:30], reject_reason)
+        result = {
+            **source,
+            "authenticity_score": 0,
+            "reliability_score": 0,
+            "relevance_score": 0,
+            "currency_score": 0,
+            "total_score": 0,
+            "is_clickbait": reject_reason == "clickbait",
+            "keep": False,
+            "reasoning": f"Cheap pre-filter: {reject_reason}",
+            "score": 0,
+            "reason": f"Cheap pre-filter: {reject_reason}",
+            "fast_track": "cheap_prefilter"
+        }
+        _cache_write(url, result, context)
+        return result
+    
+    return None
+
+
+# Reranker de zona gris: se carga una sola vez (lazy, CPU) si está configurado
+_gray_zone_reranker = None
+_gray_zone_reranker_loaded = False
+
+
+def _get_gray_zone_reranker():
+    """Carga el cross-encoder configurado; None si está desactivado o no disponible."""
+    global _gray_zone_reranker, _gray_zone_reranker_loaded
+    if _gray_zone_reranker_loaded:
+        return _gray_zone_reranker
+    _gray_zone_reranker_loaded = True
+    if not EVAL_GRAY_ZONE_RERANKER_MODEL:
+        return None
+    try:
+        from sentence_transformers import CrossEncoder
+        _gray_zone_reranker = CrossEncoder(EVAL_GRAY_ZONE_RERANKER_MODEL, device="cpu")
+        _logger.info("   ✅ Reranker de zona gris cargado: %s", EVAL_GRAY_ZONE_RERANKER_MODEL)
+    except ImportError:
+        _logger.warning("   ⚠️ sentence-transformers no instalado, zona gris se evalúa con LLM")
+    except Exception as e:
+        _logger.warning("   ⚠️ No se pudo cargar el reranker de zona gris: %s", e)
+    return _gray_zone_reranker
+
+
+def gray_zone_rerank_score(context: str, title: str, snippet: str) -> Optional[float]:
+    """
+    Puntúa (context, título+snippet) con el reranker local.
+    
+    Returns:
+        Score 0-1 o None si no hay reranker o contenido que puntuar
+    """
+    if not (title or snippet):
+        return None
+    reranker = _get_gray_zone_reranker()
+    if reranker is None:
+        return None
+    try:
+        score = float(reranker.predict([(context, f"{title} {snippet}")])[0])
+    except Exception as e:
+        _logger.warning("   ⚠️ Error en reranker: %s", e)
+        return None
+    # Algunos cross-encoders devuelven logits: normalizar a 0-1
+    if not 0.0 <= score <= 1.0:
+        score = 1.0 / (1.0 + math.exp(-score))
+    return score
+
+
+def _elite_prescore(source: Dict, context: str, elite_info: Dict) -> Optional[Dict]:
+    """
+    POLICY 2: Pre-score determinístico para dominios de élite (sin LLM).
+    
+    Returns:
+        Resultado final (cacheado) o None si la fuente cae en zona gris y requiere LLM
+    """
+    url = source.get('url', '')
+    domain = source.get('source_domain', '')
+    
+    _logger.debug("   ⚡ Pre-score élite: %s (Tier %s)", elite_info.get('domain', domain), elite_info.get('tier', '?'))
+    
+    # Compute deterministic pre-scores
+    title = source.get('title', '')
+    snippet = source.get('snippet', '')
+    category, is_methodological, consulting_priority = classify_source(url, domain)
+    relevance = quick_relevance_score(context, title, snippet)
+    currency = estimate_currency_score(title, snippet)
+    authenticity = float(elite_info.get('authenticity', 9))
+    reliability = float(elite_info.get('reliability', 8))
+    
+    # Calculate total_score
+    total_score = (authenticity + reliability + relevance + currency) / 4.0
+    
+    # Apply category adjustments with prioritization
+    # PRIORIZACIÓN: Fuentes metodológicas tienen máxima prioridad (aplicable a TODOS los sectores)
+    if is_methodological:
+        total_score += 1.0  # Bonus significativo para fuentes metodológicas (organismos internacionales, think tanks tier-1, agencias gubernamentales - multisector)
+    elif category == 'consulting':
+        # Priorizar consultoras específicas (Deloitte/PwC/KPMG para industria; McKinsey/BCG/Bain para estrategia)
+        if consulting_priority == 2:  # Alta prioridad
+            if relevance >= EVAL_CONSULTING_MIN_RELEVANCE:
+                total_score += 0.3  # Bonus para consultoras prioritarias con buena relevancia
+            else:
+                total_score -= 0.75  # Penalización si relevancia baja
+        elif consulting_priority == 1:  # Prioridad media
+            if relevance < EVAL_CONSULTING_MIN_RELEVANCE:
+                total_score -= 0.75
+        else:  # Baja prioridad o no reconocida
+            if relevance < EVAL_CONSULTING_MIN_RELEVANCE:
+                total_score -= 1.0  # Penalización mayor para consultoras no prioritarias
+            else:
+                total_score -= 0.25  # Pequeña penalización incluso si relevancia es buena
+    elif category == 'institutional':
+        total_score += 0.5  # Bonus para institucionales (fuentes primarias)
+    elif category == 'academic':
+        total_score += 0.5  # Bonus para académicas (fuentes primarias)
+    elif category == 'general_media':
+        # Penalizar medios generalistas/confidenciales (priorizar fuentes primarias)
+        total_score -= 0.5  # Penalización para priorizar fuentes primarias
+        if relevance < EVAL_GENERAL_MEDIA_MIN_RELEVANCE:
+            total_score -= 0.75  # Penalización adicional si relevancia baja
+    
+    total_score = round(max(0.0, min(10.0, total_score)), 1)
+    
+    # Gray zone decision
+    needs_llm_review = False
+    if EVAL_GRAY_ZONE_ENABLED:
+        if total_score <= EVAL_GRAY_ZONE_LOW_REJECT:
+            keep_value = False
+            reasoning_pre = f"Pre-score rechazado (total={total_score:.1f} <= {EVAL_GRAY_ZONE_LOW_REJECT})"
+        elif total_score >= EVAL_GRAY_ZONE_HIGH_ACCEPT:
+            # Fast accept, but apply hard rules
+            keep_value = True
+            reasoning_pre = f"Pre-score aceptado (total={total_score:.1f} >= {EVAL_GRAY_ZONE_HIGH_ACCEPT})"
         else:
-            # Usar evaluación preliminar de MiMo como final, pero calcular "keep" correctamente
-            print(f"      ✅ Evaluación MiMo suficiente (confidence: {mimo_evaluation.get('confidence', 'HIGH')})")
-            
-            # Convertir evaluación preliminar a formato final, calculando "keep"
-            total_score_pre = float(mimo_evaluation.get("total_score", 0))
-            relevance_score_pre = float(mimo_evaluation.get("relevance_score", 0))
-            reliability_score_pre = float(mimo_evaluation.get("reliability_score", 0))
-            is_clickbait_pre = mimo_evaluation.get("is_clickbait", False)
-            
-            # Calcular "keep" con las mismas reglas que Judge (con thresholds mínimos individuales)
-            authenticity_score_pre = float(mimo_evaluation.get("authenticity_score", 0))
-            
-            if is_clickbait_pre:
-                keep_value = False
-            elif (total_score_pre >= TOTAL_SCORE_THRESHOLD and 
-                  relevance_score_pre >= RELEVANCE_THRESHOLD and
-                  authenticity_score_pre >= AUTHENTICITY_THRESHOLD and
-                  reliability_score_pre >= RELIABILITY_THRESHOLD):
-                # Cumple todos los thresholds: total, relevance, authenticity y reliability
+            # Gray zone: el reranker local decide los casos claros; el resto va a LLM
+            rerank_score = gray_zone_rerank_score(context, title, snippet)
+            if rerank_score is not None and rerank_score >= EVAL_GRAY_ZONE_RERANKER_ACCEPT:
                 keep_value = True
-            elif reliability_score_pre >= 8 and total_score_pre >= TOTAL_SCORE_THRESHOLD and relevance_score_pre >= 6:
-                # Excepción para fuentes de alta fiabilidad (reliability >= 8)
-                # Aún requiere authenticity mínimo
-                if authenticity_score_pre >= AUTHENTICITY_THRESHOLD:
-                    keep_value = True
-                else:
-                    keep_value = False
-            else:
+                reasoning_pre = f"Gray zone (total={total_score:.1f}) aceptado por reranker (rerank_score={rerank_score:.2f})"
+            elif rerank_score is not None and rerank_score <= EVAL_GRAY_ZONE_RERANKER_REJECT:
                 keep_value = False
-            
-            # TRACKING: Registrar decisión de MiMo
-            mimo_keep_value = keep_value  # Guardar para comparar después con Gemini
-            if keep_value:
-                _mimo_judge_metrics['mimo_accepted'] += 1
+                reasoning_pre = f"Gray zone (total={total_score:.1f}) rechazado por reranker (rerank_score={rerank_score:.2f})"
             else:
-                _mimo_judge_metrics['mimo_rejected'] += 1
-            
-            # Crear evaluación final con formato estándar
-            evaluation = {
-                "authenticity_score": float(mimo_evaluation.get("authenticity_score", 0)),
-                "reliability_score": float(mimo_evaluation.get("reliability_score", 0)),
-                "relevance_score": float(mimo_evaluation.get("relevance_score", 0)),
-                "currency_score": float(mimo_evaluation.get("currency_score", 0)),
-                "total_score": total_score_pre,
-                "is_clickbait": is_clickbait_pre,
-                "keep": keep_value,
-                "reasoning": mimo_evaluation.get("reasoning", "Evaluación preliminar con MiMo") + " [Pre-juez MiMo]",
-                "pre_judge": "mimo",
-                "confidence": mimo_evaluation.get("confidence", "HIGH"),
-                "_mimo_keep": keep_value  # Guardar decisión de MiMo para tracking después
-            }
-            # Si viene de MiMo (no escaló), ya tenemos el evaluation parseado
-            # Si viene de Gemini, necesitamos parsear el content
-            if needs_detailed_review:
-                # Viene de Gemini, parsear content
-                # Guardar decisión de MiMo para comparar después (ya está en evaluation["_mimo_keep"])
-                pass  # Continuar con el parsing de content abajo
-            else:
-                # Viene de MiMo, ya tenemos evaluation listo
-                # Saltar directamente a la validación final
-                result = {**source, **evaluation}
-                result["score"] = evaluation["total_score"]
-                result["reason"] = evaluation["reasoning"]
-                result["fast_track"] = None
-                cache_evaluation(url, evaluation)
-                return result
+                needs_llm_review = True
+                keep_value = None  # Undecided, LLM will decide
+                reasoning_pre = f"Gray zone (total={total_score:.1f}), requiere LLM"
+    else:
+        # No gray zone: use standard thresholds
+        keep_value = (total_score >= TOTAL_SCORE_THRESHOLD and relevance >= RELEVANCE_THRESHOLD)
+        reasoning_pre = f"Pre-score evaluado (total={total_score:.1f}, relevance={relevance:.1f})"
+    
+    # Apply hard rules (even for fast accept)
+    if keep_value is not False:  # If not already rejected
+        if category == 'consulting' and relevance < EVAL_CONSULTING_MIN_RELEVANCE:
+            keep_value = False
+            reasoning_pre += f" | Regla hard: consulting requiere relevance>={EVAL_CONSULTING_MIN_RELEVANCE}"
+        elif category == 'general_media' and relevance < EVAL_GENERAL_MEDIA_MIN_RELEVANCE:
+            keep_value = False
+            reasoning_pre += f" | Regla hard: medios generalistas/confidenciales requieren relevance>={EVAL_GENERAL_MEDIA_MIN_RELEVANCE} | Priorizar fuentes primarias"
+        elif category == 'institutional' and relevance >= EVAL_INSTITUTIONAL_MIN_RELEVANCE:
+            # Institutional may pass with lower relevance if other scores are strong
+            if total_score >= TOTAL_SCORE_THRESHOLD - 0.5:
+                keep_value = True
+                reasoning_pre += " | Regla hard: institutional con scores fuertes"
+    
+    # If not in gray zone or LLM unavailable, return pre-score result
+    if not needs_llm_review:
+        result = {
+            **source,
+            "authenticity_score": authenticity,
+            "reliability_score": reliability,
+            "relevance_score": relevance,
+            "currency_score": currency,
+            "total_score": total_score,
+            "is_clickbait": False,
+            "keep": keep_value,
+            "reasoning": f"Policy 2 pre-score [{category}]: {reasoning_pre}",
+            "score": total_score,
+            "reason": f"Elite pre-score: {elite_info.get('domain', domain)}",
+            "fast_track": "elite_prescore",
+            "source_category": category
+        }
+        _cache_write(url, result, context)
+        return result
+    # Gray zone: continuar con evaluación LLM (MiMo/Judge)
+    return None
+
+
+async def _evaluate_with_llm(source: Dict, context: str) -> Optional[Dict]:
+    """
+    PASO 5: Pre-evaluación con MiMo (pre-juez barato) y, si hace falta,
+    evaluación detallada con Judge.
+    """
+    domain = source.get('source_domain', '')
+    prompt_fields = _source_prompt_fields(source, context)
+    
+    try:
+        # ==========================================
+        # FASE 1: Evaluación preliminar con MiMo-V2-Flash (barato)
+        # ==========================================
+        _logger.debug("   🔍 Pre-evaluación con MiMo: %s", domain[:30])
+        mimo_content = await _invoke_mimo([
+            {"role": "system", "content": _MIMO_SYSTEM_MSG},
+            {"role": "user", "content": _MIMO_USER_TPL.format_map(prompt_fields)}
+        ], _MIMO_EVAL_SCHEMA)
+        mimo_evaluation, needs_detailed_review = _review_mimo_content(mimo_content, domain)
         
-        # Si llegamos aquí, necesitamos parsear content (viene de Gemini)
-        # Limpiar markdown si existe
-        if "```" in content:
-            if "```json" in content:
-                content = content.split("```json")[-1].split("```")[0].strip()
+        # ==========================================
+        # FASE 2: Evaluación detallada con Judge (si MiMo no basta)
+        # ==========================================
+        return await _finalize_evaluation(source, context, mimo_evaluation, needs_detailed_review, prompt_fields)
+    except Exception as e:
+        _logger.warning("   ⚠️ Error en evaluate_source: %s", e)
+        return None
+
+
+class TransientLLMError(Exception):
+    """Error transitorio del proveedor LLM (429, 502, 503...): se puede reintentar."""
+
+
+_LLM_MAX_RETRIES = 3
+
+
+def _is_transient_llm_error(e: Exception) -> bool:
+    """Detecta errores transitorios (429 rate limit, 502 bad gateway, 503 service unavailable)."""
+    error_msg = str(e)
+    error_str = error_msg.lower()
+    return (
+        "429" in error_msg or "rate limit" in error_str or "rate-limited" in error_str or
+        "502" in error_msg or "bad gateway" in error_str or
+        "503" in error_msg or "service unavailable" in error_str or
+        "provider returned error" in error_str
+    )
+
+
+async def _invoke_with_classification(llm, messages: List[Dict]):
+    """
+    ainvoke/astream bajo los buckets RPM/TPM y el semáforo del evaluador; los errores
+    transitorios se re-lanzan como TransientLLMError.
+    """
+    request_bucket = _get_request_bucket()
+    if request_bucket is not None:
+        await request_bucket.acquire(1)
+    bucket = _get_token_bucket()
+    if bucket is not None:
+        await bucket.acquire(_estimate_request_tokens(messages))
+    try:
+        async with _get_eval_semaphore():
+            if EVAL_STREAM_LLM and hasattr(llm, 'astream'):
+                response = await _astream_json(llm, messages)
             else:
-                content = content.split("```")[1].split("```")[0].strip()
+                response = await llm.ainvoke(messages)
+    except Exception as e:
+        if _is_transient_llm_error(e):
+            raise TransientLLMError(str(e)) from e
+        raise
+    _record_usage(response, messages)
+    return response
+
+
+def _log_llm_retry(retry_state):
+    """Log de tenacity antes de cada espera."""
+    error_msg = str(retry_state.outcome.exception())
+    _logger.warning("   ⚠️ Error transitorio (intento %s/%s): %s... Esperando %.1fs...", retry_state.attempt_number, _LLM_MAX_RETRIES, error_msg[:100], retry_state.next_action.sleep)
+
+
+async def _ainvoke_with_retry(llm, messages: List[Dict]):
+    """
+    Invoca el LLM reintentando solo errores transitorios, con backoff exponencial
+    aleatorio (evita que las llamadas concurrentes reintenten a la vez tras un 429).
+    La espera ocurre fuera del semáforo.
+    
+    Raises:
+        TransientLLMError si se agotan los reintentos; otros errores sin reintentar
+    """
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception_type(TransientLLMError),
+        wait=wait_random_exponential(multiplier=2, max=30),
+        stop=stop_after_attempt(_LLM_MAX_RETRIES),
+        before_sleep=_log_llm_retry,
+        reraise=True,
+    ):
+        with attempt:
+            return await _invoke_with_classification(llm, messages)
+
+
+# Structured output (json_schema): el proveedor garantiza JSON válido con todos los campos
+_SCORE_PROPERTY = {"type": "number"}
+_MIMO_EVAL_SCHEMA = ("mimo_source_eval", {
+    "type": "object",
+    "properties": {
+        "authenticity_score": _SCORE_PROPERTY,
+        "reliability_score": _SCORE_PROPERTY,
+        "relevance_score": _SCORE_PROPERTY,
+        "currency_score": _SCORE_PROPERTY,
+        "total_score": _SCORE_PROPERTY,
+        "is_clickbait": {"type": "boolean"},
+        "confidence": {"type": "string", "enum": ["HIGH", "PARTIAL", "UNCERTAIN"]},
+        "needs_detailed_review": {"type": "boolean"},
+        "reasoning": {"type": "string"},
+    },
+    "required": [
+        "authenticity_score", "reliability_score", "relevance_score", "currency_score",
+        "total_score", "is_clickbait", "confidence", "needs_detailed_review", "reasoning"
+    ],
+    "additionalProperties": False,
+})
+# Batch: la raíz de json_schema debe ser un objeto, así que el array va envuelto en "evaluations"
+_MIMO_BATCH_EVAL_SCHEMA = ("mimo_source_eval_batch", {
+    "type": "object",
+    "properties": {
+        "evaluations": {
+            "type": "array",
+            "items": {
+                **_MIMO_EVAL_SCHEMA[1],
+                "properties": {"index": {"type": "integer"}, **_MIMO_EVAL_SCHEMA[1]["properties"]},
+                "required": ["index", *_MIMO_EVAL_SCHEMA[1]["required"]],
+            },
+        },
+    },
+    "required": ["evaluations"],
+    "additionalProperties": False,
+})
+_JUDGE_EVAL_SCHEMA = ("judge_source_eval", {
+    "type": "object",
+    "properties": {
+        "authenticity_score": _SCORE_PROPERTY,
+        "reliability_score": _SCORE_PROPERTY,
+        "relevance_score": _SCORE_PROPERTY,
+        "currency_score": _SCORE_PROPERTY,
+        "total_score": _SCORE_PROPERTY,
+        "is_clickbait": {"type": "boolean"},
+        "keep": {"type": "boolean"},
+        "reasoning": {"type": "string"},
+    },
+    "required": [
+        "authenticity_score", "reliability_score", "relevance_score", "currency_score",
+        "total_score", "is_clickbait", "keep", "reasoning"
+    ],
+    "additionalProperties": False,
+})
+
+# Modelos que rechazaron response_format: no se vuelve a intentar con ellos
+_structured_output_unsupported = set()
+
+
+def _with_structured_output(llm, schema: Tuple[str, Dict]):
+    """
+    Devuelve el LLM con response_format json_schema si es un cliente OpenAI-compatible
+    (OpenAI, DeepSeek, OpenRouter); en otro caso el LLM sin cambios.
+    """
+    if not EVAL_STRUCTURED_OUTPUT or not isinstance(llm, ChatOpenAI) or id(llm) in _structured_output_unsupported:
+        return llm
+    name, json_schema = schema
+    kwargs = {
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": name, "schema": json_schema, "strict": True},
+        }
+    }
+    if "openrouter" in str(getattr(llm, 'openai_api_base', '') or ''):
+        # OpenRouter: enrutar solo a proveedores que soporten response_format
+        kwargs["extra_body"] = {"provider": {"require_parameters": True}}
+    return llm.bind(**kwargs)
+
+
+# Single-flight + LRU de respuestas: peticiones idénticas (mismo cliente, mensajes y schema)
+# a modelos deterministas (temperature=0) comparten una sola llamada en el proceso
+_RESPONSE_CACHE_MAXSIZE = 256
+_response_cache: "OrderedDict[str, object]" = OrderedDict()
+_inflight_requests: Dict[str, asyncio.Future] = {}
+# Resultado del Future compartido cuando la corrutina líder se cancela: los que esperaban
+# repiten la llamada (uno de ellos pasa a ser el líder) en vez de recibir su cancelación
+_LEADER_CANCELLED = object()
+
+
+def _response_cache_key(llm, messages: List[Dict], schema: Optional[Tuple[str, Dict]]) -> Optional[str]:
+    """
+    Clave de la petición, o None si el modelo no es determinista. El cliente se identifica
+    por atributos estables (clase, modelo, endpoint, max_tokens), no por id(): un id puede
+    reutilizarse tras recolectar un cliente (p. ej. después de refresh_profile).
+    """
+    if getattr(llm, 'temperature', None) not in (0, 0.0):
+        return None
+    client = [
+        type(llm).__name__, getattr(llm, 'model_name', ''),
+        getattr(llm, 'openai_api_base', None), getattr(llm, 'max_tokens', None),
+    ]
+    payload = json.dumps(
+        [client, messages, schema[0] if schema else None],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+async def _ainvoke_llm(llm, messages: List[Dict], schema: Optional[Tuple[str, Dict]] = None):
+    """
+    Invoca el LLM con deduplicación: respuesta cacheada si la petición ya se hizo,
+    o espera a la llamada en curso si otra corrutina la está haciendo.
+    """
+    key = _response_cache_key(llm, messages, schema)
+    if key is None:
+        return await _ainvoke_llm_uncached(llm, messages, schema)
+    
+    if key in _response_cache:
+        _response_cache.move_to_end(key)
+        return _response_cache[key]
+    
+    inflight = _inflight_requests.get(key)
+    if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+        response = await asyncio.shield(inflight)
+        if response is _LEADER_CANCELLED:
+            return await _ainvoke_llm(llm, messages, schema)
+        return response
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight_requests[key] = future
+    try:
+        response = await _ainvoke_llm_uncached(llm, messages, schema)
+    except asyncio.CancelledError:
+        # Solo se cancela el líder: la entrada se retira (finally) y los demás reintentan
+        future.set_result(_LEADER_CANCELLED)
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Marcar como recuperada si nadie más esperaba
+        raise
+    finally:
+        if _inflight_requests.get(key) is future:
+            del _inflight_requests[key]
+    
+    future.set_result(response)
+    _response_cache[key] = response
+    if len(_response_cache) > _RESPONSE_CACHE_MAXSIZE:
+        _response_cache.popitem(last=False)
+    return response
+
+
+async def _ainvoke_llm_uncached(llm, messages: List[Dict], schema: Optional[Tuple[str, Dict]] = None):
+    """
+    Invoca el LLM (con reintentos) pidiendo structured output si hay schema.
+    Si el modelo/proveedor rechaza response_format (400 que lo menciona), se repite sin él
+    y se recuerda; cualquier otro error se propaga sin desactivar el structured output.
+    """
+    structured_llm = _with_structured_output(llm, schema) if schema else llm
+    if structured_llm is llm:
+        return await _ainvoke_with_retry(llm, messages)
+    try:
+        return await _ainvoke_with_retry(structured_llm, messages)
+    except TransientLLMError:
+        raise
+    except Exception as e:
+        if not is_response_format_rejection(e):
+            raise
+        _logger.warning("   ⚠️ Structured output no soportado (%s), usando JSON por prompt", str(e)[:100])
+        _structured_output_unsupported.add(id(llm))
+        return await _ainvoke_with_retry(llm, messages)
+
+
+async def _invoke_mimo(messages: List[Dict], schema: Optional[Tuple[str, Dict]] = None) -> Optional[str]:
+    """
+    Invoca al pre-juez MiMo con reintentos para errores transitorios.
+    schema: structured output (_MIMO_EVAL_SCHEMA o _MIMO_BATCH_EVAL_SCHEMA)
+    
+    Returns:
+        Contenido de la respuesta o None si fallan todos los intentos
+    """
+    # Usar llm_mimo_cheap para pre-evaluación (más económico)
+    # Si no está disponible, usar llm_planner como fallback
+    llm_pre_eval = llm_mimo_cheap if llm_mimo_cheap else llm_planner
+    
+    try:
+        mimo_response = await _ainvoke_llm(llm_pre_eval, messages, schema)
+    except TransientLLMError:
+        if USE_CHEAP_OPENROUTER_MODELS:
+            # En modo económico, no escalar - rechazar fuente
+            _logger.warning("   ⚠️ Error persistente después de %s intentos con MiMo, rechazando fuente (modo económico)", _LLM_MAX_RETRIES)
+        else:
+            _logger.warning("   ⚠️ Error persistente después de %s intentos con MiMo, escalando a Judge", _LLM_MAX_RETRIES)
+        return None
+    
+    return mimo_response.content if hasattr(mimo_response, 'content') else str(mimo_response)
+
+
+def _review_mimo_content(mimo_content: Optional[str], domain: str) -> Tuple[Dict, bool]:
+    """
+    Parsea la respuesta de MiMo y decide si escalar a Judge.
+    
+    Returns:
+        Tuple (mimo_evaluation, needs_detailed_review)
+    """
+    # Si MiMo no respondió, decidir qué hacer según modo
+    if mimo_content is None:
+        # En modo económico, no escalar - rechazar fuente
+        if USE_CHEAP_OPENROUTER_MODELS:
+            needs_detailed_review = False
+        else:
+            needs_detailed_review = True
+        mimo_evaluation = {}
+        return mimo_evaluation, needs_detailed_review
+    
+    # Limpiar markdown si existe
+    mimo_content = _strip_markdown_json(mimo_content)
+    
+    try:
+        mimo_evaluation = json_loads(mimo_content)
+    except json.JSONDecodeError:
+        # Solo escalar en modo producción, en económico reintentar o rechazar
+        if USE_CHEAP_OPENROUTER_MODELS:
+            _logger.warning("   ⚠️ Error parseando JSON de MiMo, rechazando fuente (modo económico)")
+            needs_detailed_review = False
+        else:
+            _logger.warning("   ⚠️ Error parseando JSON de MiMo, escalando a Judge")
+            needs_detailed_review = True
+        mimo_evaluation = {}
+        return mimo_evaluation, needs_detailed_review
+    
+    return _review_mimo_evaluation(mimo_evaluation, domain)
+
+
+# Confianza adaptativa en MiMo por dominio: racha de decisiones MiMo que el Judge confirmó.
+# Con una racha >= EVAL_MIMO_TRUST_STREAK los casos dudosos con confianza HIGH de ese dominio
+# ya no escalan; un desacuerdo del Judge la pone a cero (vuelve a escalar).
+_mimo_trust: Dict[str, int] = {}
+
+
+def _mimo_trusted(domain: str) -> bool:
+    """True si MiMo acumula suficientes acuerdos seguidos con el Judge en este dominio."""
+    return EVAL_MIMO_TRUST_STREAK > 0 and _mimo_trust.get(domain, 0) >= EVAL_MIMO_TRUST_STREAK
+
+
+def _mimo_implied_keep(mimo_evaluation: Dict, category: Optional[str] = None) -> Optional[bool]:
+    """
+    Decisión implícita de MiMo: reglas keep (con la hard rule de category) sobre una copia
+    de sus scores. MiMo no devuelve keep; None si faltan scores o no son numéricos.
+    """
+    try:
+        scores = {field: float(mimo_evaluation[field]) for field in _SCORE_FIELDS}
+    except (KeyError, TypeError, ValueError):
+        return None
+    scores["is_clickbait"] = mimo_evaluation.get("is_clickbait", False)
+    return _apply_keep_rules(scores, category)
+
+
+def _record_mimo_agreement(domain: str, mimo_keep: Optional[bool], judge_keep: bool):
+    """Compara la decisión implícita de MiMo (ver _mimo_implied_keep) con la del Judge."""
+    if mimo_keep is None:
+        return
+    if mimo_keep == judge_keep:
+        _mimo_trust[domain] = _mimo_trust.get(domain, 0) + 1
+    else:
+        _mimo_trust[domain] = 0
+
+
+def _review_mimo_evaluation(mimo_evaluation: Dict, domain: str) -> Tuple[Dict, bool]:
+    """
+    Completa campos faltantes de la evaluación MiMo y decide si escalar a Judge.
+    
+    Returns:
+        Tuple (mimo_evaluation, needs_detailed_review)
+    """
+    try:
+        # Validar y completar campos requeridos con valores por defecto razonables
+        mimo_required_fields = ["authenticity_score", "reliability_score", "relevance_score", "currency_score", "total_score", "is_clickbait"]
+        mimo_missing_fields = [f for f in mimo_required_fields if f not in mimo_evaluation]
         
-        try:
-            evaluation = json.loads(content)
+        # Completar campos faltantes con valores por defecto basados en campos existentes
+        if mimo_missing_fields:
+            _logger.warning("   ⚠️ Evaluación preliminar incompleta para %s. Faltan: %s", domain, ', '.join(mimo_missing_fields))
             
-            # Validar campos requeridos
-            required_fields = [
-                "authenticity_score", "reliability_score", "relevance_score",
-                "currency_score", "total_score", "is_clickbait", "keep", "reasoning"
-            ]
-            missing_fields = [f for f in required_fields if f not in evaluation]
+            # Calcular valores por defecto basados en campos existentes
+            existing_scores = [mimo_evaluation.get(f, 0) for f in ["authenticity_score", "reliability_score", "relevance_score", "currency_score"] if f in mimo_evaluation]
+            avg_existing = sum(existing_scores) / len(existing_scores) if existing_scores else 5  # Default medio si no hay ninguno
             
-            # Tolerancia a fallos
-            if "keep" in missing_fields:
-                missing_fields.remove("keep")
-                evaluation["keep"] = False
+            # Completar campos faltantes
+            if "relevance_score" not in mimo_evaluation:
+                # Si falta relevance_score, estimar basado en el contexto y otros scores
+                mimo_evaluation["relevance_score"] = int(round(avg_existing)) if existing_scores else 5
+                _logger.debug("      🔧 Completando relevance_score: %s", mimo_evaluation['relevance_score'])
             
-            if "reasoning" in missing_fields:
-                missing_fields.remove("reasoning")
-                evaluation["reasoning"] = "Evaluación automática."
-
-            if missing_fields:
-                print(f"   ⚠️ Evaluación incompleta para {domain}. Faltan: {', '.join(missing_fields)}")
-                return None
+            if "authenticity_score" not in mimo_evaluation:
+                mimo_evaluation["authenticity_score"] = int(round(avg_existing)) if existing_scores else 5
             
-            # Validar tipos y rangos (aceptar int y float)
-            score_fields = ["authenticity_score", "reliability_score", "relevance_score", "currency_score", "total_score"]
-            for field in score_fields:
-                score = evaluation.get(field)
-                # Aceptar tanto int como float, y convertir a float para comparación
-                if not isinstance(score, (int, float)) or score < 0 or score > 10:
-                    print(f"   ⚠️ Score inválido en {field}: {score}")
-                    return None
-                # Normalizar a float para consistencia
-                evaluation[field] = float(score)
+            if "reliability_score" not in mimo_evaluation:
+                mimo_evaluation["reliability_score"] = int(round(avg_existing)) if existing_scores else 5
             
-            # Validar total_score vs promedio calculado
-            llm_total = float(evaluation.get("total_score", 0))
-            calculated_total = (
-                evaluation["authenticity_score"] + 
-                evaluation["reliability_score"] + 
-                evaluation["relevance_score"] + 
-                evaluation["currency_score"]
-            ) / 4.0
+            if "currency_score" not in mimo_evaluation:
+                mimo_evaluation["currency_score"] = int(round(avg_existing)) if existing_scores else 7  # Default más alto para currency
             
-            # Si el total_score del LLM difiere mucho del calculado, usar el calculado
-            if llm_total < 0 or llm_total > 10 or abs(llm_total - calculated_total) > 2:
-                evaluation["total_score"] = round(calculated_total, 2)
+            if "total_score" not in mimo_evaluation:
+                # Calcular total_score como promedio de los scores individuales
+                scores = [
+                    mimo_evaluation.get("authenticity_score", 0),
+                    mimo_evaluation.get("reliability_score", 0),
+                    mimo_evaluation.get("relevance_score", 0),
+                    mimo_evaluation.get("currency_score", 0)
+                ]
+                mimo_evaluation["total_score"] = int(round(sum(scores) / len(scores)))
             
-            # Aplicar lógica de filtrado estricta (con thresholds mínimos individuales)
-            total_score = evaluation.get("total_score", 0)
-            relevance_score = evaluation.get("relevance_score", 0)
-            reliability_score = evaluation.get("reliability_score", 0)
-            authenticity_score = evaluation.get("authenticity_score", 0)
-            is_clickbait = evaluation.get("is_clickbait", False)
+            if "is_clickbait" not in mimo_evaluation:
+                # Inferir clickbait basado en scores (baja relevancia pero alta confiabilidad puede ser clickbait)
+                relevance = mimo_evaluation.get("relevance_score", 5)
+                reliability = mimo_evaluation.get("reliability_score", 5)
+                mimo_evaluation["is_clickbait"] = reliability >= 7 and relevance < 4
             
-            # Determinar keep basado en reglas
-            if is_clickbait:
-                evaluation["keep"] = False
-            elif (total_score >= TOTAL_SCORE_THRESHOLD and 
-                  relevance_score >= RELEVANCE_THRESHOLD and
-                  authenticity_score >= AUTHENTICITY_THRESHOLD and
-                  reliability_score >= RELIABILITY_THRESHOLD):
-                # Cumple todos los thresholds: total, relevance, authenticity y reliability
-                evaluation["keep"] = True
-            elif reliability_score >= 8 and total_score >= TOTAL_SCORE_THRESHOLD and relevance_score >= 6:
-                # Excepción para fuentes de alta fiabilidad (reliability >= 8)
-                # Aún requiere authenticity mínimo
-                if authenticity_score >= AUTHENTICITY_THRESHOLD:
-                    evaluation["keep"] = True
-                else:
-                    evaluation["keep"] = False
-            else:
-                evaluation["keep"] = False
-            
-            # POLICY 2: Apply category-specific hard rules after LLM evaluation
-            category = classify_source_category(url, domain)
-            if evaluation.get("keep") and category == 'consulting':
-                # Consulting sources require stricter relevance threshold
-                if relevance_score < EVAL_CONSULTING_MIN_RELEVANCE:
-                    evaluation["keep"] = False
-                    evaluation["reasoning"] = evaluation.get("reasoning", "") + f" | Hard rule: consulting requiere relevance>={EVAL_CONSULTING_MIN_RELEVANCE} (tenía {relevance_score:.1f})"
-            elif evaluation.get("keep") and category == 'general_media':
-                # General media sources require very high relevance (priorizar fuentes primarias)
-                if relevance_score < EVAL_GENERAL_MEDIA_MIN_RELEVANCE:
-                    evaluation["keep"] = False
-                    evaluation["reasoning"] = evaluation.get("reasoning", "") + f" | Hard rule: medios generalistas/confidenciales requieren relevance>={EVAL_GENERAL_MEDIA_MIN_RELEVANCE} (tenía {relevance_score:.1f}) | Priorizar fuentes primarias"
-            elif not evaluation.get("keep") and category == 'institutional':
-                # Institutional sources may pass with lower relevance if other scores are strong
-                if relevance_score >= EVAL_INSTITUTIONAL_MIN_RELEVANCE and total_score >= TOTAL_SCORE_THRESHOLD - 0.5:
-                    evaluation["keep"] = True
-                    evaluation["reasoning"] = evaluation.get("reasoning", "") + " | Hard rule: institutional con scores fuertes permitido"
-            
-            # TRACKING: Comparar decisión de Gemini con MiMo (si vino de MiMo)
-            judge_keep_value = evaluation.get("keep", False)
-            # Recuperar decisión de MiMo guardada antes de llamar a Gemini
-            # La variable mimo_keep_for_tracking se guardó arriba antes de llamar a llm_judge
-            if 'mimo_keep_for_tracking' in locals():
-                mimo_keep = locals().get('mimo_keep_for_tracking')
-                if mimo_keep is not None:
-                    # Esta fuente vino de MiMo y escaló a Gemini
-                    if mimo_keep:
-                        # MiMo aceptó esta fuente
-                        if judge_keep_value:
-                            # Gemini también aceptó
-                            _mimo_judge_metrics['mimo_accepted_then_judge_accepted'] += 1
-                        else:
-                            # Gemini rechazó (MiMo aceptó pero Gemini rechazó)
-                            _mimo_judge_metrics['mimo_accepted_then_judge_rejected'] += 1
-                else:
-                    # Esta fuente fue directo a Gemini (sin pasar por MiMo, ej: elite fast-track)
-                    _mimo_judge_metrics['judge_only_evaluations'] += 1
+            _logger.debug("      ✅ Campos completados. Evaluación ahora completa.")
+            mimo_missing_fields = []  # Ya no faltan campos
+        
+        # Si aún faltan campos críticos después de completar, decidir según modo
+        if mimo_missing_fields:
+            # Si falla MiMo, decidir según modo
+            if USE_CHEAP_OPENROUTER_MODELS:
+                needs_detailed_review = False  # En económico, rechazar fuente incompleta
             else:
-                # No hay tracking de MiMo (fuente directa a Gemini)
-                _mimo_judge_metrics['judge_only_evaluations'] += 1
-            
-            # Construir resultado final
-            result = {**source, **evaluation}
-            result["score"] = evaluation["total_score"]
-            result["reason"] = evaluation["reasoning"]
-            result["fast_track"] = None
-            result["pre_judge"] = "gemini"  # Indica que pasó por evaluación detallada de Gemini
-            result["source_category"] = category  # Policy 2: category classification
+                needs_detailed_review = True  # En producción, escalar a Judge
+        else:
+            # Extraer valores de la evaluación preliminar
+            confidence = mimo_evaluation.get("confidence", "HIGH")
+            needs_detailed_review = mimo_evaluation.get("needs_detailed_review", False)
             
-            # Cachear para futuras consultas
-            cache_evaluation(url, evaluation)
+            # Determinar si necesita revisión detallada basándose en criterios
+            total_score_pre = float(mimo_evaluation.get("total_score", 0))
+            reliability_score_pre = float(mimo_evaluation.get("reliability_score", 0))
+            relevance_score_pre = float(mimo_evaluation.get("relevance_score", 0))
+            authenticity_score_pre = float(mimo_evaluation.get("authenticity_score", 0))
             
-            return result
+            # Criterios para escalamiento (solo en modo producción, no en económico):
+            # En modo económico, MiMo es suficiente para todas las evaluaciones
+            # 1. Confidence es PARTIAL o UNCERTAIN
+            # 2. Scores en zona gris (5-7)
+            # 3. Contradicciones (alta fiabilidad pero baja relevancia)
+            # 4. Baja autenticidad pero alta fiabilidad (necesita verificación)
             
-        except json.JSONDecodeError as e:
-            print(f"   ⚠️ Error parseando JSON: {e}")
-            print(f"   Contenido: {content[:200]}...")
-            return None
+            # En modo económico, no escalar - MiMo es suficiente
+            if USE_CHEAP_OPENROUTER_MODELS:
+                # En modo económico, usar evaluación MiMo directamente sin escalamiento
+                needs_detailed_review = False
+            elif confidence in ["PARTIAL", "UNCERTAIN"]:
+                needs_detailed_review = True
+                _logger.debug("      ⚠️ Confianza %s - escalando a Judge (producción)", confidence)
+            elif 5 <= total_score_pre <= 7:
+                needs_detailed_review = True
+                _logger.debug("      ⚠️ Score en zona gris (%.1f) - escalando a Judge (producción)", total_score_pre)
+            elif reliability_score_pre >= 8 and relevance_score_pre < 6:
+                needs_detailed_review = True
+                _logger.debug("      ⚠️ Contradicción detectada (fiabilidad alta, relevancia baja) - escalando a Judge (producción)")
+            elif authenticity_score_pre < 6 and reliability_score_pre >= 7:
+                needs_detailed_review = True
+                _logger.debug("      ⚠️ Baja autenticidad con alta fiabilidad - escalando a Judge (producción)")
             
+            if needs_detailed_review and confidence == "HIGH" and _mimo_trusted(domain):
+                needs_detailed_review = False
+                _logger.debug("      ✅ MiMo fiable en %s (%s acuerdos con Judge) - sin escalar", domain, _mimo_trust[domain])
     except Exception as e:
-        print(f"   ⚠️ Error en evaluate_source: {e}")
+        # Solo escalar en modo producción, en económico reintentar o rechazar
+        if USE_CHEAP_OPENROUTER_MODELS:
+            _logger.warning("   ⚠️ Error en evaluación preliminar: %s, rechazando fuente (modo económico)", e)
+            needs_detailed_review = False
+        else:
+            _logger.warning("   ⚠️ Error en evaluación preliminar: %s, escalando a Judge", e)
+            needs_detailed_review = True
+        mimo_evaluation = {}
+    
+    return mimo_evaluation, needs_detailed_review
+
+
+_SCORE_FIELDS = ("authenticity_score", "reliability_score", "relevance_score", "currency_score", "total_score")
+
+# Thresholds ligados como argumentos por defecto de _apply_keep_rules (locales, no LOAD_GLOBAL por fuente)
+_THRESHOLDS = (TOTAL_SCORE_THRESHOLD, RELEVANCE_THRESHOLD, AUTHENTICITY_THRESHOLD, RELIABILITY_THRESHOLD)
+
+
+# Score 0-10: int o float (strict: sin coerción de strings/bools; NaN no pasa ge/le)
+_Score = Annotated[float, Field(strict=True, ge=0, le=10)]
+
+
+class _JudgeEvaluation(BaseModel):
+    """Respuesta del Judge: decodifica + valida el JSON en una sola llamada (pydantic-core)."""
+    model_config = ConfigDict(extra="allow")
+
+    authenticity_score: _Score
+    reliability_score: _Score
+    relevance_score: _Score
+    currency_score: _Score
+    total_score: _Score
+    is_clickbait: Any
+    # Tolerancia a fallos: keep/reasoning ausentes tienen valor por defecto
+    keep: Any = False
+    reasoning: Any = "Evaluación automática."
+
+
+# POLICY 2: hard rules por categoría. Cada regla recibe (keep, relevance, total) y devuelve
+# (nuevo keep, nota para reasoning) si cambia la decisión, o None si no aplica.
+def _rule_consulting(
+    keep: bool, relevance: float, total: float, min_relevance: float = EVAL_CONSULTING_MIN_RELEVANCE
+) -> Optional[Tuple[bool, str]]:
+    """Consulting sources require stricter relevance threshold."""
+    if keep and relevance < min_relevance:
+        return False, f" | Hard rule: consulting requiere relevance>={min_relevance} (tenía {relevance:.1f})"
+    return None
+
+
+def _rule_general_media(
+    keep: bool, relevance: float, total: float, min_relevance: float = EVAL_GENERAL_MEDIA_MIN_RELEVANCE
+) -> Optional[Tuple[bool, str]]:
+    """General media sources require very high relevance (priorizar fuentes primarias)."""
+    if keep and relevance < min_relevance:
+        return False, f" | Hard rule: medios generalistas/confidenciales requieren relevance>={min_relevance} (tenía {relevance:.1f}) | Priorizar fuentes primarias"
+    return None
+
+
+def _rule_institutional(
+    keep: bool, relevance: float, total: float,
+    min_relevance: float = EVAL_INSTITUTIONAL_MIN_RELEVANCE, total_min: float = TOTAL_SCORE_THRESHOLD
+) -> Optional[Tuple[bool, str]]:
+    """Institutional sources may pass with lower relevance if other scores are strong."""
+    if not keep and relevance >= min_relevance and total >= total_min - 0.5:
+        return True, " | Hard rule: institutional con scores fuertes permitido"
+    return None
+
+
+_CATEGORY_RULES = {
+    'consulting': _rule_consulting,
+    'general_media': _rule_general_media,
+    'institutional': _rule_institutional,
+}
+
+
+def _apply_keep_rules(
+    evaluation: Dict, category: Optional[str] = None, thresholds: Tuple[float, ...] = _THRESHOLDS
+) -> bool:
+    """
+    Calcula y guarda evaluation["keep"] con la regla común a MiMo y Judge:
+    no clickbait, total y authenticity mínimos, y además
+    - estricta: relevance y reliability sobre sus thresholds, o
+    - excepción alta fiabilidad: reliability >= 8 con relevance >= 6
+    
+    Con category aplica además su hard rule (_CATEGORY_RULES, Policy 2) y anota
+    el motivo en evaluation["reasoning"].
+    
+    Returns:
+        Valor final de keep
+    """
+    total_min, relevance_min, authenticity_min, reliability_min = thresholds
+    total = evaluation.get("total_score", 0)
+    relevance = evaluation.get("relevance_score", 0)
+    reliability = evaluation.get("reliability_score", 0)
+    keep = (
+        not evaluation.get("is_clickbait", False)
+        and total >= total_min
+        and evaluation.get("authenticity_score", 0) >= authenticity_min
+        and (
+            (relevance >= relevance_min and reliability >= reliability_min)
+            or (reliability >= 8 and relevance >= 6)
+        )
+    )
+    
+    rule = _CATEGORY_RULES.get(category)
+    if rule is not None:
+        override = rule(keep, relevance, total)
+        if override is not None:
+            keep, note = override
+            evaluation["reasoning"] = evaluation.get("reasoning", "") + note
+    
+    evaluation["keep"] = keep
+    return keep
+
+
+def _finalize_from_mimo(source: Dict, context: str, mimo_evaluation: Dict) -> Dict:
+    """
+    Camino rápido: MiMo basta y su evaluación pasa a ser la final (sin llamada al Judge).
+    
+    Separada del camino Judge para que la rama más frecuente sea una función corta.
+    """
+    url = source.get('url', '')
+    domain = source.get('source_domain', '')
+    # Usar evaluación preliminar de MiMo como final, pero calcular "keep" correctamente
+    _logger.debug("      ✅ Evaluación MiMo suficiente (confidence: %s)", mimo_evaluation.get('confidence', 'HIGH'))
+    
+    # Crear evaluación final con formato estándar; "keep" con las mismas reglas que Judge
+    evaluation = {
+        "authenticity_score": float(mimo_evaluation.get("authenticity_score", 0)),
+        "reliability_score": float(mimo_evaluation.get("reliability_score", 0)),
+        "relevance_score": float(mimo_evaluation.get("relevance_score", 0)),
+        "currency_score": float(mimo_evaluation.get("currency_score", 0)),
+        "total_score": float(mimo_evaluation.get("total_score", 0)),
+        "is_clickbait": mimo_evaluation.get("is_clickbait", False),
+        "reasoning": mimo_evaluation.get("reasoning", "Evaluación preliminar con MiMo") + " [Pre-juez MiMo]",
+        "pre_judge": "mimo",
+        "confidence": mimo_evaluation.get("confidence", "HIGH"),
+    }
+    keep_value = _apply_keep_rules(evaluation)
+    evaluation["_mimo_keep"] = keep_value  # Guardar decisión de MiMo para tracking después
+    
+    # TRACKING: Registrar decisión de MiMo
+    if keep_value:
+        _incr_mimo_judge_metric('mimo_accepted')
+    else:
+        _incr_mimo_judge_metric('mimo_rejected')
+    # Viene de MiMo (no escaló): ya tenemos evaluation listo
+    result = {**source, **evaluation}
+    result["score"] = evaluation["total_score"]
+    result["reason"] = evaluation["reasoning"]
+    result["fast_track"] = None
+    _cache_write(url, evaluation, context)
+    cache_semantic_evaluation(
+        context, source.get('title', ''), source.get('snippet', ''), evaluation,
+        classify_source(url, domain)[0]
+    )
+    return result
+
+
+async def _invoke_judge(source: Dict, context: str, mimo_evaluation: Dict, prompt_fields: Optional[Dict]) -> str:
+    """Selecciona Judge cheap/premium según criticidad y devuelve su respuesta en crudo."""
+    domain = source.get('source_domain', '')
+    # Seleccionar modelo de judge según criticidad
+    # Usar judge_cheap (DeepSeek) por defecto, judge_premium solo para casos muy críticos
+    use_premium_judge = False  # Por defecto usar cheap
+    
+    # Criterios para usar judge premium:
+    # - Fuentes de élite (Tier 1/2) con scores muy ambiguos
+    # - Contradicciones muy marcadas (alta fiabilidad + muy baja relevancia)
+    # - Casos donde MiMo tuvo muy baja confianza
+    if mimo_evaluation:
+        confidence = mimo_evaluation.get("confidence", "HIGH")
+        total_score_pre = float(mimo_evaluation.get("total_score", 0))
+        reliability_score_pre = float(mimo_evaluation.get("reliability_score", 0))
+        relevance_score_pre = float(mimo_evaluation.get("relevance_score", 0))
+        
+        # Usar premium si:
+        # 1. Confianza muy baja (UNCERTAIN)
+        # 2. Score en zona de escalado (entre JUDGE_ESCALATE_SCORE_LOW y JUDGE_ESCALATE_SCORE_HIGH)
+        # 3. Contradicción extrema (reliability >= 9 y relevance < 5)
+        if confidence == "UNCERTAIN" or (JUDGE_ESCALATE_SCORE_LOW <= total_score_pre <= JUDGE_ESCALATE_SCORE_HIGH) or (reliability_score_pre >= 9 and relevance_score_pre < 5):
+            use_premium_judge = True
+    
+    # Seleccionar modelo
+    # En modo TEST, NO usar Claude Sonnet (llm_judge_premium), solo usar modelos de TEST
+    selected_judge, judge_model_name = _JUDGE_ROUTER[(_IS_TEST_MODE, use_premium_judge)]
+    
+    _logger.debug("   🎯 Evaluación detallada con Judge %s: %s", judge_model_name, domain[:30])
+    
+    response = await _ainvoke_llm(selected_judge, [
+        {"role": "system", "content": _judge_system_content(selected_judge)},
+        {"role": "user", "content": _JUDGE_USER_TPL.format_map(prompt_fields or _source_prompt_fields(source, context))}
+    ], _JUDGE_EVAL_SCHEMA)
+    
+    return response.content if hasattr(response, 'content') else str(response)
+
+
+def _finalize_from_judge(
+    content: str,
+    source: Dict,
+    context: str,
+    mimo_evaluation: Dict
+) -> Optional[Dict]:
+    """Parsea y valida la respuesta del Judge y construye el resultado final."""
+    url = source.get('url', '')
+    domain = source.get('source_domain', '')
+    # Limpiar markdown si existe
+    content = _strip_markdown_json(content)
+    
+    try:
+        # Campos requeridos, tipos y rangos validados al decodificar; scores normalizados a float
+        evaluation = _JudgeEvaluation.model_validate_json(content).model_dump()
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        if any(err["type"] == "json_invalid" for err in errors):
+            _logger.warning("   ⚠️ Error parseando JSON: %s", errors[0]["msg"])
+            _logger.debug("   Contenido: %s...", content[:200])
+        else:
+            missing = [str(err["loc"][0]) for err in errors if err["type"] == "missing"]
+            if missing:
+                _logger.warning("   ⚠️ Evaluación incompleta para %s. Faltan: %s", domain, ', '.join(missing))
+            else:
+                err = errors[0]
+                _logger.warning("   ⚠️ Score inválido en %s: %s", err["loc"][0] if err["loc"] else "?", err.get("input"))
         return None
+    
+    # Validar total_score vs promedio calculado
+    llm_total = evaluation["total_score"]
+    calculated_total = (
+        evaluation["authenticity_score"] + 
+        evaluation["reliability_score"] + 
+        evaluation["relevance_score"] + 
+        evaluation["currency_score"]
+    ) / 4.0
+    
+    # Si el total_score del LLM difiere mucho del calculado, usar el calculado
+    if llm_total < 0 or llm_total > 10 or abs(llm_total - calculated_total) > 2:
+        evaluation["total_score"] = round(calculated_total, 2)
+    
+    # Aplicar lógica de filtrado estricta + POLICY 2 (hard rules por categoría)
+    category = classify_source_category(url, domain)
+    _apply_keep_rules(evaluation, category)
+    
+    # TRACKING: Comparar decisión de Gemini con la implícita de MiMo (None = sin evaluación de MiMo)
+    judge_keep_value = evaluation.get("keep", False)
+    mimo_keep_for_tracking = _mimo_implied_keep(mimo_evaluation, category) if mimo_evaluation else None
+    _record_mimo_agreement(domain, mimo_keep_for_tracking, judge_keep_value)
+    if mimo_keep_for_tracking is None:
+        # Esta fuente fue directo a Gemini (sin decisión de MiMo, ej: MiMo no respondió)
+        _incr_mimo_judge_metric('judge_only_evaluations')
+    elif mimo_keep_for_tracking:
+        # Esta fuente vino de MiMo (que la aceptó) y escaló a Gemini
+        if judge_keep_value:
+            # Gemini también aceptó
+            _incr_mimo_judge_metric('mimo_accepted_then_judge_accepted')
+        else:
+            # Gemini rechazó (MiMo aceptó pero Gemini rechazó)
+            _incr_mimo_judge_metric('mimo_accepted_then_judge_rejected')
+    
+    # Construir resultado final
+    evaluation["pre_judge"] = "gemini"  # Indica que pasó por evaluación detallada de Gemini (se cachea)
+    result = {**source, **evaluation}
+    result["score"] = evaluation["total_score"]
+    result["reason"] = evaluation["reasoning"]
+    result["fast_track"] = None
+    result["source_category"] = category  # Policy 2: category classification
+    
+    # Cachear para futuras consultas
+    _cache_write(url, evaluation, context)
+    cache_semantic_evaluation(
+        context, source.get('title', ''), source.get('snippet', ''), evaluation,
+        classify_source(url, domain)[0]
+    )
+    
+    return result
+
+
+async def _finalize_evaluation(
+    source: Dict,
+    context: str,
+    mimo_evaluation: Dict,
+    needs_detailed_review: bool,
+    prompt_fields: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    FASE 2: Evaluación detallada con Judge o, si MiMo basta, resultado final a partir de MiMo.
+    
+    prompt_fields: campos de la fuente ya preparados para MiMo (se reutilizan para el Judge)
+    """
+    # ==========================================
+    # FASE 2: Evaluación detallada con Judge (Cheap vs Premium)
+    # ==========================================
+    # Judge Cheap (DeepSeek): Por defecto para evaluaciones normales
+    # Judge Premium (Claude/Gemini): Solo para casos muy críticos
+    if not needs_detailed_review:
+        return _finalize_from_mimo(source, context, mimo_evaluation)
+    
+    content = await _invoke_judge(source, context, mimo_evaluation, prompt_fields)
+    return _finalize_from_judge(content, source, context, mimo_evaluation)
+
+
+def _parse_mimo_batch(mimo_content: str, batch_len: int) -> Dict[int, Dict]:
+    """
+    Parsea la respuesta batch de MiMo ({"evaluations": [...]} o array JSON, con "index" por fuente).
+    
+    Returns:
+        Dict index -> evaluación MiMo (solo índices válidos; vacío si el JSON es inválido)
+    """
+    try:
+        parsed = json_loads(_strip_markdown_json(mimo_content))
+    except json.JSONDecodeError:
+        _logger.warning("   ⚠️ Error parseando JSON batch de MiMo, re-evaluando fuentes individualmente")
+        return {}
+    
+    # Tolerar {"evaluations": [...]} u objetos envolventes similares
+    if isinstance(parsed, dict):
+        parsed = next((v for v in parsed.values() if isinstance(v, list)), [])
+    if not isinstance(parsed, list):
+        return {}
+    
+    evaluations = {}
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        index = item.pop("index", position)
+        if isinstance(index, int) and 0 <= index < batch_len and index not in evaluations:
+            evaluations[index] = item
+    return evaluations
+
+
+async def _evaluate_mimo_batch(sources: List[Dict], context: str) -> List[Optional[Dict]]:
+    """
+    Pre-evalúa varias fuentes con UNA sola llamada a MiMo y finaliza cada una por separado
+    (validación, escalado a Judge y cache), igual que evaluate_source().
+    
+    Las fuentes que falten en la respuesta batch se re-evalúan individualmente.
+    """
+    if len(sources) == 1:
+        return [await _evaluate_with_llm(sources[0], context)]
+    
+    _logger.debug("   🔍 Pre-evaluación batch con MiMo: %s fuentes", len(sources))
+    try:
+        mimo_content = await _invoke_mimo([
+            {"role": "system", "content": _MIMO_BATCH_SYSTEM_MSG},
+            {"role": "user", "content": _build_mimo_batch_user_msg(sources, context)}
+        ], _MIMO_BATCH_EVAL_SCHEMA)
+    except Exception as e:
+        _logger.warning("   ⚠️ Error en pre-evaluación batch: %s, re-evaluando fuentes individualmente", e)
+        return list(await asyncio.gather(*(_evaluate_with_llm(source, context) for source in sources)))
+    
+    mimo_batch = _parse_mimo_batch(mimo_content, len(sources)) if mimo_content is not None else {}
+    
+    async def finalize(index: int, source: Dict) -> Optional[Dict]:
+        domain = source.get('source_domain', '')
+        try:
+            if mimo_content is None:
+                # MiMo no respondió tras los reintentos: misma decisión que en evaluate_source
+                mimo_evaluation, needs_detailed_review = _review_mimo_content(None, domain)
+            elif index in mimo_batch:
+                mimo_evaluation, needs_detailed_review = _review_mimo_evaluation(mimo_batch[index], domain)
+            else:
+                # Respuesta batch incompleta: fallback a la evaluación individual
+                return await _evaluate_with_llm(source, context)
+            return await _finalize_evaluation(source, context, mimo_evaluation, needs_detailed_review)
+        except Exception as e:
+            _logger.warning("   ⚠️ Error en evaluate_source: %s", e)
+            return None
+    
+    return list(await asyncio.gather(*(finalize(i, source) for i, source in enumerate(sources))))
 
 
 # ==========================================
 # BATCH EVALUATION (optimización de tokens)
 # ==========================================
 
+def _group_by_canonical_url(sources: List[Dict]) -> Tuple[List[Dict], Dict[int, List[Dict]]]:
+    """
+    Agrupa fuentes con la misma URL canónica.
+    
+    Returns:
+        Tuple (fuentes únicas en orden, id(fuente representante) -> duplicados)
+    """
+    unique: List[Dict] = []
+    duplicates: Dict[int, List[Dict]] = {}
+    representative: Dict[str, Dict] = {}
+    for source in sources:
+        key = canonicalize_url(source.get('url', ''))
+        first = representative.get(key) if key else None
+        if first is None:
+            if key:
+                representative[key] = source
+            unique.append(source)
+        else:
+            duplicates.setdefault(id(first), []).append(source)
+    return unique, duplicates
+
+
+def _copy_evaluation(result: Dict, source: Dict, duplicate: Dict) -> Dict:
+    """Replica en un duplicado los campos que la evaluación añadió/cambió sobre la fuente original."""
+    added = {k: v for k, v in result.items() if k not in source or source[k] != v}
+    return {**duplicate, **added}
+
+
 async def evaluate_sources_batch(
     sources: List[Dict], 
     context: str, 
-    batch_size: int = 5
+    batch_size: int = EVAL_MIMO_BATCH_SIZE
 ) -> Tuple[List[Dict], List[Dict]]:
     """
     Evalúa múltiples fuentes en batches para optimizar llamadas LLM.
     
     Flujo:
     1. Primero aplica fast-tracks (cache, élite, auto-reject)
-    2. Las que quedan van a evaluación batch con LLM
+    2. Las que quedan van a pre-evaluación MiMo en batch (una llamada por cada
+       batch_size fuentes); solo las dudosas escalan individualmente a Judge
     
     Args:
         sources: Lista de fuentes a evaluar
         context: Tema de investigación
-        batch_size: Tamaño de batch para LLM (default 5)
+        batch_size: Fuentes por llamada MiMo (default: evaluator.mimo_batch_size)
     
     Returns:
         Tuple (validated_sources, rejected_sources)
@@ -1182,87 +2141,62 @@ async def evaluate_sources_batch(
     # ==========================================
     # FASE 1: Fast-tracks (sin LLM)
     # ==========================================
-    print(f"\n   🔍 [BATCH EVAL] Procesando {len(sources)} fuentes...")
+    _logger.info("\n   🔍 [BATCH EVAL] Procesando %s fuentes...", len(sources))
+    
+    # Cache por URL leído una sola vez para todo el batch
+    url_cache = get_cached_evaluations([source.get('url', '') for source in sources], context)
     
     for source in sources:
-        url = source.get('url', '')
-        
-        # Check cache
-        cached = get_cached_evaluation(url)
-        if cached:
-            result = {**source, **cached, "from_cache": True}
-            result["score"] = cached.get("total_score", 0)
-            if cached.get("keep", False):
-                validated.append(result)
-            else:
-                rejected.append(result)
-            continue
-        
-        # Check élite / auto-reject
-        elite_info = get_elite_domain_scores(url)
-        if elite_info:
-            if elite_info.get('auto_reject'):
-                result = {
-                    **source,
-                    "authenticity_score": 0, "reliability_score": 0,
-                    "relevance_score": 0, "currency_score": 0,
-                    "total_score": 0, "is_clickbait": False, "keep": False,
-                    "reasoning": elite_info.get('reason', 'Auto-rejected'),
-                    "fast_track": "auto_reject"
-                }
-                rejected.append(result)
-                cache_evaluation(url, result)
-                continue
-            
-            # POLICY 2: Elite sources should go through evaluate_source() for Policy 2 logic
-            # (This ensures consistency and proper gray zone handling)
-            # Defer to evaluate_source() which now implements Policy 2
+        # Mismos pasos sin LLM que evaluate_source() (cache, élite, auto-reject, pre-filtros)
+        result = _evaluate_without_llm(source, context, url_cache)
+        if result is None:
             pending_llm_eval.append(source)
-            continue
-        
-        # Check fuentes internas de la empresa
-        # NOTA: Ya no se usa COMPANY_CONTEXT del JSON, se usa el contexto de Airtable
-        url_lower = url.lower()
-        company_name = ""  # Ya no se usa COMPANY_CONTEXT del JSON
-        
-        # Si necesitas filtrar fuentes internas, usa el contexto de Airtable (project_specific_context)
-        if company_name and (company_name in url_lower or company_name in source.get('source_domain', '').lower()):
-            result = {
-                **source,
-                "authenticity_score": 10, "reliability_score": 10,
-                "relevance_score": 0, "currency_score": 0,
-                "total_score": 4, "is_clickbait": False, "keep": False,
-                "reasoning": "Internal source filtered",
-                "fast_track": "internal_filter"
-            }
+        elif result.get("keep", False):
+            validated.append(result)
+        else:
             rejected.append(result)
-            cache_evaluation(url, result)
-            continue
-        
-        # No fast-track, necesita LLM
-        pending_llm_eval.append(source)
     
-    print(f"      Fast-track: {len(sources) - len(pending_llm_eval)} fuentes")
-    print(f"      Pendientes LLM: {len(pending_llm_eval)} fuentes")
+    _logger.info("      Fast-track: %s fuentes", len(sources) - len(pending_llm_eval))
+    _logger.info("      Pendientes LLM: %s fuentes", len(pending_llm_eval))
     
     # ==========================================
     # FASE 2: LLM Evaluation (en paralelo)
     # ==========================================
+    if pending_llm_eval and CACHE_MODE is CacheMode.REPLAY:
+        raise CacheMissError(f"{len(pending_llm_eval)} fuentes sin evaluación cacheada (modo REPLAY)")
+    
     if pending_llm_eval:
-        print(f"   🤖 Evaluando {len(pending_llm_eval)} fuentes con LLM...")
+        # Duplicados por URL canónica (proveedores de búsqueda solapados): una sola evaluación LLM
+        unique_pending, duplicates = _group_by_canonical_url(pending_llm_eval)
+        if len(unique_pending) < len(pending_llm_eval):
+            _logger.info("      Duplicados por URL: %s fuentes (sin llamada LLM)", len(pending_llm_eval) - len(unique_pending))
         
-        # Evaluar en paralelo (más rápido que batch en un solo prompt)
-        tasks = [evaluate_source(source, context) for source in pending_llm_eval]
-        results = await asyncio.gather(*tasks)
+        batch_size = max(1, batch_size)
+        batches = [unique_pending[i:i + batch_size] for i in range(0, len(unique_pending), batch_size)]
+        _logger.info("   🤖 Evaluando %s fuentes con LLM (%s batch(es) MiMo)...", len(unique_pending), len(batches))
         
-        for result in results:
-            if result:
-                if result.get("keep", False):
-                    validated.append(result)
-                else:
-                    rejected.append(result)
+        # Un prompt MiMo por batch; los batches se evalúan en paralelo
+        batch_results = await asyncio.gather(
+            *(_evaluate_mimo_batch(batch, context) for batch in batches),
+            return_exceptions=True
+        )
+        
+        for batch, results in zip(batches, batch_results):
+            if isinstance(results, Exception):
+                _logger.warning("   ⚠️ Error en batch de evaluación: %s", results)
+                continue
+            for source, result in zip(batch, results):
+                if not result:
+                    continue
+                copies = [_copy_evaluation(result, source, dup) for dup in duplicates.get(id(source), ())]
+                for item in (result, *copies):
+                    if item.get("keep", False):
+                        validated.append(item)
+                    else:
+                        rejected.append(item)
     
-    print(f"   ✅ Resultado: {len(validated)} validadas, {len(rejected)} rechazadas")
+    _logger.info("   ✅ Resultado: %s validadas, %s rechazadas", len(validated), len(rejected))
+    await flush_pending_cache_writes()
     
     return validated, rejected
 
@@ -1280,12 +2214,22 @@ def get_evaluation_stats(validated: List[Dict], rejected: List[Dict]) -> Dict:
     if total == 0:
         return {"total": 0, "validated": 0, "rejected": 0}
     
-    # Contar por tipo de fast-track
-    cache_hits = sum(1 for s in validated + rejected if s.get("from_cache"))
-    elite_tracks = sum(1 for s in validated + rejected if s.get("fast_track") == "elite")
-    auto_rejects = sum(1 for s in validated + rejected if s.get("fast_track") == "auto_reject")
-    internal_filters = sum(1 for s in validated + rejected if s.get("fast_track") == "internal_filter")
-    llm_evaluated = total - cache_hits - elite_tracks - auto_rejects - internal_filters
+    # Contar por tipo de fast-track en una sola pasada (sin concatenar las listas)
+    cache_hits = elite_tracks = auto_rejects = internal_filters = cheap_prefilters = 0
+    for s in chain(validated, rejected):
+        if s.get("from_cache"):
+            cache_hits += 1
+        fast_track = s.get("fast_track")
+        if fast_track == "elite":
+            elite_tracks += 1
+        elif fast_track == "auto_reject":
+            auto_rejects += 1
+        elif fast_track == "internal_filter":
+            internal_filters += 1
+        elif fast_track == "cheap_prefilter":
+            cheap_prefilters += 1
+    llm_calls_saved = cache_hits + elite_tracks + auto_rejects + internal_filters + cheap_prefilters
+    llm_evaluated = total - llm_calls_saved
     
     # Calcular confidence
     confidence = calculate_confidence_score(validated)
@@ -1299,25 +2243,31 @@ def get_evaluation_stats(validated: List[Dict], rejected: List[Dict]) -> Dict:
         "elite_fast_tracks": elite_tracks,
         "auto_rejects": auto_rejects,
         "internal_filters": internal_filters,
+        "cheap_prefilters": cheap_prefilters,
         "llm_evaluated": llm_evaluated,
-        "llm_calls_saved": cache_hits + elite_tracks + auto_rejects + internal_filters,
+        "llm_calls_saved": llm_calls_saved,
         "confidence": confidence
     }
 
 
 def print_evaluation_summary(stats: Dict):
     """Imprime resumen de evaluación."""
-    print(f"\n   📊 [EVALUATION SUMMARY]")
-    print(f"      Total: {stats['total']} fuentes")
-    print(f"      ✅ Validadas: {stats['validated']} ({stats['acceptance_rate']}%)")
-    print(f"      ❌ Rechazadas: {stats['rejected']}")
-    print(f"      ⚡ Fast-tracks: {stats['llm_calls_saved']} (ahorro de LLM calls)")
-    print(f"         - Cache hits: {stats['cache_hits']}")
-    print(f"         - Élite: {stats['elite_fast_tracks']}")
-    print(f"         - Auto-reject: {stats['auto_rejects']}")
-    print(f"         - Internal filter: {stats['internal_filters']}")
-    print(f"      🤖 LLM evaluadas: {stats['llm_evaluated']}")
+    lines = []
+    lines.append(f"\n   📊 [EVALUATION SUMMARY]")
+    lines.append(f"      Total: {stats['total']} fuentes")
+    lines.append(f"      ✅ Validadas: {stats['validated']} ({stats['acceptance_rate']}%)")
+    lines.append(f"      ❌ Rechazadas: {stats['rejected']}")
+    lines.append(f"      ⚡ Fast-tracks: {stats['llm_calls_saved']} (ahorro de LLM calls)")
+    lines.append(f"         - Cache hits: {stats['cache_hits']}")
+    lines.append(f"         - Élite: {stats['elite_fast_tracks']}")
+    lines.append(f"         - Auto-reject: {stats['auto_rejects']}")
+    lines.append(f"         - Internal filter: {stats['internal_filters']}")
+    lines.append(f"         - Pre-filtro barato: {stats.get('cheap_prefilters', 0)}")
+    lines.append(f"      🤖 LLM evaluadas: {stats['llm_evaluated']}")
     
     conf = stats.get('confidence', {})
     if conf:
-        print(f"      📈 Confidence: {conf.get('score', 0)}/100 ({conf.get('level', 'N/A')})")
+        lines.append(f"      📈 Confidence: {conf.get('score', 0)}/100 ({conf.get('level', 'N/A')})")
+    
+    # Un solo registro: el bloque sale entero y en orden con el resto del log del evaluador
+    _logger.info("%s", "\n".join(lines))
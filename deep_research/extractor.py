@@ -3,37 +3,427 @@ Módulo Extractor: Procesa resultados de búsqueda para extraer hechos y citas l
 Reduce el ruido antes de la evaluación y redacción final.
 """
 import json
-import re
 import asyncio
-from typing import List, Dict, Any, Optional
-from .config import llm_planner, llm_mimo_cheap  # Usa MiMo para extracción económica
+import contextvars
+import hashlib
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI
+
+from .config import (
+    llm_planner, llm_mimo_cheap,  # Usa MiMo para extracción económica
+    EXTRACTOR_BATCH_SIZE, EXTRACTOR_BATCH_WAIT_MS, EXTRACTOR_RPM, EXTRACTOR_CONCURRENCY,
+    EXTRACTOR_STREAM_LLM, EXTRACTOR_STRUCTURED_OUTPUT, EXTRACTOR_MAX_TOKENS
+)
 from .logger import logger
+from .source_quality import CACHE_MODE, CACHE_TTL_DAYS, CacheMode
+from .utils import AsyncTokenBucket, LoopLocal, astream_json, clean_and_parse_json, is_response_format_rejection
+
 
-# Flag global para deshabilitar extractor si hay demasiados rate limits
-_extractor_rate_limited = False
+@dataclass
+class _ExtractorRun:
+    """Estado de una ejecución de iter_evidence_package (no se comparte entre ejecuciones)."""
+    # Kill-switch si hay demasiados rate limits: salta el resto de fuentes de esta ejecución
+    rate_limited: bool = False
 
-# Semáforo se crea dinámicamente dentro de la función para evitar problemas de event loop
-_extractor_semaphore = None
 
+# Ejecución actual; las tareas de extracción la heredan al crearse en su contexto
+_current_run: contextvars.ContextVar[Optional[_ExtractorRun]] = contextvars.ContextVar("extractor_run", default=None)
 
-def _get_extractor_semaphore():
+
+class _CreditLimiter:
     """
-    Obtiene o crea el semáforo del extractor en el event loop actual.
-    Evita problemas de "attached to a different loop" creando el semáforo cuando se necesita.
+    Límite de concurrencia + presupuesto de peticiones por minuto del proveedor.
+    
+    Un semáforo acota las llamadas en vuelo y un bucket de créditos (peticiones) que se
+    rellena a requests_per_minute / 60 por segundo sustituye al delay fijo entre llamadas.
     """
-    global _extractor_semaphore
+
+    def __init__(self, requests_per_minute: int, max_concurrent: int):
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self.bucket = AsyncTokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+
+    @asynccontextmanager
+    async def acquire(self, cost: int = 1):
+        """Ocupa un hueco de concurrencia y reserva cost peticiones (sin límite RPM si es 0)."""
+        async with self.semaphore:
+            if self.bucket is not None:
+                await self.bucket.acquire(cost)
+            yield
+
+
+_extractor_limiter = LoopLocal(lambda: _CreditLimiter(EXTRACTOR_RPM, EXTRACTOR_CONCURRENCY))
+
+
+def _get_extractor_limiter() -> _CreditLimiter:
+    """
+    Obtiene o crea el limitador del extractor en el event loop actual.
+    Evita problemas de "attached to a different loop" creándolo por loop.
+    """
+    return _extractor_limiter.get()
+
+
+# ==========================================
+# CACHE DE EVIDENCIAS (tema + contenido)
+# ==========================================
+# Mismo (tema, contenido) => mismas evidencias: se reutilizan sin llamada LLM entre ejecuciones
+EVIDENCE_CACHE_FILE = Path(__file__).parent.parent / ".extractor_cache.json"
+
+_evidence_cache: Optional[Dict[str, Dict]] = None
+_evidence_cache_dirty = False
+
+
+def _evidence_cache_key(topic: str, content: str) -> str:
+    """BLAKE2b (16 bytes) de tema + contenido truncado que se envía al LLM."""
+    return hashlib.blake2b(f"{topic}\x00{content}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load_evidence_cache() -> Dict[str, Dict]:
+    """Carga el cache de evidencias una vez por proceso ({} si no existe o está corrupto)."""
+    global _evidence_cache
+    if _evidence_cache is None:
+        _evidence_cache = {}
+        if EVIDENCE_CACHE_FILE.exists():
+            try:
+                with open(EVIDENCE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    _evidence_cache = json.load(f)
+            except Exception as e:
+                logger.log_warning(f"⚠️  Error cargando cache de evidencias: {e}")
+    return _evidence_cache
+
+
+def _get_cached_evidence(key: str) -> Optional[List[Dict]]:
+    """Evidencias cacheadas para la clave si no han expirado (lista vacía = sin evidencias útiles)."""
+    if CACHE_MODE is CacheMode.DISABLED:
+        return None
+    entry = _load_evidence_cache().get(key)
+    if not entry:
+        return None
     try:
+        cached_at = datetime.fromisoformat(entry["cached_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if datetime.now() - cached_at >= timedelta(days=CACHE_TTL_DAYS):
+        return None
+    return entry.get("evidence_points", [])
+
+
+def _cache_evidence(key: str, evidence_points: List[Dict]):
+    """Guarda en memoria las evidencias de una extracción; se persisten con _flush_evidence_cache()."""
+    global _evidence_cache_dirty
+    if CACHE_MODE is not CacheMode.ENABLED:
+        return
+    _load_evidence_cache()[key] = {
+        "evidence_points": evidence_points,
+        "cached_at": datetime.now().isoformat(),
+    }
+    _evidence_cache_dirty = True
+
+
+def _flush_evidence_cache():
+    """Escribe el cache de evidencias a disco (una vez por extract_evidence_package)."""
+    global _evidence_cache_dirty
+    if not _evidence_cache_dirty:
+        return
+    try:
+        with open(EVIDENCE_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(_evidence_cache, f, ensure_ascii=False)
+        _evidence_cache_dirty = False
+    except Exception as e:
+        logger.log_warning(f"⚠️  Error guardando cache de evidencias: {e}")
+
+
+# Prompt de sistema invariante (idéntico en cada llamada); el TEMA va al final para que
+# todo este bloque sea un prefijo byte-idéntico y el proveedor pueda reutilizar su prefix cache
+_EXTRACTOR_SYSTEM_PREFIX = """Eres un Analista de Extracción de Datos de Precisión. 
+Tu misión es transformar texto bruto en un 'Evidence Pack' libre de ruido.
+
+REGLAS:
+1. Extrae solo hechos atómicos y citas textuales exactas relacionadas con el tema.
+2. Ignora publicidad, menús de navegación, avisos legales y contenido irrelevante.
+3. Si no hay información útil sobre el tema, devuelve un JSON vacío con "evidence_points": [].
+4. Cada evidencia debe ser verificable y citable directamente.
+5. Las citas deben ser textuales (exactas) o parafraseadas con precisión.
+
+CATEGORÍAS sugeridas (puedes usar otras si es apropiado):
+- "data": Datos numéricos, estadísticas, métricas
+- "quote": Citas directas de personas o documentos
+- "fact": Hechos objetivos verificables
+- "claim": Afirmaciones o declaraciones de organizaciones
+- "date": Información temporal relevante
+
+OUTPUT JSON (OBLIGATORIO):
+{
+  "evidence_points": [
+    {
+      "fact": "descripción breve del hecho o información clave",
+      "exact_quote": "cita textual exacta o parafraseo preciso",
+      "category": "data|quote|fact|claim|date"
+    }
+  ]
+}
+
+Si no encuentras información útil, responde con:
+{
+  "evidence_points": []
+}
+"""
+
+
+# Structured output (response_format json_schema): JSON válido por construcción y sin prosa
+_EVIDENCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evidence_points": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "fact": {"type": "string"},
+                    "exact_quote": {"type": "string"},
+                    "category": {"type": "string"},
+                },
+                "required": ["fact", "exact_quote", "category"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["evidence_points"],
+    "additionalProperties": False,
+}
+
+
+# Parámetros fijos de cada llamada, ligados una vez al modelo (clientes OpenAI-compatibles)
+_EXTRACTOR_CALL_KWARGS = {"temperature": 0, "max_tokens": EXTRACTOR_MAX_TOKENS}
+
+
+def _with_evidence_schema(llm):
+    """
+    Devuelve el LLM con response_format json_schema (y _EXTRACTOR_CALL_KWARGS) si es un
+    cliente OpenAI-compatible (OpenAI, DeepSeek, OpenRouter); en otro caso None.
+    """
+    if not EXTRACTOR_STRUCTURED_OUTPUT or not isinstance(llm, ChatOpenAI):
+        return None
+    kwargs = {
+        **_EXTRACTOR_CALL_KWARGS,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "evidence_pack", "schema": _EVIDENCE_SCHEMA, "strict": True},
+        }
+    }
+    if "openrouter" in str(getattr(llm, 'openai_api_base', '') or ''):
+        # OpenRouter: enrutar solo a proveedores que soporten response_format
+        kwargs["extra_body"] = {"provider": {"require_parameters": True}}
+    return llm.bind(**kwargs)
+
+
+class _BatchedExtractor:
+    """
+    Agrupa las extracciones concurrentes en una sola llamada al LLM (abatch(), o streaming
+    por elemento con corte al cerrar el JSON si extractor_stream_llm está activo).
+    
+    Un worker (creado en el primer submit) toma el primer job de la cola y espera hasta
+    wait_s a que lleguen más, hasta max_batch_size; el limitador del extractor se aplica
+    a cada llamada batch, no a cada fuente.
+    """
+
+    def __init__(self, llm, max_batch_size: int, wait_s: float):
+        # Runnable ya ligado: los kwargs no se reconstruyen en cada llamada
+        self._llm = llm.bind(**_EXTRACTOR_CALL_KWARGS) if isinstance(llm, ChatOpenAI) else llm
+        # None si el modelo no admite structured output (o tras rechazarlo una vez)
+        self._structured_llm = _with_evidence_schema(llm)
+        self._max_batch_size = max(1, max_batch_size)
+        self._wait_s = wait_s
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight = set()
+
+    async def submit(self, messages: List) -> Any:
+        """Encola una petición y espera su respuesta (o la excepción de su elemento del batch)."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((messages, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._collect())
+        return await future
+
+    async def _collect(self):
+        """Forma batches mientras haya jobs en cola; termina cuando la cola queda vacía."""
         loop = asyncio.get_running_loop()
-        # Si el semáforo existe y está en el loop correcto, usarlo
-        if _extractor_semaphore is not None:
-            return _extractor_semaphore
-        # Crear nuevo semáforo en el loop actual (concurrencia: 3 para más velocidad)
-        _extractor_semaphore = asyncio.Semaphore(3)
-        return _extractor_semaphore
-    except RuntimeError:
-        # No hay loop corriendo, crear uno nuevo (no debería pasar en uso normal)
-        _extractor_semaphore = asyncio.Semaphore(3)
-        return _extractor_semaphore
+        while not self._queue.empty():
+            jobs = [self._queue.get_nowait()]
+            deadline = loop.time() + self._wait_s
+            while len(jobs) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    jobs.append(await asyncio.wait_for(self._queue.get(), max(timeout, 0)))
+                except asyncio.TimeoutError:
+                    break
+            # El siguiente batch se forma mientras este está en vuelo
+            task = asyncio.create_task(self._dispatch(jobs))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, jobs: List):
+        """Una llamada abatch() para todo el batch; cada Future recibe su resultado o excepción."""
+        # Cada elemento del batch es una petición al proveedor: consume un crédito RPM
+        async with _get_extractor_limiter().acquire(len(jobs)):
+            requests = [messages for messages, _ in jobs]
+            results = None
+            if self._structured_llm is not None:
+                results = list(await self._call(self._structured_llm, requests))
+                rejected = [i for i, result in enumerate(results) if isinstance(result, Exception) and is_response_format_rejection(result)]
+                if rejected:
+                    # Proveedor sin response_format: repetir esas peticiones con JSON por prompt y
+                    # recordarlo. Otros errores (429, timeouts...) van al retry de _process_single_source
+                    logger.log_warning(f"      ⚠️  Structured output no soportado en extractor ({str(results[rejected[0]])[:100]}), usando JSON por prompt")
+                    self._structured_llm = None
+                    retried = await self._call(self._llm, [requests[i] for i in rejected])
+                    for i, result in zip(rejected, retried):
+                        results[i] = result
+            if results is None:
+                results = await self._call(self._llm, requests)
+        for (_, future), result in zip(jobs, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    async def _call(llm, requests: List[List]) -> List[Any]:
+        """Una llamada por batch (streaming por elemento o abatch); excepciones por elemento."""
+        try:
+            if EXTRACTOR_STREAM_LLM and hasattr(llm, 'astream'):
+                # Streaming por elemento: se corta en cuanto el JSON de evidencias está completo
+                return list(await asyncio.gather(
+                    *(astream_json(llm, messages) for messages in requests),
+                    return_exceptions=True
+                ))
+            return await llm.abatch(requests, return_exceptions=True)
+        except Exception as e:
+            return [e] * len(requests)
+
+
+_extractor_batcher = None
+_extractor_batcher_loop = None
+
+
+def _get_extractor_batcher() -> _BatchedExtractor:
+    """Batcher del extractor para el event loop actual."""
+    global _extractor_batcher, _extractor_batcher_loop
+    loop = asyncio.get_running_loop()
+    if _extractor_batcher is None or _extractor_batcher_loop is not loop:
+        # Usamos llm_mimo_cheap (MiMo free/regular) para extracción de claims (tarea económica)
+        # Si no está disponible, usar llm_planner como fallback
+        llm_extractor = llm_mimo_cheap if llm_mimo_cheap else llm_planner
+        _extractor_batcher = _BatchedExtractor(llm_extractor, EXTRACTOR_BATCH_SIZE, EXTRACTOR_BATCH_WAIT_MS / 1000)
+        _extractor_batcher_loop = loop
+    return _extractor_batcher
+
+
+# Pre-filtro léxico: sin solapamiento de términos con el tema no se paga la llamada LLM
+_TERM_RE = re.compile(r"\w{4,}")
+_MIN_TOPIC_OVERLAP = 2
+
+# Pool acotado para el parseo/reparación de JSON (CPU) fuera del event loop
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="extractor-json")
+
+# Caracteres de contenido enviados al LLM por fuente
+_CONTENT_LIMIT = 10000
+
+# Espacio en blanco redundante (markdown de Firecrawl): se compacta antes de recortar
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_INLINE_SPACES_RE = re.compile(r"[ \t]{2,}")
+
+
+def _compact_content(content: str) -> str:
+    """
+    Compacta saltos de línea y espacios repetidos y recorta a _CONTENT_LIMIT.
+    Solo se procesa el doble del límite: con páginas de cientos de KB el resto se descartaría igualmente.
+    """
+    content = _BLANK_LINES_RE.sub("\n\n", content[:2 * _CONTENT_LIMIT])
+    return _INLINE_SPACES_RE.sub(" ", content)[:_CONTENT_LIMIT]
+
+
+@lru_cache(maxsize=64)
+def _topic_terms(topic: str) -> frozenset:
+    """Términos (4+ caracteres, minúsculas) del tema; cacheado porque se repite por fuente."""
+    return frozenset(_TERM_RE.findall(topic.lower()))
+
+
+def _has_topic_overlap(topic: str, content: str) -> bool:
+    """True si el contenido comparte al menos _MIN_TOPIC_OVERLAP términos con el tema."""
+    topic_terms = _topic_terms(topic)
+    if len(topic_terms) < _MIN_TOPIC_OVERLAP:
+        # Temas de una sola palabra: el filtro sería demasiado agresivo
+        return True
+    content_terms = set(_TERM_RE.findall(content.lower()))
+    return len(topic_terms & content_terms) >= _MIN_TOPIC_OVERLAP
+
+
+# Casi duplicados (mirrors, sindicaciones, AMP): SimHash de 64 bits sobre términos del contenido.
+# Con 4 bandas de 16 bits, dos huellas a distancia <= 3 comparten al menos una banda exacta.
+_SIMHASH_MAX_DISTANCE = 3
+_SIMHASH_BANDS = 4
+
+
+def _simhash(text: str) -> Optional[int]:
+    """SimHash de 64 bits ponderado por frecuencia de término; None si no hay términos."""
+    weights = Counter(_TERM_RE.findall(text.lower()))
+    if not weights:
+        return None
+    vector = [0] * 64
+    for term, weight in weights.items():
+        term_hash = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            vector[bit] += weight if term_hash >> bit & 1 else -weight
+    return sum(1 << bit for bit, value in enumerate(vector) if value > 0)
+
+
+def _near_duplicate_groups(contents: List[str], indices: List[int]) -> Dict[int, List[int]]:
+    """
+    Agrupa los índices con contenido casi idéntico (LSH por bandas + union-find).
+
+    Returns:
+        Diccionario representante -> miembros del grupo (incluido el representante);
+        el representante es la fuente con más contenido.
+    """
+    parent = {i: i for i in indices}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    fingerprints: Dict[int, int] = {}
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for i in indices:
+        fingerprint = _simhash(contents[i])
+        if fingerprint is None:
+            continue
+        fingerprints[i] = fingerprint
+        for band in range(_SIMHASH_BANDS):
+            key = (band, fingerprint >> (16 * band) & 0xFFFF)
+            for j in buckets.get(key, ()):
+                if bin(fingerprint ^ fingerprints[j]).count("1") <= _SIMHASH_MAX_DISTANCE:
+                    parent[find(i)] = find(j)
+            buckets.setdefault(key, []).append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in indices:
+        groups.setdefault(find(i), []).append(i)
+    return {max(members, key=lambda k: len(contents[k])): members for members in groups.values()}
 
 
 async def extract_evidence_package(topic: str, search_results: List[Dict]) -> List[Dict]:
@@ -48,42 +438,19 @@ async def extract_evidence_package(topic: str, search_results: List[Dict]) -> Li
     Returns:
         Lista de fuentes enriquecidas con evidence_points
     """
-    global _extractor_rate_limited
-    
-    # Si el extractor está deshabilitado por rate limiting, saltar completamente
-    if _extractor_rate_limited:
-        logger.log_warning("⚠️  Extractor deshabilitado por rate limiting persistente. Saltando extracción.")
-        return search_results  # Devolver fuentes originales sin procesar
-    
     if not search_results:
         return []
 
     logger.log_phase("EXTRACTOR", f"Extrayendo evidencias de {len(search_results)} fuente(s)...")
 
-    # Agrupamos por fuente para procesar con concurrencia limitada
-    # Usar semáforo para evitar rate limiting masivo (máximo 3 simultáneas)
-    tasks = []
-    for source in search_results:
-        tasks.append(_process_single_source_with_semaphore(topic, source))
-
-    # Ejecución concurrente limitada para evitar rate limiting
     try:
-        evidence_packs = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filtrar errores y None, mantener fuentes originales si falla la extracción
-        enriched_sources = []
-        for i, pack in enumerate(evidence_packs):
-            if isinstance(pack, Exception):
-                logger.log_warning(f"      ⚠️  Error extrayendo evidencias de fuente {i+1}: {pack}")
-                # Mantener la fuente original sin evidencias
-                enriched_sources.append(search_results[i])
-            elif pack:
-                enriched_sources.append(pack)
-            else:
-                # Si no hay evidencias pero no hay error, mantener la fuente original
-                enriched_sources.append(search_results[i])
+        # Fuentes sin evidencias (filtradas, error o None) se mantienen sin cambios
+        enriched_sources = list(search_results)
+        extracted_count = 0
+        async for i, enriched in iter_evidence_package(topic, search_results):
+            enriched_sources[i] = enriched
+            extracted_count += 1
 
-        extracted_count = sum(1 for s in enriched_sources if s.get('extracted', False))
         logger.log_info(f"      ✅ Evidencias extraídas de {extracted_count}/{len(enriched_sources)} fuente(s)")
 
         return enriched_sources
@@ -94,96 +461,128 @@ async def extract_evidence_package(topic: str, search_results: List[Dict]) -> Li
         return search_results
 
 
-async def _process_single_source_with_semaphore(topic: str, source: Dict) -> Optional[Dict]:
+async def prefetch_evidence_package(topic: str, search_results: List[Dict]) -> None:
     """
-    Wrapper que usa semáforo para limitar concurrencia y agrega delay entre llamadas.
+    Extrae evidencias solo para poblar el cache (tema, contenido): una llamada posterior
+    a extract_evidence_package con las mismas fuentes las sirve sin LLM.
+    Sin escritura de cache (CACHE_MODE distinto de ENABLED) no hace nada.
     """
-    global _extractor_rate_limited
-    
-    # Si está deshabilitado, retornar None inmediatamente
-    if _extractor_rate_limited:
-        return None
-    
-    # Obtener semáforo del event loop actual
-    semaphore = _get_extractor_semaphore()
-    
-    async with semaphore:
-        # Delay reducido entre llamadas (0.3s es suficiente para evitar rate limiting con concurrencia 3)
-        await asyncio.sleep(0.3)  # 0.3 segundos entre cada extracción (reducido de 1.0s)
-        result = await _process_single_source(topic, source)
-        return result
+    if CACHE_MODE is not CacheMode.ENABLED or not search_results:
+        return
+    async for _ in iter_evidence_package(topic, search_results):
+        pass
+
+
+async def _indexed(i: int, coro) -> Tuple[int, Any]:
+    """Resultado de la corrutina junto a su índice (la excepción como valor)."""
+    try:
+        return i, await coro
+    except Exception as e:
+        return i, e
 
 
-async def _process_single_source(topic: str, source: Dict) -> Optional[Dict]:
+async def iter_evidence_package(topic: str, search_results: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
     """
-    Procesa una fuente individual usando LLM para extraer evidencias.
+    Extrae evidencias y produce (índice, fuente enriquecida) según termina cada fuente,
+    sin esperar a la más lenta. Solo se producen las fuentes con evidence_points.
 
     Args:
         topic: Tema del reporte
-        source: Diccionario con información de la fuente (url, snippet, raw_content, etc.)
+        search_results: Lista de resultados de búsqueda brutos
 
-    Returns:
-        Fuente enriquecida con evidence_points o None si no hay información útil
+    Yields:
+        Tupla (índice en search_results, fuente combinada con sus evidence_points)
     """
-    # Obtener contenido priorizando raw_content
-    content = source.get('raw_content') or source.get('snippet', '')
-    if not content or len(content.strip()) < 50:  # Muy poco contenido, saltar
-        return None
-
-    url = source.get('url', 'N/A')
-    title = source.get('title', 'Sin título')
+    # Una sola pasada sobre los dicts (struct-of-arrays): el resto del pipeline trabaja con listas
+    urls = [s.get('url') or 'N/A' for s in search_results]
+    titles = [s.get('title') or 'Sin título' for s in search_results]
+    # Compactado y recorte a _CONTENT_LIMIT una sola vez: filtro, clave de cache y prompt usan la misma cadena
+    contents = [_compact_content(s.get('raw_content') or s.get('snippet') or '') for s in search_results]
+
+    # Solo van al LLM las fuentes con contenido suficiente y términos del tema
+    keep_idx = [
+        i for i, content in enumerate(contents)
+        if len(content.strip()) >= 50 and _has_topic_overlap(topic, content)
+    ]
+
+    # Un solo LLM call por grupo de casi duplicados; sus evidencias se copian al resto del grupo
+    groups = _near_duplicate_groups(contents, keep_idx)
+    if len(groups) < len(keep_idx):
+        logger.log_info(f"      🔁 {len(keep_idx) - len(groups)} fuente(s) casi duplicadas reutilizan la extracción de su grupo")
+
+    # Estado propio de esta ejecución: un rate limit persistente no afecta a ejecuciones posteriores
+    run_context = contextvars.copy_context()
+    run_context.run(_current_run.set, _ExtractorRun())
+
+    # El batcher agrupa las fuentes concurrentes y aplica concurrencia y límite RPM
+    tasks = [
+        run_context.run(
+            asyncio.ensure_future,
+            _indexed(i, _process_single_source_with_semaphore(topic, urls[i], titles[i], contents[i]))
+        )
+        for i in groups
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            i, pack = await next_done
+            if isinstance(pack, Exception):
+                logger.log_warning(f"      ⚠️  Error extrayendo evidencias de fuente {i+1}: {pack}")
+            elif pack:
+                for member in groups[i]:
+                    yield member, {**search_results[member], **pack}
+    finally:
+        # Consumidor que abandona la iteración: no dejar extracciones huérfanas
+        for task in tasks:
+            task.cancel()
+        _flush_evidence_cache()
 
-    system_msg = f"""Eres un Analista de Extracción de Datos de Precisión. 
-Tu misión es transformar texto bruto en un 'Evidence Pack' libre de ruido.
-TEMA: {topic}
 
-REGLAS:
-1. Extrae solo hechos atómicos y citas textuales exactas relacionadas con el tema.
-2. Ignora publicidad, menús de navegación, avisos legales y contenido irrelevante.
-3. Si no hay información útil sobre el tema, devuelve un JSON vacío con "evidence_points": [].
-4. Cada evidencia debe ser verificable y citable directamente.
-5. Las citas deben ser textuales (exactas) o parafraseadas con precisión.
+async def _process_single_source_with_semaphore(topic: str, url: str, title: str, content: str) -> Optional[Dict]:
+    """
+    Wrapper que salta la fuente si la ejecución actual está deshabilitada por rate limiting.
+    La concurrencia y el límite RPM los aplica el batcher (por batch, no por fuente).
+    """
+    run = _current_run.get()
+    if run is not None and run.rate_limited:
+        return None
+    
+    return await _process_single_source(topic, url, title, content)
 
-CATEGORÍAS sugeridas (puedes usar otras si es apropiado):
-- "data": Datos numéricos, estadísticas, métricas
-- "quote": Citas directas de personas o documentos
-- "fact": Hechos objetivos verificables
-- "claim": Afirmaciones o declaraciones de organizaciones
-- "date": Información temporal relevante
 
-OUTPUT JSON (OBLIGATORIO):
-{{
-  "evidence_points": [
-    {{
-      "fact": "descripción breve del hecho o información clave",
-      "exact_quote": "cita textual exacta o parafraseo preciso",
-      "category": "data|quote|fact|claim|date"
-    }}
-  ]
-}}
+async def _process_single_source(topic: str, url: str, title: str, content: str) -> Optional[Dict]:
+    """
+    Procesa una fuente individual usando LLM para extraer evidencias.
 
-Si no encuentras información útil, responde con:
-{{
-  "evidence_points": []
-}}"""
+    Args:
+        topic: Tema del reporte
+        url: URL de la fuente
+        title: Título de la fuente
+        content: raw_content (o snippet) de la fuente, ya compactado y recortado (_compact_content)
 
-    # Aumentar límite de contenido para extraer más evidencias de calidad
-    # Usar hasta 10,000 caracteres para documentos largos (mejora calidad de insights)
-    content_limit = 10000
-    content_truncated = content[:content_limit] if len(content) > content_limit else content
+    Returns:
+        Campos a añadir a la fuente (evidence_points, extracted y, si vienen del cache,
+        evidence_from_cache: from_cache es el flag del evaluador) o None si no hay información útil
+    """
+    # Cache (tema, contenido): sin llamada LLM si ya se extrajo antes
+    cache_key = _evidence_cache_key(topic, content)
+    cached_points = _get_cached_evidence(cache_key)
+    if cached_points is not None:
+        if not cached_points:
+            return None
+        return {"evidence_points": cached_points, "extracted": True, "evidence_from_cache": True}
     
-    user_msg = f"""FUENTE: {url}
-TÍTULO: {title}
+    system_msg = f"{_EXTRACTOR_SYSTEM_PREFIX}\nTEMA: {topic}"
 
-CONTENIDO:
-{content_truncated}
-
-Extrae las evidencias en el formato JSON especificado. Si no hay información útil sobre "{topic}", devuelve un JSON con "evidence_points": []."""
+    # join en vez de f-string: el contenido (hasta 10 KB) se copia una sola vez
+    user_msg = "".join((
+        "FUENTE: ", url, "\nTÍTULO: ", title, "\n\nCONTENIDO:\n", content,
+        "\n\nExtrae las evidencias en el formato JSON especificado. Si no hay información útil sobre \"",
+        topic, "\", devuelve un JSON con \"evidence_points\": [].",
+    ))
 
     try:
-        # Usamos llm_mimo_cheap (MiMo free/regular) para extracción de claims (tarea económica)
-        # Si no está disponible, usar llm_planner como fallback
-        llm_extractor = llm_mimo_cheap if llm_mimo_cheap else llm_planner
+        # Las fuentes concurrentes se agrupan en una sola llamada abatch() al LLM extractor
+        batcher = _get_extractor_batcher()
         
         # Manejo de rate limiting con reintentos
         max_retries = 3
@@ -192,10 +591,7 @@ Extrae las evidencias en el formato JSON especificado. Si no hay información ú
         
         for attempt in range(max_retries):
             try:
-                response = await llm_extractor.ainvoke([
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_msg}
-                ])
+                response = await batcher.submit([SystemMessage(content=system_msg), HumanMessage(content=user_msg)])
                 break  # Éxito, salir del loop
             except Exception as e:
                 error_str = str(e).lower()
@@ -212,13 +608,13 @@ Extrae las evidencias en el formato JSON especificado. Si no hay información ú
                     continue
                 elif attempt == max_retries - 1:
                     # Último intento fallido - no reintentar más, retornar None
-                    global _extractor_rate_limited
-                    
                     if is_rate_limit:
                         logger.log_warning(f"      ⚠️  Rate limit persistente después de {max_retries} intentos. Saltando extracción para esta fuente.")
-                        # Si hay múltiples rate limits, deshabilitar extractor completamente
-                        _extractor_rate_limited = True
-                        logger.log_warning(f"      ⚠️  DESHABILITANDO extractor para el resto de la ejecución por rate limiting persistente.")
+                        # Si hay múltiples rate limits, deshabilitar el extractor en esta ejecución
+                        run = _current_run.get()
+                        if run is not None:
+                            run.rate_limited = True
+                        logger.log_warning(f"      ⚠️  DESHABILITANDO extractor para el resto de esta extracción por rate limiting persistente.")
                     else:
                         logger.log_warning(f"      ⚠️  Error en extractor después de {max_retries} intentos: {error_str[:100]}...")
                     # No hacer raise, simplemente retornar None para continuar con el resto de las fuentes
@@ -234,118 +630,29 @@ Extrae las evidencias en el formato JSON especificado. Si no hay información ú
         if response is None:
             return None
 
-        content_text = response.content.strip() if hasattr(response, "content") else str(response).strip()
-
-        # Limpieza de markdown si el modelo lo incluye
-        if "```json" in content_text:
-            content_text = content_text.split("```json")[-1].split("```")[0].strip()
-        elif "```" in content_text:
-            # Buscar cualquier bloque de código
-            parts = content_text.split("```")
-            if len(parts) >= 3:
-                content_text = parts[1].strip()
-                if content_text.startswith("json"):
-                    content_text = content_text[4:].strip()
-
-        # Intentar parsear JSON con manejo robusto de errores
-        data = None
+        # AIMessage (abatch) o str (streaming); strip y bloques ```json los resuelve clean_and_parse_json
+        content_text = getattr(response, "content", response)
+        if not isinstance(content_text, str):
+            content_text = str(content_text)
+
+        # Markdown, orjson (camino rápido) y reparación en una pasada (comas finales,
+        # comentarios, backslashes, texto alrededor) con el parser compartido.
+        # En un hilo: la reparación de ~10 KB no bloquea el resto de fuentes en vuelo
         try:
-            data = json.loads(content_text)
+            data = await asyncio.get_running_loop().run_in_executor(_PARSE_EXECUTOR, clean_and_parse_json, content_text)
         except json.JSONDecodeError as json_err:
-            # Intentar reparar JSON mal formado o extraer parte válida
-            try:
-                # Estrategia 1: Buscar el primer objeto JSON completo (entre {})
-                json_start = content_text.find('{')
-                if json_start != -1:
-                    # Intentar encontrar el cierre correspondiente
-                    brace_count = 0
-                    json_end = -1
-                    for i in range(json_start, len(content_text)):
-                        if content_text[i] == '{':
-                            brace_count += 1
-                        elif content_text[i] == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                json_end = i + 1
-                                break
-                    
-                    if json_end > json_start:
-                        # Extraer el JSON completo
-                        json_substring = content_text[json_start:json_end]
-                        
-                        # Intentar reparar problemas comunes de JSON
-                        # 1. Comillas simples en lugar de dobles
-                        json_substring = json_substring.replace("'", '"')
-                        # 2. Comas finales antes de }
-                        json_substring = re.sub(r',\s*}', '}', json_substring)
-                        json_substring = re.sub(r',\s*]', ']', json_substring)
-                        # 3. Strings sin cerrar (heurística simple)
-                        # Contar comillas dobles - si es impar, añadir una al final del último string
-                        
-                        try:
-                            data = json.loads(json_substring)
-                        except json.JSONDecodeError as inner_err:
-                            # Estrategia 2: Intentar extraer evidence_points parcialmente usando regex
-                            evidence_pattern = r'"evidence_points"\s*:\s*\[(.*?)\]'
-                            match = re.search(evidence_pattern, json_substring, re.DOTALL)
-                            if match:
-                                evidence_content = match.group(1).strip()
-                                if evidence_content:
-                                    # Intentar parsear items individuales
-                                    evidence_items = []
-                                    # Buscar objetos individuales dentro del array
-                                    item_pattern = r'\{[^{}]*\}'
-                                    for item_match in re.finditer(item_pattern, evidence_content):
-                                        try:
-                                            item_json = item_match.group(0)
-                                            # Reparar comillas simples
-                                            item_json = item_json.replace("'", '"')
-                                            item = json.loads(item_json)
-                                            evidence_items.append(item)
-                                        except:
-                                            continue
-                                    
-                                    if evidence_items:
-                                        data = {"evidence_points": evidence_items}
-                                        logger.log_info(f"      ✅ Extraídos {len(evidence_items)} evidence_points parcialmente del JSON corrupto")
-                                    else:
-                                        # No se pudieron extraer items, usar vacío
-                                        logger.log_warning(f"      ⚠️  JSON corrupto: se encontró 'evidence_points' pero no se pudieron extraer items. Usando fallback vacío.")
-                                        data = {"evidence_points": []}
-                                else:
-                                    # Array vacío encontrado
-                                    data = {"evidence_points": []}
-                            else:
-                                # No se encontró evidence_points, usar fallback
-                                if '"evidence_points"' in content_text or "'evidence_points'" in content_text:
-                                    logger.log_warning(f"      ⚠️  JSON corrupto, usando fallback: evidence_points vacío")
-                                    data = {"evidence_points": []}
-                                else:
-                                    raise inner_err
-                    else:
-                        # No se pudo encontrar el cierre, intentar extraer parcialmente
-                        if '"evidence_points"' in content_text or "'evidence_points'" in content_text:
-                            logger.log_warning(f"      ⚠️  JSON corrupto (sin cierre), usando fallback: evidence_points vacío")
-                            data = {"evidence_points": []}
-                        else:
-                            raise
-                else:
-                    # No hay {, usar fallback
-                    if '"evidence_points"' in content_text or "'evidence_points'" in content_text:
-                        logger.log_warning(f"      ⚠️  JSON corrupto (sin objeto), usando fallback: evidence_points vacío")
-                        data = {"evidence_points": []}
-                    else:
-                        raise
-            except Exception as repair_err:
-                # Si todo falla, usar JSON vacío como fallback
-                logger.log_warning(f"      ⚠️  No se pudo reparar JSON mal formado de fuente {url[:50]}. Error original: {json_err}. Error de reparación: {repair_err}")
-                logger.log_warning(f"      📋 Primeros 200 caracteres de la respuesta: {content_text[:200]}")
-                data = {"evidence_points": []}
+            logger.log_warning(f"      ⚠️  No se pudo reparar JSON mal formado de fuente {url[:50]}: {json_err}")
+            logger.log_warning(f"      📋 Primeros 200 caracteres de la respuesta: {content_text.lstrip()[:200]}")
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("evidence_points", []), list):
+            # Solo respuestas parseadas se cachean (también "sin evidencias")
+            _cache_evidence(cache_key, data.get("evidence_points", []))
+        else:
+            data = {"evidence_points": []}
 
         if data.get("evidence_points") and len(data["evidence_points"]) > 0:
-            # Combinamos la info original de la fuente con las evidencias extraídas
+            # extract_evidence_package lo combina con la info original de la fuente
             return {
-                **source,  # Preservar todos los campos originales
                 "evidence_points": data["evidence_points"],
                 "extracted": True
             }
@@ -3,8 +3,74 @@ Módulo Firecrawl Client: Extrae contenido limpio en Markdown desde URLs usando
 """
 import aiohttp
 import asyncio
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from .config import FIRECRAWL_REQUESTS_PER_MINUTE
 from .logger import logger
+from .utils import AsyncTokenBucket, LoopLocal, canonicalize_url
+
+FIRECRAWL_SCRAPE_URL = "https://api.firecrawl.dev/v1/scrape"
+FIRECRAWL_BATCH_SCRAPE_URL = "https://api.firecrawl.dev/v1/batch/scrape"
+
+# Polling del job batch: backoff exponencial entre consultas de estado
+_BATCH_POLL_INITIAL_DELAY = 0.5
+_BATCH_POLL_MAX_DELAY = 5.0
+
+# Control de admisión adaptativo: reintentos con backoff exponencial ante 429/5xx y
+# número de éxitos seguidos necesarios para volver a subir el límite de concurrencia
+_ADMISSION_MAX_RETRIES = 2
+_ADMISSION_BACKOFF_INITIAL = 1.0
+_ADMISSION_GROW_AFTER = 3
+
+# Sesión HTTP compartida (por event loop): keep-alive evita un handshake TCP+TLS por URL
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop = None
+_session_closer: Optional[asyncio.Task] = None
+
+
+async def _close_on_loop_shutdown(session: aiohttp.ClientSession):
+    """
+    Tarea centinela: espera indefinidamente y cierra la sesión al cancelarse
+    (asyncio.run cancela las tareas pendientes al terminar el loop).
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await session.close()
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Devuelve la sesión compartida del event loop actual, creándola en el primer uso."""
+    global _session, _session_loop, _session_closer
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=60)
+        _session = aiohttp.ClientSession(connector=connector)
+        _session_loop = loop
+        _session_closer = loop.create_task(_close_on_loop_shutdown(_session))
+    return _session
+
+
+# Peticiones por minuto a Firecrawl (token bucket por event loop): una ráfaga espera en
+# local en lugar de provocar 429 y entrar en reintentos con backoff
+_request_bucket = LoopLocal(lambda: AsyncTokenBucket(FIRECRAWL_REQUESTS_PER_MINUTE))
+
+
+async def _acquire_request():
+    """Reserva una petición en el bucket del event loop actual (sin límite si requests_per_minute = 0)."""
+    if FIRECRAWL_REQUESTS_PER_MINUTE <= 0:
+        return
+    await _request_bucket.get().acquire()
+
+
+async def close_firecrawl_session():
+    """Cierra la sesión compartida (opcional: se cierra sola al terminar el event loop)."""
+    global _session, _session_closer
+    if _session_closer is not None:
+        _session_closer.cancel()
+        _session_closer = None
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
 
 
 async def fetch_firecrawl_markdown(url: str, api_key: str, timeout_seconds: int = 30) -> Tuple[Optional[str], Dict]:
@@ -24,7 +90,6 @@ async def fetch_firecrawl_markdown(url: str, api_key: str, timeout_seconds: int
     if not url or not api_key:
         return None, {"status": "error", "error": "Missing URL or API key"}
     
-    base_url = "https://api.firecrawl.dev/v1/scrape"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
@@ -39,94 +104,94 @@ async def fetch_firecrawl_markdown(url: str, api_key: str, timeout_seconds: int
     try:
         logger.log_info(f"🕷️  [Firecrawl] Extrayendo contenido de {url[:50]}...")
         timeout = aiohttp.ClientTimeout(total=timeout_seconds)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(base_url, json=payload, headers=headers) as response:
-                status_code = response.status
-                
-                # Verificar código de estado
-                if status_code == 200:
-                    try:
-                        data = await response.json()
-                        
-                        # Firecrawl devuelve el contenido en diferentes estructuras según la versión de API
-                        # v1: {"success": true, "data": {"markdown": "..."}}
-                        # v0: {"markdown": "..."} o {"data": {"markdown": "..."}}
-                        markdown_content = None
-                        if isinstance(data, dict):
-                            # Intentar diferentes posibles estructuras de respuesta
-                            if "data" in data and isinstance(data["data"], dict):
-                                markdown_content = data["data"].get("markdown")
-                            elif "markdown" in data:
-                                markdown_content = data["markdown"]
-                            elif "content" in data:
-                                markdown_content = data["content"]
-                            
-                            # Actualizar metadata con información de la respuesta
-                            metadata.update({
-                                "status": "success",
-                                "status_code": status_code,
-                                "response_keys": list(data.keys()) if isinstance(data, dict) else []
-                            })
+        session = await _get_session()
+        async with session.post(FIRECRAWL_SCRAPE_URL, json=payload, headers=headers, timeout=timeout) as response:
+            status_code = response.status
+            
+            # Verificar código de estado
+            if status_code == 200:
+                try:
+                    data = await response.json()
+                    
+                    # Firecrawl devuelve el contenido en diferentes estructuras según la versión de API
+                    # v1: {"success": true, "data": {"markdown": "..."}}
+                    # v0: {"markdown": "..."} o {"data": {"markdown": "..."}}
+                    markdown_content = None
+                    if isinstance(data, dict):
+                        # Intentar diferentes posibles estructuras de respuesta
+                        if "data" in data and isinstance(data["data"], dict):
+                            markdown_content = data["data"].get("markdown")
+                        elif "markdown" in data:
+                            markdown_content = data["markdown"]
+                        elif "content" in data:
+                            markdown_content = data["content"]
                         
-                        if markdown_content:
-                            logger.log_success(f"✅ [Firecrawl] Contenido extraído: {len(markdown_content)} caracteres")
-                            return markdown_content, metadata
-                        else:
-                            logger.log_warning(f"⚠️  [Firecrawl] Respuesta sin contenido markdown para {url[:50]}")
-                            metadata["status"] = "no_content"
-                            metadata["error"] = "Response missing markdown content"
-                            return None, metadata
-                            
-                    except ValueError as e:
-                        # Error parseando JSON
-                        logger.log_warning(f"⚠️  [Firecrawl] Error parseando JSON: {e}")
-                        response_text = await response.text()
+                        # Actualizar metadata con información de la respuesta
                         metadata.update({
-                            "status": "json_error",
-                            "error": str(e),
+                            "status": "success",
                             "status_code": status_code,
-                            "response_preview": response_text[:200] if response_text else None
+                            "response_keys": list(data.keys()) if isinstance(data, dict) else []
                         })
-                        return None, metadata
-                
-                elif status_code == 429:
-                    # Rate limit
-                    logger.log_warning(f"⚠️  [Firecrawl] Rate limit (429) para {url[:50]}")
-                    metadata.update({
-                        "status": "rate_limited",
-                        "status_code": 429,
-                        "error": "Rate limit exceeded"
-                    })
-                    return None, metadata
-                
-                elif status_code == 402:
-                    # Payment required / credits exhausted
-                    logger.log_warning(f"⚠️  [Firecrawl] Créditos agotados (402) para {url[:50]}")
-                    metadata.update({
-                        "status": "credits_exhausted",
-                        "status_code": 402,
-                        "error": "Credits exhausted"
-                    })
-                    return None, metadata
-                
-                else:
-                    # Otro error HTTP
-                    error_msg = f"HTTP {status_code}"
-                    try:
-                        error_data = await response.json()
-                        if isinstance(error_data, dict) and "error" in error_data:
-                            error_msg = error_data["error"]
-                    except:
-                        pass
                     
-                    logger.log_warning(f"⚠️  [Firecrawl] Error HTTP {status_code}: {error_msg}")
+                    if markdown_content:
+                        logger.log_success(f"✅ [Firecrawl] Contenido extraído: {len(markdown_content)} caracteres")
+                        return markdown_content, metadata
+                    else:
+                        logger.log_warning(f"⚠️  [Firecrawl] Respuesta sin contenido markdown para {url[:50]}")
+                        metadata["status"] = "no_content"
+                        metadata["error"] = "Response missing markdown content"
+                        return None, metadata
+                        
+                except ValueError as e:
+                    # Error parseando JSON
+                    logger.log_warning(f"⚠️  [Firecrawl] Error parseando JSON: {e}")
+                    response_text = await response.text()
                     metadata.update({
-                        "status": "http_error",
+                        "status": "json_error",
+                        "error": str(e),
                         "status_code": status_code,
-                        "error": error_msg
+                        "response_preview": response_text[:200] if response_text else None
                     })
                     return None, metadata
             
+            elif status_code == 429:
+                # Rate limit
+                logger.log_warning(f"⚠️  [Firecrawl] Rate limit (429) para {url[:50]}")
+                metadata.update({
+                    "status": "rate_limited",
+                    "status_code": 429,
+                    "error": "Rate limit exceeded"
+                })
+                return None, metadata
+            
+            elif status_code == 402:
+                # Payment required / credits exhausted
+                logger.log_warning(f"⚠️  [Firecrawl] Créditos agotados (402) para {url[:50]}")
+                metadata.update({
+                    "status": "credits_exhausted",
+                    "status_code": 402,
+                    "error": "Credits exhausted"
+                })
+                return None, metadata
+            
+            else:
+                # Otro error HTTP
+                error_msg = f"HTTP {status_code}"
+                try:
+                    error_data = await response.json()
+                    if isinstance(error_data, dict) and "error" in error_data:
+                        error_msg = error_data["error"]
+                except:
+                    pass
+                
+                logger.log_warning(f"⚠️  [Firecrawl] Error HTTP {status_code}: {error_msg}")
+                metadata.update({
+                    "status": "http_error",
+                    "status_code": status_code,
+                    "error": error_msg
+                })
+                return None, metadata
+        
     except asyncio.TimeoutError:
         logger.log_warning(f"⚠️  [Firecrawl] Timeout después de {timeout_seconds}s para {url[:50]}")
         metadata.update({
@@ -150,3 +215,216 @@ async def fetch_firecrawl_markdown(url: str, api_key: str, timeout_seconds: int
             "error": str(e)
         })
         return None, metadata
+
+
+def _is_overload_response(metadata: Dict) -> bool:
+    """True si la metadata de Firecrawl indica sobrecarga del servicio (429 o 5xx)."""
+    return metadata.get("status") == "rate_limited" or (metadata.get("status_code") or 0) >= 500
+
+
+class AdmissionController:
+    """
+    Límite de concurrencia redimensionable (un asyncio.Semaphore no admite cambiar su valor).
+    
+    Un contador de peticiones en vuelo protegido por un asyncio.Condition: se entra cuando
+    in_flight < limit. Cada 429/5xx reduce el límite a la mitad (mínimo 1) y cada
+    _ADMISSION_GROW_AFTER éxitos seguidos lo sube en 1 hasta max_limit.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.successes = 0
+        self.condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify(1)
+
+    async def record(self, metadata: Dict) -> bool:
+        """Ajusta el límite según el resultado de una petición; devuelve True si hubo sobrecarga."""
+        overloaded = _is_overload_response(metadata)
+        async with self.condition:
+            if overloaded:
+                self.successes = 0
+                if self.limit > 1:
+                    self.limit = max(1, self.limit // 2)
+                    logger.log_warning(f"⚠️  [Firecrawl] Sobrecarga ({metadata.get('status_code', metadata.get('status'))}): concurrencia reducida a {self.limit}")
+            elif metadata.get("status") == "success":
+                self.successes += 1
+                if self.successes >= _ADMISSION_GROW_AFTER and self.limit < self.max_limit:
+                    self.successes = 0
+                    self.limit += 1
+                    # Hay hueco nuevo: despertar a una tarea en espera
+                    self.condition.notify(1)
+        return overloaded
+
+    async def fetch(self, url: str, api_key: str, timeout_seconds: int = 30) -> Tuple[Optional[str], Dict]:
+        """
+        fetch_firecrawl_markdown bajo el control de admisión, con reintentos y backoff
+        exponencial ante 429/5xx (la espera se hace fuera del hueco de concurrencia).
+        """
+        delay = _ADMISSION_BACKOFF_INITIAL
+        for attempt in range(_ADMISSION_MAX_RETRIES + 1):
+            # Presupuesto RPM antes de ocupar hueco: la espera no bloquea concurrencia
+            await _acquire_request()
+            async with self:
+                markdown_content, metadata = await fetch_firecrawl_markdown(url, api_key, timeout_seconds)
+            if not await self.record(metadata) or attempt == _ADMISSION_MAX_RETRIES:
+                return markdown_content, metadata
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+def _http_error_metadata(status_code: int, error: Optional[str] = None) -> Dict:
+    """Metadata de error para un código HTTP de Firecrawl (429, 402 u otro)."""
+    if status_code == 429:
+        return {"status": "rate_limited", "status_code": 429, "error": "Rate limit exceeded"}
+    if status_code == 402:
+        return {"status": "credits_exhausted", "status_code": 402, "error": "Credits exhausted"}
+    return {"status": "http_error", "status_code": status_code, "error": error or f"HTTP {status_code}"}
+
+
+async def fetch_firecrawl_markdown_batch(
+    urls: List[str],
+    api_key: str,
+    timeout_seconds: int = 60
+) -> Dict[str, Tuple[Optional[str], Dict]]:
+    """
+    Extrae varias URLs con un solo job de /v1/batch/scrape (un submit + polling del estado).
+    
+    Args:
+        urls: URLs a extraer
+        api_key: API key de Firecrawl
+        timeout_seconds: Tiempo máximo total (submit + polling) en segundos
+    
+    Returns:
+        Dict url -> (markdown_text, metadata), con la misma forma que fetch_firecrawl_markdown
+        para cada URL (markdown None si esa URL falla o el job no termina a tiempo)
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return {}
+    if not api_key:
+        return {url: (None, {"url": url, "status": "error", "error": "Missing URL or API key"}) for url in urls}
+    if len(urls) == 1:
+        # Una sola URL: /v1/scrape responde directamente, sin job ni polling
+        return {urls[0]: await fetch_firecrawl_markdown(urls[0], api_key, timeout_seconds)}
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    # Estado común del job; cada URL sin resultado se queda con él
+    job_metadata: Dict = {"status": "unknown"}
+    pages: List[Dict] = []
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+    
+    try:
+        logger.log_info(f"🕷️  [Firecrawl] Batch scrape de {len(urls)} URLs...")
+        await _acquire_request()
+        session = await _get_session()
+        async with session.post(
+            FIRECRAWL_BATCH_SCRAPE_URL,
+            json={"urls": urls, "formats": ["markdown"]},
+            headers=headers,
+            timeout=timeout
+        ) as response:
+            if response.status != 200:
+                job_metadata = _http_error_metadata(response.status)
+                logger.log_warning(f"⚠️  [Firecrawl] Error en batch scrape: {job_metadata['error']}")
+                job = {}
+            else:
+                job = await response.json()
+        
+        job_id = job.get("id") if isinstance(job, dict) else None
+        if job_id:
+            job_metadata = {"status": "scraping", "job_id": job_id}
+            poll_url = f"{FIRECRAWL_BATCH_SCRAPE_URL}/{job_id}"
+            delay = _BATCH_POLL_INITIAL_DELAY
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    job_metadata.update({"status": "timeout", "error": f"Batch job not completed after {timeout_seconds}s"})
+                    logger.log_warning(f"⚠️  [Firecrawl] Timeout del batch job {job_id} después de {timeout_seconds}s")
+                    break
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, _BATCH_POLL_MAX_DELAY)
+                
+                async with session.get(poll_url, headers=headers, timeout=timeout) as response:
+                    if response.status != 200:
+                        if response.status in (429, 402):
+                            job_metadata.update(_http_error_metadata(response.status))
+                            break
+                        continue  # Error transitorio de polling: reintentar hasta el deadline
+                    status_data = await response.json()
+                
+                status = status_data.get("status")
+                if status == "completed":
+                    pages.extend(status_data.get("data") or [])
+                    # Resultados paginados: "next" apunta a la siguiente página
+                    next_url = status_data.get("next")
+                    while next_url:
+                        async with session.get(next_url, headers=headers, timeout=timeout) as response:
+                            page_data = await response.json()
+                        pages.extend(page_data.get("data") or [])
+                        next_url = page_data.get("next")
+                    job_metadata["status"] = "completed"
+                    break
+                if status == "failed":
+                    job_metadata.update({"status": "failed", "error": status_data.get("error", "Batch job failed")})
+                    logger.log_warning(f"⚠️  [Firecrawl] Batch job {job_id} fallido")
+                    break
+        elif job_metadata.get("status") == "unknown":
+            job_metadata = {"status": "error", "error": "Batch response missing job id"}
+    
+    except asyncio.TimeoutError:
+        logger.log_warning(f"⚠️  [Firecrawl] Timeout del batch scrape después de {timeout_seconds}s")
+        job_metadata.update({"status": "timeout", "error": f"Request timeout after {timeout_seconds}s"})
+    except aiohttp.ClientError as e:
+        logger.log_warning(f"⚠️  [Firecrawl] Error de conexión en batch: {str(e)[:100]}")
+        job_metadata.update({"status": "connection_error", "error": str(e)})
+    except Exception as e:
+        logger.log_error(f"❌ [Firecrawl] Error inesperado en batch: {e}")
+        job_metadata.update({"status": "unknown_error", "error": str(e)})
+    
+    # Repartir las páginas por URL (sourceURL puede diferir en forma: comparar canonicalizada)
+    by_canonical = {}
+    for page in pages:
+        page_meta = page.get("metadata") or {}
+        source_url = page_meta.get("sourceURL") or page_meta.get("url") or ""
+        if source_url:
+            by_canonical.setdefault(canonicalize_url(source_url), page)
+    
+    results: Dict[str, Tuple[Optional[str], Dict]] = {}
+    success_count = 0
+    for url in urls:
+        page = by_canonical.get(canonicalize_url(url))
+        if page is None:
+            if job_metadata.get("status") == "completed":
+                results[url] = (None, {"url": url, "status": "no_content", "error": "URL missing from batch results"})
+            else:
+                results[url] = (None, {"url": url, **job_metadata})
+            continue
+        markdown_content = page.get("markdown")
+        status_code = (page.get("metadata") or {}).get("statusCode")
+        if markdown_content:
+            success_count += 1
+            results[url] = (markdown_content, {"url": url, "status": "success", "status_code": status_code, "job_id": job_metadata.get("job_id")})
+        else:
+            results[url] = (None, {"url": url, "status": "no_content", "status_code": status_code, "error": "Response missing markdown content"})
+    
+    if job_metadata.get("status") == "completed":
+        logger.log_success(f"✅ [Firecrawl] Batch completado: {success_count}/{len(urls)} URLs con contenido")
+    return results
@@ -4,25 +4,31 @@ Incluye Quality Gate y estadísticas de evaluación.
 """
 import time
 import asyncio
-from typing import Dict, List
+import hashlib
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
 from langgraph.graph import StateGraph, END
 
 from .state import ResearchState
-from .config import CURRENT_PLANNER_MODEL, CURRENT_JUDGE_MODEL, MIN_ACCEPTED_SOURCES, MAX_ACCEPTED_SOURCES, MAX_RETRIES, VERIFIER_ENABLED, QUERY_EXPANSION_ENABLED, URL_VALIDATION_ENABLED, EVAL_GENERAL_MEDIA_MAX_RATIO, CONTEXT_QUERY_VARIANTS_ENABLED, SMART_SEARCH_ENABLED, get_dynamic_config, MAX_RESULTS_PER_QUERY, MAX_SEARCH_QUERIES
+from .config import CURRENT_PLANNER_MODEL, CURRENT_JUDGE_MODEL, MIN_ACCEPTED_SOURCES, MAX_ACCEPTED_SOURCES, MAX_RETRIES, VERIFIER_ENABLED, QUERY_EXPANSION_ENABLED, URL_VALIDATION_ENABLED, EVAL_GENERAL_MEDIA_MAX_RATIO, CONTEXT_QUERY_VARIANTS_ENABLED, SMART_SEARCH_ENABLED, get_dynamic_config, MAX_RESULTS_PER_QUERY, MAX_SEARCH_QUERIES, SEARCHER_CONCURRENCY, PLAN_CACHE_ENABLED, EXTRACTOR_OVERLAP_EVALUATION, PLANNER_EXISTING_SOURCES_MAX_CHARS, PLANNER_BRIEF_MAX_CHARS, EVAL_TIERED_FACTOR
 from .logger import logger
 from .planner import generate_search_strategy
-from .searcher import execute_search_multi_layer
-from .extractor import extract_evidence_package
-from .evaluator import evaluate_source, get_evaluation_stats, print_evaluation_summary
+from .plan_cache import plan_cache_key, get_cached_plan, cache_plan
+from .searcher import execute_search_multi_layer, execute_search_smart
+from .extractor import extract_evidence_package, prefetch_evidence_package
+from .evaluator import evaluate_sources_batch, get_evaluation_stats, print_evaluation_summary, track_llm_usage
 from .reporter import generate_markdown_report
 from .verifier import verify_report
 from .validate_references import validate_references, format_references_summary
 from .utils import extract_urls_from_sources, extract_rejected_urls_from_sources, format_source_for_storage, save_debug_sources, canonicalize_url, truncate_text, build_hierarchical_context
-from .source_quality import check_quality_gate, calculate_confidence_score, format_confidence_badge
+from .source_quality import check_quality_gate, calculate_confidence_score, format_confidence_badge, get_domain_tier
 from .config import (
     FIRECRAWL_ENABLED, FIRECRAWL_API_KEY, FIRECRAWL_ONLY_FOR_VALIDATED_SOURCES,
     FIRECRAWL_MAX_CHARS_PER_SOURCE, FIRECRAWL_TIMEOUT_SECONDS, FIRECRAWL_MIN_EXISTING_CONTENT_CHARS,
-    FIRECRAWL_MAX_CALLS_PER_ITEM,
+    FIRECRAWL_MAX_CALLS_PER_ITEM, FIRECRAWL_CONCURRENCY,
     MAX_CHARS_PER_SOURCE
 )
 
@@ -30,6 +36,11 @@ from .config import (
 # NODOS DEL GRAFO
 # ==========================================
 
+def _preserve_context(state: ResearchState, delta: Optional[Dict] = None) -> Dict:
+    """Delta de estado del nodo con project_specific_context preservado (un único sitio)."""
+    return (delta or {}) | {"project_specific_context": state.get('project_specific_context')}
+
+
 async def planner_node(state: ResearchState) -> ResearchState:
     # Obtener configuraciones dinámicas según report_type
     report_type = state.get('report_type', state.get('prompt_type', None))
@@ -56,27 +67,31 @@ async def planner_node(state: ResearchState) -> ResearchState:
             
     # Generar estrategia
     try:
-        # Capturar tokens del planner llamando directamente al LLM
-        from .planner import generate_search_strategy
-        from .config import llm_planner
-        from .utils import count_tokens
-        
-        # Generar contexto jerárquico automático (padre, hermanos, hijos)
-        h_ctx = build_hierarchical_context(state['topic'], state.get('full_index', []))
+        # Generar contexto jerárquico automático (padre, hermanos, hijos).
+        # En un hilo: con índices grandes no bloquea a los items que corren en paralelo
+        h_ctx = await asyncio.to_thread(build_hierarchical_context, state['topic'], state.get('full_index', []))
         if h_ctx:
             print(f"      📐 [PLANNER] Contexto jerárquico inyectado ({len(h_ctx)} chars)")
         else:
             print(f"      📐 [PLANNER] Sin contexto jerárquico (item sin numeración o sin hermanos/hijos)")
 
         brief = state.get('brief', '')
+        if brief and PLANNER_BRIEF_MAX_CHARS and len(brief) > PLANNER_BRIEF_MAX_CHARS:
+            brief = truncate_text(brief, PLANNER_BRIEF_MAX_CHARS)
         if brief:
             print(f"      📋 [PLANNER] Brief inyectado ({len(brief)} chars)")
 
-        # Estimar tokens del planner (se capturarán en la función)
-        tasks = await generate_search_strategy(
+        # Las fuentes acumuladas crecen con el proyecto: al Planner solo llega la cola más
+        # reciente, cortada en un salto de línea para no empezar con una fuente a medias
+        existing_sources = state['existing_sources_text']
+        if isinstance(existing_sources, str) and PLANNER_EXISTING_SOURCES_MAX_CHARS and len(existing_sources) > PLANNER_EXISTING_SOURCES_MAX_CHARS:
+            existing_sources = existing_sources[-PLANNER_EXISTING_SOURCES_MAX_CHARS:].split('\n', 1)[-1]
+            print(f"      ✂️ [PLANNER] Fuentes existentes recortadas a las últimas {len(existing_sources)} chars (de {len(state['existing_sources_text'])})")
+
+        planner_inputs = dict(
             topic=state['topic'],
             custom_prompt=planner_prompt,
-            existing_sources=state['existing_sources_text'],
+            existing_sources=existing_sources,
             project_title=state.get('project_name'),
             related_topics=state.get('related_topics', []),
             full_index=state.get('full_index', []),
@@ -87,29 +102,62 @@ async def planner_node(state: ResearchState) -> ResearchState:
             hierarchical_context=h_ctx,
             brief=brief
         )
-        
-        if not tasks:
-            return {
-                "error": "No se pudo generar estrategia de búsqueda.",
-                "project_specific_context": state.get('project_specific_context')  # Preservar contexto incluso en error
-            }
-        
-        # Estimar tokens del planner (aproximación basada en queries generadas)
-        # Una estimación conservadora: ~500-1000 tokens por query generada
-        estimated_planner_tokens = len(tasks) * 800  # Estimación promedio
-        tokens_by_role["planner"] = tokens_by_role.get("planner", 0) + estimated_planner_tokens
+
+        # Mismas entradas del Planner (incluido prompt_type) => mismo plan, sin llamada LLM
+        plan_key = plan_cache_key(prompt_type=prompt_type, **planner_inputs) if PLAN_CACHE_ENABLED else None
+        tasks = get_cached_plan(plan_key) if plan_key else None
+        if tasks:
+            logger.log_info(f"   ♻️  [PLANNER] Estrategia reutilizada del cache ({len(tasks)} tarea(s))")
+        else:
+            tasks = await generate_search_strategy(**planner_inputs)
             
-        return {
+            if not tasks:
+                return _preserve_context(state, {
+                    "error": "No se pudo generar estrategia de búsqueda.",
+                })
+            if plan_key:
+                cache_plan(plan_key, tasks)
+            
+            # Estimar tokens del planner (aproximación basada en queries generadas)
+            # Una estimación conservadora: ~500-1000 tokens por query generada
+            estimated_planner_tokens = len(tasks) * 800  # Estimación promedio
+            tokens_by_role["planner"] = tokens_by_role.get("planner", 0) + estimated_planner_tokens
+            
+        return _preserve_context(state, {
             "search_strategy": tasks,
             "tokens_by_role": tokens_by_role,
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-        }
+        })
         
     except Exception as e:
-        return {
+        return _preserve_context(state, {
             "error": f"Error en Planner: {e}",
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto incluso en error
-        }
+        })
+
+
+# URLs canónicas (aceptadas + rechazadas) extraídas de existing_sources_text, por hash del
+# texto: searcher_node se repite en cada reintento del item con el mismo texto
+_KNOWN_URLS_CACHE_MAXSIZE = 64
+_known_urls_cache: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+
+
+def _known_source_urls(sources_text: str) -> FrozenSet[str]:
+    """URLs canónicas de las fuentes acumuladas/rechazadas del texto (cacheadas por BLAKE2b del texto)."""
+    if not sources_text:
+        return frozenset()
+    key = hashlib.blake2b(sources_text.encode('utf-8'), digest_size=16).hexdigest()
+    urls = _known_urls_cache.get(key)
+    if urls is not None:
+        _known_urls_cache.move_to_end(key)
+        return urls
+    urls = frozenset(
+        canonicalize_url(u)
+        for u in chain(extract_urls_from_sources(sources_text), extract_rejected_urls_from_sources(sources_text))
+        if u
+    )
+    _known_urls_cache[key] = urls
+    if len(_known_urls_cache) > _KNOWN_URLS_CACHE_MAXSIZE:
+        _known_urls_cache.popitem(last=False)
+    return urls
 
 
 async def searcher_node(state: ResearchState) -> ResearchState:
@@ -126,27 +174,23 @@ async def searcher_node(state: ResearchState) -> ResearchState:
     tasks = state.get('search_strategy', [])
     if not tasks:
         logger.log_warning("No hay tareas de búsqueda.")
-        return {
+        return _preserve_context(state, {
             "error": "No hay tareas de búsqueda.",
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto incluso en error
-        }
+        })
         
     logger.log_phase("SEARCHER", f"[{state['topic'][:30]}] Ejecutando {len(tasks)} tareas de búsqueda...")
     
     all_raw_results = []
     
-    # Preparar filtros de duplicados globales
-    existing_urls = extract_urls_from_sources(state.get('existing_sources_text', ''))
-    rejected_urls = extract_rejected_urls_from_sources(state.get('existing_sources_text', ''))
-    
-    # Capa D: También evitar URLs que ya están en el estado actual (validadas o rechazadas en rondas previas del mismo item)
-    from .utils import canonicalize_url
-    current_validated_urls = {canonicalize_url(s.get('url', '')) for s in state.get('validated_sources', []) if s.get('url')}
-    current_rejected_urls = {canonicalize_url(s.get('url', '')) for s in state.get('rejected_sources', []) if s.get('url')}
-    
-    # Combinar todos los filtros para máxima eficiencia
-    all_known_urls = existing_urls.union(rejected_urls).union(current_validated_urls).union(current_rejected_urls)
-    all_known_urls_norm = {canonicalize_url(u) for u in all_known_urls if u}
+    # Un único set de URLs canónicas conocidas (cada URL se canonicaliza una sola vez):
+    # fuentes acumuladas/rechazadas en Airtable (cacheadas entre reintentos) y, Capa D,
+    # validadas o rechazadas en rondas previas del mismo item. Cada resultado se comprueba en O(1)
+    all_known_urls_norm = set(_known_source_urls(state.get('existing_sources_text', '')))
+    all_known_urls_norm.update(
+        canonicalize_url(s['url'])
+        for s in chain(state.get('validated_sources', []), state.get('rejected_sources', []))
+        if s.get('url')
+    )
     
     # ==========================================
     # CONTEXT MANAGER INTEGRATION (Policy 2)
@@ -156,7 +200,9 @@ async def searcher_node(state: ResearchState) -> ResearchState:
     
     if CONTEXT_QUERY_VARIANTS_ENABLED:
         try:
-            from .context_manager import get_project_context
+            # Importadas una vez por nodo (no por query/tarea); si fallan, project_context
+            # queda en None y no se usan variantes ni filtrado
+            from .context_manager import get_project_context, build_query_variants, filter_results, rerank_results
             from .config import llm_planner  # Para extracción LLM opcional
             
             project_name = state.get('project_name', '')
@@ -192,12 +238,19 @@ async def searcher_node(state: ResearchState) -> ResearchState:
     # ==========================================
     # EJECUTAR BÚSQUEDAS CON/SIN VARIANTS
     # ==========================================
-    for task in tasks:
+    # Estado del item leído una vez para todas las tareas (Exa condicionado)
+    loop_count = state.get('loop_count', 0)
+    validated_sources_count = len(state.get('validated_sources', []))
+    verifier_high_issues_count = state.get('verification_high_severity_count', 0)
+    search_semaphore = asyncio.Semaphore(SEARCHER_CONCURRENCY)
+
+    async def _run_task(task: Dict) -> Optional[Tuple[str, List[Dict], int, int]]:
+        """Variantes, búsqueda y filtrado ContextManager de una tarea; None si no tiene queries."""
         task_topic = task.get('topic', state['topic'])
         base_queries = task.get('queries', [])
         
         if not base_queries:
-            continue
+            return None
             
         # Construir variantes de queries si ContextManager está activo
         all_queries_to_execute = []
@@ -208,7 +261,6 @@ async def searcher_node(state: ResearchState) -> ResearchState:
             for base_query in base_queries:
                 if not base_query:  # Skip None/empty queries
                     continue
-                from .context_manager import build_query_variants
                 try:
                     variants = build_query_variants(base_query, project_context)
                 except Exception as e:
@@ -246,34 +298,29 @@ async def searcher_node(state: ResearchState) -> ResearchState:
         # Ejecutar búsqueda multi-layer con todas las variantes
         # Capa D: Pasar información de estado para activación condicional de Exa
         try:
-            # Obtener información de estado para Exa condicionado
-            # report_type ya está obtenido arriba en searcher_node
-            loop_count = state.get('loop_count', 0)
-            validated_sources_count = len(state.get('validated_sources', []))
-            verifier_high_issues_count = state.get('verification_high_severity_count', 0)
-            
-            # Si smart_search está habilitado, usar execute_search_smart directamente con parámetros condicionales
-            if SMART_SEARCH_ENABLED:
-                from .searcher import execute_search_smart
-                raw_results = await execute_search_smart(
-                    all_queries_to_execute,
-                    max_results=max_results_per_query,  # Usar configuración dinámica
-                    topic=state['topic'],
-                    loop_count=loop_count,
-                    validated_sources_count=validated_sources_count,
-                    report_type=report_type,
-                    verifier_high_issues_count=verifier_high_issues_count,
-                )
-            else:
-                # Usar execute_search_multi_layer para modo no-smart
-                raw_results = await execute_search_multi_layer(
-                    all_queries_to_execute, 
-                    max_results=max_results_per_query,  # Usar configuración dinámica
-                    topic=state['topic'],
-                    expand_queries=False,  # Ya tenemos variantes, no expandir más
-                    validate_urls=URL_VALIDATION_ENABLED,
-                    smart_search=False
-                )
+            # Semáforo compartido: acota las búsquedas simultáneas entre tareas (rate limits de proveedores)
+            async with search_semaphore:
+                # Si smart_search está habilitado, usar execute_search_smart directamente con parámetros condicionales
+                if SMART_SEARCH_ENABLED:
+                    raw_results = await execute_search_smart(
+                        all_queries_to_execute,
+                        max_results=max_results_per_query,  # Usar configuración dinámica
+                        topic=state['topic'],
+                        loop_count=loop_count,
+                        validated_sources_count=validated_sources_count,
+                        report_type=report_type,
+                        verifier_high_issues_count=verifier_high_issues_count,
+                    )
+                else:
+                    # Usar execute_search_multi_layer para modo no-smart
+                    raw_results = await execute_search_multi_layer(
+                        all_queries_to_execute, 
+                        max_results=max_results_per_query,  # Usar configuración dinámica
+                        topic=state['topic'],
+                        expand_queries=False,  # Ya tenemos variantes, no expandir más
+                        validate_urls=URL_VALIDATION_ENABLED,
+                        smart_search=False
+                    )
         except Exception as e:
             logger.log_warning(f"   ⚠️ Error en búsqueda para tarea '{task_topic}': {e}. Continuando...")
             raw_results = []
@@ -283,8 +330,6 @@ async def searcher_node(state: ResearchState) -> ResearchState:
         # ==========================================
         if CONTEXT_QUERY_VARIANTS_ENABLED and project_context and not project_context.is_empty() and raw_results:
             try:
-                from .context_manager import filter_results, rerank_results
-                
                 # Filtrar resultados irrelevantes (ej: ACS -> excluir American Chemical Society)
                 valid_results, filtered_out = filter_results(raw_results, project_context)
                 
@@ -299,34 +344,40 @@ async def searcher_node(state: ResearchState) -> ResearchState:
                 logger.log_info(f"      📊 Reranking aplicado: top {min(10, len(ranked_results))} resultados priorizados")
             except Exception as e:
                 logger.log_warning(f"   ⚠️ Error en filtrado/reranking: {e}. Usando resultados sin filtrar.")
-        
-        # Filtrar duplicados y fuentes previas (lógica existente)
+
+        return task_topic, raw_results, len(base_queries), len(all_queries_to_execute)
+
+    # Las tareas son independientes: se lanzan a la vez en lugar de una tras otra
+    task_outputs = await asyncio.gather(*(_run_task(task) for task in tasks))
+
+    # Agregar en el orden de las tareas (mismo resultado que el bucle secuencial)
+    for output in task_outputs:
+        if output is None:
+            continue
+        task_topic, raw_results, base_queries_count, variants_count = output
+
+        # Filtrar duplicados y fuentes previas: cada URL se canonicaliza una vez y se comprueba
+        # contra fuentes acumuladas (Airtable) y fuentes de la sesión actual (LangGraph State).
+        # Cada URL aceptada se marca como vista, así que ahora también se descartan los
+        # duplicados entre tareas (antes solo se filtraban las fuentes previas).
+        # Se agrega task_topic para contexto del evaluador
         for res in raw_results:
-            source_url = res.get('url', '')
-            if not source_url:
+            if not res.get('url'):
                 continue
-                
-            normalized_url = canonicalize_url(source_url)
-            
-            # Check contra fuentes acumuladas (Airtable) y fuentes de la sesión actual (LangGraph State)
+            normalized_url = canonicalize_url(res['url'])
             if normalized_url in all_known_urls_norm:
                 continue
-                
-            # Agregar task_topic para contexto del evaluador
-            res['task_topic'] = task_topic
-            all_raw_results.append(res)
+            all_known_urls_norm.add(normalized_url)
+            all_raw_results.append(res | {'task_topic': task_topic})
             
         # Guardar info de variantes para tracing
         query_variants_trace.append({
             'task_topic': task_topic,
-            'base_queries_count': len(base_queries),
-            'variants_count': len(all_queries_to_execute),
+            'base_queries_count': base_queries_count,
+            'variants_count': variants_count,
             'results_before_dedupe': len(raw_results),
             'results_after_dedupe': len([r for r in raw_results if r.get('url')])
         })
-        
-        # Pausa mínima entre tareas
-        await asyncio.sleep(0.1)
     
     # Logging final de variantes
     if query_variants_trace and CONTEXT_QUERY_VARIANTS_ENABLED:
@@ -335,17 +386,15 @@ async def searcher_node(state: ResearchState) -> ResearchState:
         logger.log_info(f"   📊 Resumen variantes: {total_base} queries base → {total_variants} variantes ejecutadas")
             
     if not all_raw_results:
-        return {
+        return _preserve_context(state, {
             "found_sources": [], 
             "query_variants_trace": query_variants_trace,
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-        }
+        })
         
-    return {
+    return _preserve_context(state, {
         "found_sources": all_raw_results, 
         "query_variants_trace": query_variants_trace,
-        "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-    }
+    })
 
 
 async def extractor_node(state: ResearchState) -> ResearchState:
@@ -368,22 +417,24 @@ async def extractor_node(state: ResearchState) -> ResearchState:
         # Si falla o no devuelve nada, continuar con las fuentes originales
         if not enriched_sources:
             logger.log_warning("      ⚠️  No se pudieron extraer evidencias; continuando sin enriquecer")
-            return {
+            return _preserve_context(state, {
                 "validated_sources": validated_sources,
-                "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-            }
+            })
 
-        return {
+        return _preserve_context(state, {
             "validated_sources": enriched_sources,
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-        }
+        })
 
     except Exception as e:
         logger.log_error(f"Error durante extracción de evidencias: {e}")
-        return {
+        return _preserve_context(state, {
             "validated_sources": validated_sources,
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-        }
+        })
+
+
+def _evaluation_prescore(source: Dict) -> Tuple[int, int]:
+    """Clave de pre-ranking sin LLM: tier del dominio (1 = élite) y snippet más largo primero."""
+    return get_domain_tier(source.get('url', '')), -len(source.get('snippet', '') or '')
 
 
 async def evaluator_node(state: ResearchState) -> ResearchState:
@@ -411,66 +462,100 @@ async def evaluator_node(state: ResearchState) -> ResearchState:
     total_to_evaluate = len(unique_sources_to_evaluate)
     print(f"   📊 {total_to_evaluate} fuentes únicas a evaluar")
 
+    # Evaluación por niveles: el Quality Gate se queda con las max_accepted_sources de mayor
+    # score, así que se evalúan primero las mejor pre-rankeadas y el resto solo si no llegan
+    # a min_accepted_sources validadas
+    source_tiers = [unique_sources_to_evaluate]
+    if EVAL_TIERED_FACTOR > 0:
+        report_type = state.get('report_type', state.get('prompt_type', None))
+        dynamic_config = get_dynamic_config(report_type)
+        max_accepted_sources = dynamic_config.get('max_accepted_sources', MAX_ACCEPTED_SOURCES)
+        min_accepted_sources = dynamic_config.get('min_accepted_sources', MIN_ACCEPTED_SOURCES)
+        first_tier_size = max_accepted_sources * EVAL_TIERED_FACTOR
+        if total_to_evaluate > first_tier_size:
+            ranked_sources = sorted(unique_sources_to_evaluate, key=_evaluation_prescore)
+            source_tiers = [ranked_sources[:first_tier_size], ranked_sources[first_tier_size:]]
+            print(f"   🎯 Evaluación por niveles: {first_tier_size} mejor pre-rankeadas primero ({total_to_evaluate - first_tier_size} en reserva)")
+
     # Inicializar tokens_by_role si no existe
     tokens_by_role = state.get('tokens_by_role', {})
 
-    # Contador de progreso thread-safe
-    import threading
-    eval_progress_lock = threading.Lock()
-    eval_progress = {"completed": 0, "validated": 0, "rejected": 0, "cache_hits": 0, "fast_track": 0}
-
-    async def evaluate_with_progress(source, index: int, total: int, context: str):
-        """Wrapper para evaluar con logging de progreso."""
-        result = await evaluate_source(source, context)
-
-        with eval_progress_lock:
-            eval_progress["completed"] += 1
-
-            if result:
-                if result.get("keep") is True:
-                    eval_progress["validated"] += 1
+    # Contador de progreso: todas las corrutinas corren en el mismo hilo del event loop,
+    # así que las actualizaciones entre awaits no necesitan lock
+    eval_progress = {"total": 0, "completed": 0, "validated": 0, "rejected": 0, "cache_hits": 0, "fast_track": 0}
+
+    # Extracción de evidencias solapada con la evaluación: las validadas de cada grupo se
+    # extraen mientras se evalúan los demás y extractor_node las sirve desde el cache
+    prefetch_tasks: List[asyncio.Task] = []
+
+    async def evaluate_group_with_progress(context: str, sources: List[Dict]) -> List[Dict]:
+        """Evalúa en batch las fuentes de un mismo contexto con logging de progreso."""
+        group_validated, group_rejected = await evaluate_sources_batch(sources, context)
+        if EXTRACTOR_OVERLAP_EVALUATION and group_validated:
+            prefetch_tasks.append(asyncio.create_task(prefetch_evidence_package(state['topic'], group_validated)))
+
+        eval_progress["completed"] += len(sources)
+        eval_progress["validated"] += len(group_validated)
+        eval_progress["rejected"] += len(group_rejected)
+        for result in chain(group_validated, group_rejected):
+            if result.get("from_cache"):
+                eval_progress["cache_hits"] += 1
+            elif result.get("fast_track"):
+                eval_progress["fast_track"] += 1
+
+        completed = eval_progress["completed"]
+        print(f"      📈 Progreso: {completed}/{eval_progress['total']} ({eval_progress['validated']}✅ {eval_progress['rejected']}❌ | cache:{eval_progress['cache_hits']} fast:{eval_progress['fast_track']})", flush=True)
+
+        return group_validated + group_rejected
+
+    with track_llm_usage() as judge_usage:
+        for tier_index, tier_sources in enumerate(source_tiers):
+            if tier_index > 0:
+                if len(validated) >= min_accepted_sources:
+                    print(f"      ⏭️ {len(validated)} validadas (mínimo {min_accepted_sources}): se omiten {len(tier_sources)} fuentes en reserva", flush=True)
+                    break
+                print(f"      🔁 Solo {len(validated)} validadas (mínimo {min_accepted_sources}): evaluando {len(tier_sources)} fuentes en reserva", flush=True)
+            eval_progress["total"] += len(tier_sources)
+
+            # evaluate_sources_batch evalúa con un único contexto: agrupar por task_topic.
+            # Dentro de cada grupo, MiMo evalúa varias fuentes por llamada (mimo_batch_size)
+            sources_by_context: Dict[str, List[Dict]] = {}
+            for source in tier_sources:
+                sources_by_context.setdefault(source.get('task_topic', state['topic']), []).append(source)
+
+            # Ejecutar los grupos en paralelo
+            print(f"      🚀 Iniciando evaluación en batch de {len(tier_sources)} fuentes ({len(sources_by_context)} contexto(s))...", flush=True)
+            group_results = await asyncio.gather(
+                *(evaluate_group_with_progress(context, sources) for context, sources in sources_by_context.items()),
+                return_exceptions=True
+            )
+            results = []
+            for group_result in group_results:
+                if isinstance(group_result, Exception):
+                    results.append(group_result)
                 else:
-                    eval_progress["rejected"] += 1
-
-                if result.get("from_cache"):
-                    eval_progress["cache_hits"] += 1
-                elif result.get("fast_track"):
-                    eval_progress["fast_track"] += 1
-
-            # Log de progreso cada 5 evaluaciones o al final
-            completed = eval_progress["completed"]
-            if completed % 5 == 0 or completed == total:
-                print(f"      📈 Progreso: {completed}/{total} ({eval_progress['validated']}✅ {eval_progress['rejected']}❌ | cache:{eval_progress['cache_hits']} fast:{eval_progress['fast_track']})", flush=True)
-
-        return result
-
-    # Preparar tareas asíncronas con tracking
-    tasks = []
-    for i, source in enumerate(unique_sources_to_evaluate):
-        task_topic = source.get('task_topic', state['topic'])
-        tasks.append(evaluate_with_progress(source, i+1, total_to_evaluate, task_topic))
-
-    # Ejecutar en paralelo
-    print(f"      🚀 Iniciando evaluación paralela de {total_to_evaluate} fuentes...", flush=True)
-    results = await asyncio.gather(*tasks)
-
-    # Procesar resultados y estimar tokens del judge
-    judge_tokens_used = 0
-    for evaluation in results:
-        if evaluation and evaluation.get("keep") is True:
-            validated.append(evaluation)
-        elif evaluation:
-            if evaluation.get("keep") is None:
-                evaluation["keep"] = False
-            rejected.append(evaluation)
-
-        # Estimar tokens por evaluación (cada evaluación usa ~300-500 tokens)
-        if evaluation and not evaluation.get("from_cache") and not evaluation.get("fast_track"):
-            judge_tokens_used += 400  # Estimación promedio por evaluación con LLM
+                    results.extend(group_result)
+
+            # Procesar resultados
+            for evaluation in results:
+                if isinstance(evaluation, Exception):
+                    # Un fallo aislado no debe tirar el resto de evaluaciones
+                    print(f"      ⚠️ Error evaluando fuente: {evaluation}")
+                    continue
+                if evaluation and evaluation.get("keep") is True:
+                    validated.append(evaluation)
+                elif evaluation:
+                    if evaluation.get("keep") is None:
+                        evaluation["keep"] = False
+                    rejected.append(evaluation)
+    if prefetch_tasks:
+        # Terminar aquí las extracciones en curso: extractor_node no debe repetirlas
+        await asyncio.gather(*prefetch_tasks, return_exceptions=True)
 
     print(f"      ✅ Evaluación completada: {len(validated)} validadas, {len(rejected)} rechazadas", flush=True)
     
-    tokens_by_role["judge"] = tokens_by_role.get("judge", 0) + judge_tokens_used
+    # Tokens reales (usage del proveedor) de las llamadas MiMo/Judge; estimados solo en streaming
+    tokens_by_role["judge"] = tokens_by_role.get("judge", 0) + judge_usage.total_tokens
     
     # Estadísticas de evaluación
     stats = get_evaluation_stats(validated, rejected)
@@ -479,12 +564,19 @@ async def evaluator_node(state: ResearchState) -> ResearchState:
     # Mostrar resumen visual
     logger.display_evaluation_results(validated, rejected)
             
-    return {
+    return _preserve_context(state, {
         "validated_sources": validated,
         "rejected_sources": rejected,
         "tokens_by_role": tokens_by_role,
-        "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-    }
+    })
+
+
+def _total_score(source: Dict) -> float:
+    """total_score numérico de una fuente (0.0 si falta o no es convertible)."""
+    try:
+        return float(source.get('total_score', 0) or 0)
+    except Exception:
+        return 0.0
 
 
 async def quality_gate_node(state: ResearchState) -> ResearchState:
@@ -502,14 +594,11 @@ async def quality_gate_node(state: ResearchState) -> ResearchState:
 
     # Cap de fuentes aceptadas para controlar coste/ruido downstream
     if max_accepted_sources and len(validated) > max_accepted_sources:
-        def _score(s: Dict) -> float:
-            try:
-                return float(s.get('total_score', 0) or 0)
-            except Exception:
-                return 0.0
-        validated_sorted = sorted(validated, key=_score, reverse=True)
-        validated = validated_sorted[:max_accepted_sources]
-        logger.log_info(f"   ℹ️  Recortando fuentes aceptadas a top {max_accepted_sources} por score (de {len(validated_sorted)})")
+        # Score calculado una sola vez por fuente; el sort (estable) compara solo floats
+        scored = [(_total_score(s), s) for s in validated]
+        scored.sort(key=itemgetter(0), reverse=True)
+        validated = [s for _, s in scored[:max_accepted_sources]]
+        logger.log_info(f"   ℹ️  Recortando fuentes aceptadas a top {max_accepted_sources} por score (de {len(scored)})")
     loop_count = state.get('loop_count', 0)
     
     logger.log_phase("QUALITY GATE", f"Evaluando calidad de {len(validated)} fuentes...")
@@ -534,14 +623,13 @@ async def quality_gate_node(state: ResearchState) -> ResearchState:
             print(f"      - {issue}")
     
     # Guardar resultado en estado
-    return {
+    return _preserve_context(state, {
         "validated_sources": validated,
         "quality_gate_passed": gate_result['passed'],
         "quality_gate_issues": gate_result['issues'],
         "quality_gate_recommendation": gate_result['recommendation'],
         "confidence_score": gate_result['confidence'],
-        "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-    }
+    })
 
 
 def loop_manager_node(state: ResearchState) -> ResearchState:
@@ -566,6 +654,11 @@ def loop_manager_node(state: ResearchState) -> ResearchState:
     }
 
 
+# Intervalo (s) del reporter de progreso de firecrawl_node: una línea periódica en lugar
+# de varios print(flush=True) por URL desde las tareas concurrentes
+_FIRECRAWL_PROGRESS_INTERVAL = 2.0
+
+
 async def firecrawl_node(state: ResearchState) -> ResearchState:
     """
     Enriquece fuentes validadas con contenido extraído por Firecrawl cuando es necesario.
@@ -574,9 +667,7 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
     """
     # Verificar si Firecrawl está habilitado
     if not FIRECRAWL_ENABLED or not FIRECRAWL_API_KEY:
-        return {
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto aunque Firecrawl esté deshabilitado
-        }  # No hacer nada si está deshabilitado
+        return _preserve_context(state)  # No hacer nada si está deshabilitado (preservando contexto)
     
     validated_sources = state.get('validated_sources', [])
     if not validated_sources:
@@ -584,28 +675,24 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
     
     logger.log_phase("FIRECRAWL", f"[{state['topic'][:30]}] Enriqueciendo {len(validated_sources)} fuente(s) con Firecrawl...")
     
-    from .firecrawl_client import fetch_firecrawl_markdown
-    from .utils import canonicalize_url
+    from .firecrawl_client import AdmissionController
     
     # DEDUPLICACIÓN: Agrupar fuentes por URL canónica para evitar procesar la misma URL múltiples veces
-    url_to_sources = {}
+    # (una canonicalización por fuente; las fuentes sin URL van a "suficiente contenido")
+    url_to_sources: Dict[str, List[Dict]] = defaultdict(list)
     for source in validated_sources:
         url = source.get('url', '')
-        if url:
-            canonical_url = canonicalize_url(url)
-            if canonical_url not in url_to_sources:
-                url_to_sources[canonical_url] = []
-            url_to_sources[canonical_url].append(source)
-        else:
-            # Fuentes sin URL van directamente a "suficiente contenido"
-            if 'sources_without_url' not in url_to_sources:
-                url_to_sources['sources_without_url'] = []
-            url_to_sources['sources_without_url'].append(source)
+        url_to_sources[canonicalize_url(url) if url else 'sources_without_url'].append(source)
     
-    # Separar fuentes que necesitan Firecrawl de las que no (una por URL única)
-    sources_needing_firecrawl = []
+    # Separar fuentes que necesitan Firecrawl de las que no: (URL canónica, fuente representante)
+    sources_needing_firecrawl: List[Tuple[str, Dict]] = []
     sources_with_sufficient_content = []
     
+    # Obtener report_type del estado para lógica condicional (Capa C), una vez para todas las URLs
+    report_type = state.get('report_type', None)
+    report_types_critical = ["Strategic", "Financial", "Due_Diligence"]
+    is_critical_report = report_type in report_types_critical if report_type else False
+    
     for canonical_url, source_list in url_to_sources.items():
         if canonical_url == 'sources_without_url':
             # Fuentes sin URL van directamente a suficiente contenido
@@ -614,20 +701,11 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
         
         # Tomar solo el primer source de cada URL canónica (evitar duplicados)
         source = source_list[0]
-        url = source.get('url', '')
-        if not url:
-            sources_with_sufficient_content.extend(source_list)
-            continue
         
         # Determinar si necesitamos Firecrawl
         existing_raw_content = source.get('raw_content', '')
         existing_content_length = len(existing_raw_content) if existing_raw_content else 0
         
-        # Obtener report_type del estado para lógica condicional (Capa C)
-        report_type = state.get('report_type', None)
-        report_types_critical = ["Strategic", "Financial", "Due_Diligence"]
-        is_critical_report = report_type in report_types_critical if report_type else False
-        
         # Lógica condicional para Firecrawl (Capa C):
         # - Si raw_content < 4000 chars → Firecrawl scrape
         # - Si raw_content >= 4000 chars → Skip Firecrawl (salvo report crítico)
@@ -649,10 +727,9 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
             sources_with_sufficient_content.extend(source_list)
             continue
         
-        # Necesita Firecrawl - procesar solo una instancia por URL única, luego replicar resultado a las demás
-        # Guardar lista de instancias para replicar resultado después
-        source["_source_list"] = source_list
-        sources_needing_firecrawl.append(source)
+        # Necesita Firecrawl - procesar solo una instancia por URL única; el resultado se replica
+        # después a todas las instancias de url_to_sources[canonical_url]
+        sources_needing_firecrawl.append((canonical_url, source))
     
     firecrawl_skipped_count = len(sources_with_sufficient_content)
     
@@ -666,7 +743,8 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
     
     # Cap how many Firecrawl calls we do per item to control cost/latency
     if max_firecrawl_calls and len(sources_needing_firecrawl) > max_firecrawl_calls:
-        def _score(src):
+        def _score(item):
+            src = item[1]
             return (
                 src.get("total_score", src.get("score", 0)) or 0,
                 src.get("relevance_score", 0) or 0,
@@ -679,104 +757,115 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
     if sources_needing_firecrawl:
         unique_urls_count = len(sources_needing_firecrawl)
         logger.log_info(f"   🔍 URLs únicas a procesar con Firecrawl: {unique_urls_count} (de {len(validated_sources)} fuentes totales)")
-        semaphore = asyncio.Semaphore(3)  # Concurrencia: 3 paralelas
+        # Todas las URLs se lanzan a la vez; el controlador limita las activas y reduce el
+        # límite ante 429/5xx (recuperándolo con éxitos seguidos)
+        controller = AdmissionController(FIRECRAWL_CONCURRENCY)
 
-        # Contador de progreso thread-safe
-        import threading
-        progress_lock = threading.Lock()
-        progress_counter = {"completed": 0, "success": 0, "failed": 0}
+        async def process_source_with_firecrawl(source, index: int, total: int, domain: str):
+            """(fuente, estado, línea de log); la línea se imprime fuera de la tarea."""
+            url = source.get('url', '')
 
-        async def process_source_with_firecrawl(source, index: int, total: int):
-            async with semaphore:
-                url = source.get('url', '')
-                domain = source.get('source_domain', url.split('/')[2] if '/' in url else url[:30])
-
-                # Log de inicio
-                print(f"      🔗 [{index}/{total}] Firecrawl: {domain[:40]}...", flush=True)
-
-                try:
-                    markdown_content, firecrawl_meta = await fetch_firecrawl_markdown(
-                        url=url,
-                        api_key=FIRECRAWL_API_KEY,
-                        timeout_seconds=FIRECRAWL_TIMEOUT_SECONDS
-                    )
-
-                    # Actualizar progreso
-                    with progress_lock:
-                        progress_counter["completed"] += 1
-
-                    if markdown_content and markdown_content.strip():
-                        # Usar el mínimo entre FIRECRAWL_MAX_CHARS_PER_SOURCE y MAX_CHARS_PER_SOURCE configurado
-                        max_chars = min(FIRECRAWL_MAX_CHARS_PER_SOURCE, MAX_CHARS_PER_SOURCE or FIRECRAWL_MAX_CHARS_PER_SOURCE)
-
-                        # Truncar el contenido si es necesario
-                        source["raw_content"] = truncate_text(markdown_content, max_chars)
-                        source["extraction_method"] = "firecrawl"
-                        source["firecrawl_meta"] = firecrawl_meta
+            try:
+                markdown_content, firecrawl_meta = await controller.fetch(
+                    url=url,
+                    api_key=FIRECRAWL_API_KEY,
+                    timeout_seconds=FIRECRAWL_TIMEOUT_SECONDS
+                )
 
-                        with progress_lock:
-                            progress_counter["success"] += 1
-                            print(f"      ✅ [{progress_counter['completed']}/{total}] OK: {domain[:40]} ({len(markdown_content):,} chars)", flush=True)
+                if markdown_content and markdown_content.strip():
+                    # Usar el mínimo entre FIRECRAWL_MAX_CHARS_PER_SOURCE y MAX_CHARS_PER_SOURCE configurado
+                    max_chars = min(FIRECRAWL_MAX_CHARS_PER_SOURCE, MAX_CHARS_PER_SOURCE or FIRECRAWL_MAX_CHARS_PER_SOURCE)
 
-                        return source, "success"
-                    else:
-                        # Firecrawl falló pero mantener fuente con método original
-                        source["extraction_method"] = source.get("extraction_method", "tavily/exa")
-                        source["firecrawl_meta"] = firecrawl_meta
+                    # Truncar el contenido si es necesario
+                    source["raw_content"] = truncate_text(markdown_content, max_chars)
+                    source["extraction_method"] = "firecrawl"
+                    source["firecrawl_meta"] = firecrawl_meta
 
-                        with progress_lock:
-                            progress_counter["failed"] += 1
-                            print(f"      ⚠️ [{progress_counter['completed']}/{total}] Vacío: {domain[:40]}", flush=True)
+                    return source, "success", f"      ✅ [{index}/{total}] OK: {domain} ({len(markdown_content):,} chars)"
+                else:
+                    # Firecrawl falló pero mantener fuente con método original
+                    source["extraction_method"] = source.get("extraction_method", "tavily/exa")
+                    source["firecrawl_meta"] = firecrawl_meta
 
-                        return source, "failed"
+                    return source, "failed", f"      ⚠️ [{index}/{total}] Vacío: {domain}"
 
-                except Exception as e:
-                    # Error inesperado, mantener fuente original
-                    with progress_lock:
-                        progress_counter["completed"] += 1
-                        progress_counter["failed"] += 1
-                    print(f"      ❌ [{progress_counter['completed']}/{total}] Error: {domain[:40]} - {str(e)[:50]}", flush=True)
-                    source["extraction_method"] = source.get("extraction_method", "tavily/exa")
-                    source["firecrawl_meta"] = {"status": "error", "error": str(e)}
-                    return source, "failed"
+            except Exception as e:
+                # Error inesperado, mantener fuente original
+                source["extraction_method"] = source.get("extraction_method", "tavily/exa")
+                source["firecrawl_meta"] = {"status": "error", "error": str(e)}
+                return source, "failed", f"      ❌ [{index}/{total}] Error: {domain} - {str(e)[:50]}"
 
-        # Ejecutar en paralelo con índices para tracking
-        tasks = [process_source_with_firecrawl(source, i+1, unique_urls_count) for i, source in enumerate(sources_needing_firecrawl)]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def process_indexed(i: int, source, domain: str):
+            """(índice, resultado) de la tarea; un error inesperado cuenta como fallo de esa URL."""
+            try:
+                return i, await process_source_with_firecrawl(source, i + 1, unique_urls_count, domain)
+            except Exception as e:
+                # Error en la tarea: mantener las instancias con su contenido original
+                source["firecrawl_meta"] = {"status": "error", "error": str(e)}
+                return i, (source, "failed", f"      ❌ [{i + 1}/{unique_urls_count}] Error: {domain} - {str(e)[:50]}")
+
+        # Ejecutar en paralelo y procesar cada resultado en cuanto llega (la cola lenta no
+        # retrasa el resto). Cada URL se replica en su posición: el orden final es el de entrada
+        # (tareas creadas en orden: as_completed recibiría un set y las arrancaría en orden arbitrario).
+        # El dominio para los logs se calcula una vez por URL, fuera de las tareas
+        tasks = []
+        for i, (_, source) in enumerate(sources_needing_firecrawl):
+            url = source.get('url', '')
+            domain = (source.get('source_domain') or urlparse(url).netloc or url[:30])[:40]
+            tasks.append(asyncio.create_task(process_indexed(i, source, domain)))
+        replicated_by_index: List[List[Dict]] = [[] for _ in sources_needing_firecrawl]
         
-        # Procesar resultados
-        enriched_sources = list(sources_with_sufficient_content)
+        # Procesar resultados: cada tarea devuelve su resultado y los contadores de
+        # éxito/fallo se calculan aquí, en una sola pasada (sin estado compartido entre tareas)
         firecrawl_success_count = 0
         firecrawl_failed_count = 0
-        
-        for result in results:
-            if isinstance(result, Exception):
-                # Error en la tarea, mantener fuente original
-                firecrawl_failed_count += 1
-                continue
+        progress_lines: List[str] = []
+
+        async def report_progress():
+            """Imprime el avance cada _FIRECRAWL_PROGRESS_INTERVAL s mientras hay scrapes en curso."""
+            while True:
+                await asyncio.sleep(_FIRECRAWL_PROGRESS_INTERVAL)
+                print(f"      📈 Firecrawl: {len(progress_lines)}/{unique_urls_count} ({firecrawl_success_count}✅ {firecrawl_failed_count}❌)")
+
+        reporter = asyncio.create_task(report_progress())
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, (source, status, progress_line) = await next_done
+                progress_lines.append(progress_line)
             
-            source, status = result
+                # Si hay múltiples instancias de la misma URL, replicar el resultado
+                source_list = url_to_sources[sources_needing_firecrawl[i][0]]
             
-            # Si hay múltiples instancias de la misma URL, replicar el resultado
-            source_list = source.pop("_source_list", [source])
+                # Aplicar el resultado de Firecrawl a todas las instancias
+                for s in source_list:
+                    if status == "success":
+                        # Replicar contenido enriquecido a todas las instancias
+                        s["raw_content"] = source.get("raw_content", s.get("raw_content", ""))
+                        s["extraction_method"] = source.get("extraction_method", "firecrawl")
+                        s["firecrawl_meta"] = source.get("firecrawl_meta", {})
+                    else:
+                        # Mantener método original para todas
+                        s["extraction_method"] = s.get("extraction_method", "tavily/exa")
+                        s["firecrawl_meta"] = source.get("firecrawl_meta", {})
+                replicated_by_index[i] = source_list
             
-            # Aplicar el resultado de Firecrawl a todas las instancias
-            for s in source_list:
                 if status == "success":
-                    # Replicar contenido enriquecido a todas las instancias
-                    s["raw_content"] = source.get("raw_content", s.get("raw_content", ""))
-                    s["extraction_method"] = source.get("extraction_method", "firecrawl")
-                    s["firecrawl_meta"] = source.get("firecrawl_meta", {})
+                    firecrawl_success_count += 1
                 else:
-                    # Mantener método original para todas
-                    s["extraction_method"] = s.get("extraction_method", "tavily/exa")
-                    s["firecrawl_meta"] = source.get("firecrawl_meta", {})
-                enriched_sources.append(s)
-            
-            if status == "success":
-                firecrawl_success_count += 1
-            else:
-                firecrawl_failed_count += 1
+                    firecrawl_failed_count += 1
+        finally:
+            # Cancelación estructurada (como asyncio.TaskGroup, que requiere Python 3.11): si el
+            # nodo se cancela o falla a mitad, se cancelan y esperan los scrapes pendientes
+            pending = [task for task in tasks if not task.done()]
+            for task in (reporter, *pending):
+                task.cancel()
+            await asyncio.gather(reporter, *pending, return_exceptions=True)
+
+        # Detalle por URL en una sola escritura (orden de finalización)
+        print("\n".join(progress_lines))
+        
+        enriched_sources = list(sources_with_sufficient_content)
+        enriched_sources.extend(chain.from_iterable(replicated_by_index))
     else:
         # No hay fuentes que necesiten Firecrawl
         enriched_sources = sources_with_sufficient_content
@@ -791,10 +880,9 @@ async def firecrawl_node(state: ResearchState) -> ResearchState:
     if firecrawl_failed_count > 0:
         logger.log_warning(f"   ⚠️  {firecrawl_failed_count} extracción(es) fallida(s) (manteniendo contenido original)")
     
-    return {
+    return _preserve_context(state, {
         "validated_sources": enriched_sources,
-        "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-    }
+    })
 
 
 async def reporter_node(state: ResearchState) -> ResearchState:
@@ -923,15 +1011,14 @@ async def reporter_node(state: ResearchState) -> ResearchState:
     
     # Preservar project_specific_context en el return
     # Capa C y D: Guardar report_type en estado para Firecrawl y Exa condicionado
-    return {
+    return _preserve_context(state, {
         "final_report": report,
         "updated_sources_text": updated_sources,
         "tokens_used": tokens,
         "tokens_by_role": tokens_by_role,
         "status": "Done",
         "report_type": report_type,  # Capa C y D: Para lógica condicional de Firecrawl y Exa
-        "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-    }
+    })
 
 
 async def verifier_node(state: ResearchState) -> ResearchState:
@@ -1052,7 +1139,7 @@ async def verifier_node(state: ResearchState) -> ResearchState:
             traceback.print_exc()
         
         # Retornar resultados de verificación (preservar updated_sources_text)
-        return {
+        return _preserve_context(state, {
             "final_report": verified_report,  # Reporte original sin anotaciones (la verificación no modifica el informe final)
             "updated_sources_text": updated_sources_text,  # Preservar fuentes acumuladas
             "verification_issues": issues,
@@ -1063,12 +1150,11 @@ async def verifier_node(state: ResearchState) -> ResearchState:
             "references_validation": ref_validation,  # Resultados de validación de referencias
             "references_validation_passed": ref_validation["passed"],
             "all_verification_passed": all_verification_passed,  # Verificación completa pasó
-            "project_specific_context": state.get('project_specific_context'),  # Preservar contexto
             "verification_result": {  # Guardar resultado para el informe
                 "confidence": verification_confidence,
                 "summary": verification_summary
             }
-        }
+        })
         
     except Exception as e:
         logger.log_error(f"Error durante verificación: {e}")
@@ -1092,11 +1178,10 @@ async def ploter_node(state: ResearchState) -> ResearchState:
     
     from .config import ENABLE_PLOTS
     if not ENABLE_PLOTS:
-        return {
+        return _preserve_context(state, {
             "final_report": final_report,
             "updated_sources_text": updated_sources_text,
-            "project_specific_context": state.get('project_specific_context')  # Preservar contexto
-        }
+        })
 
     from .ploter import evaluate_and_generate_plot, insert_plots_in_markdown
     
@@ -0,0 +1,68 @@
+"""
+Módulo Plan Cache: reutiliza estrategias de búsqueda del Planner entre ejecuciones.
+
+La clave es un hash de todas las entradas que recibe el Planner (tema, tipo de prompt,
+proyecto, fuentes existentes, contexto jerárquico, brief, queries fallidas...): con las
+mismas entradas se reutilizan las mismas tareas sin llamada LLM.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .logger import logger
+from .source_quality import CACHE_MODE, CACHE_TTL_DAYS, CacheMode
+
+PLAN_CACHE_FILE = Path(__file__).parent.parent / ".plan_cache.json"
+
+_plan_cache: Optional[Dict[str, Dict]] = None
+
+
+def plan_cache_key(**planner_inputs: Any) -> str:
+    """BLAKE2b (16 bytes) de las entradas del Planner serializadas de forma estable."""
+    raw = json.dumps(planner_inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load_plan_cache() -> Dict[str, Dict]:
+    """Carga el cache de planes una vez por proceso ({} si no existe o está corrupto)."""
+    global _plan_cache
+    if _plan_cache is None:
+        _plan_cache = {}
+        if PLAN_CACHE_FILE.exists():
+            try:
+                with open(PLAN_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    _plan_cache = json.load(f)
+            except Exception as e:
+                logger.log_warning(f"⚠️  Error cargando cache de planes: {e}")
+    return _plan_cache
+
+
+def get_cached_plan(key: str) -> Optional[List[Dict]]:
+    """Tareas cacheadas para la clave si no han expirado."""
+    if CACHE_MODE is CacheMode.DISABLED:
+        return None
+    entry = _load_plan_cache().get(key)
+    if not entry:
+        return None
+    try:
+        cached_at = datetime.fromisoformat(entry["cached_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if datetime.now() - cached_at >= timedelta(days=CACHE_TTL_DAYS):
+        return None
+    return entry.get("tasks") or None
+
+
+def cache_plan(key: str, tasks: List[Dict]):
+    """Guarda las tareas del Planner (un plan por item: se persiste en el momento)."""
+    if CACHE_MODE is not CacheMode.ENABLED or not tasks:
+        return
+    cache = _load_plan_cache()
+    cache[key] = {"tasks": tasks, "cached_at": datetime.now().isoformat()}
+    try:
+        with open(PLAN_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except Exception as e:
+        logger.log_warning(f"⚠️  Error guardando cache de planes: {e}")
@@ -2,11 +2,15 @@
 Módulo Planner: Genera estrategias de búsqueda usando GPT-4.
 """
 import json
+import re
 import time
 import asyncio
 from typing import List, Dict, Optional, Any
 from .config import llm_planner, MAX_SEARCH_QUERIES
 
+# Strings entre comillas dobles (para quitar saltos de línea literales antes de json.loads)
+_QUOTED_STRING_RE = re.compile(r'(?<=[^"\\])"(.*?)(?<!\\)"', re.DOTALL)
+
 async def generate_search_strategy(topic: str, custom_prompt: Optional[str] = None, existing_sources: Optional[str] = None, project_title: Optional[str] = None, related_topics: List[str] = [], full_index: List[str] = [], agent_description: Optional[str] = None, company_context: Dict[str, Any] = {}, failed_queries: List[str] = [], max_search_queries: Optional[int] = None, hierarchical_context: str = "", brief: str = "") -> List[Dict]:
     """
     Genera una estrategia de búsqueda basada en un tema.
@@ -38,6 +42,12 @@ async def generate_search_strategy(topic: str, custom_prompt: Optional[str] = No
     current_year = time.strftime('%Y')
     previous_year = str(int(current_year) - 1)
     
+    # Prompt caching: el mensaje de sistema solo lleva contenido estable dentro de un proyecto
+    # (instrucciones, año, proyecto e índice, prompt personalizado) para que sea un prefijo
+    # byte-idéntico entre items y el proveedor reutilice su prefix cache. Todo lo que cambia
+    # por item (tema, contexto jerárquico, brief, rol del agente, queries fallidas, fuentes)
+    # va en el mensaje de usuario.
+
     # Prompt por defecto
     default_system_msg = f"""Eres un experto OSINT (Open Source Intelligence). 
     Tu misión es generar queries de búsqueda efectivas para Tavily (API de búsqueda especializada en investigación).
@@ -51,7 +61,7 @@ async def generate_search_strategy(topic: str, custom_prompt: Optional[str] = No
     8. RESTRICCIÓN EMPRESARIAL: NO incluyas el nombre de la empresa cliente en tus queries. Queremos una visión "outside-in" del mercado, no noticias corporativas internas. Si el tema es sobre infraestructuras, busca "infrastructure trends", "toll roads market", etc., sin mencionar a la empresa específica.
     9. ALINEACIÓN TOTAL CON EL PROYECTO:
        - TU FOCO ES EXTRACTIVO Y DIFERENCIAL.
-       - Debes entender qué pide específicamente el tema del capítulo '{topic}' DENTRO del objetivo general del proyecto '{project_title}'.
+       - Debes entender qué pide específicamente el tema del capítulo (indicado en el mensaje del usuario) DENTRO del objetivo general del proyecto '{project_title}'.
        - ¿Qué hace único a este capítulo? ¿Qué información específica necesita el proyecto de este tema? Diférencialo de otros capítulos.
        - Busca EXCLUSIVAMENTE información que responda a este tema específico. No busques información general del proyecto si no aplica a este capítulo concreto.
        - Intenta incluiren las búsquedas la palabra clave del titulo del proyecto.
@@ -71,53 +81,56 @@ async def generate_search_strategy(topic: str, custom_prompt: Optional[str] = No
     if project_title:
         project_context_section = f"\n    CONTEXTO DEL PROYECTO: {project_title}\n"
     
+    current_task_section = ""
     if full_index:
         # Formatear el índice para mostrar contexto
         index_str = "\n    - " + "\n    - ".join(full_index[:50]) # Limitar a 50 items para no saturar
         if len(full_index) > 50:
             index_str += "\n    - ..."
         project_context_section += f"\n    ÍNDICE COMPLETO DEL PROYECTO:{index_str}\n"
-        project_context_section += f"\n    TU TAREA ACTUAL ES INVESTIGAR EL PUNTO: '{topic}'\n"
+        current_task_section = f"\nTU TAREA ACTUAL ES INVESTIGAR EL PUNTO: '{topic}'\n"
 
     # Sección de contexto jerárquico (padre, hermanos, hijos)
     hierarchical_section = ""
     if hierarchical_context:
-        hierarchical_section = f"\n    {hierarchical_context}\n"
+        hierarchical_section = f"\n{hierarchical_context}\n"
 
     # Sección de Brief/Objetivo del capítulo
     brief_section = ""
     if brief:
-        brief_section = f"\n    BRIEF/OBJETIVO DEL CAPÍTULO:\n    {brief}\n"
+        brief_section = f"\nBRIEF/OBJETIVO DEL CAPÍTULO:\n{brief}\n"
 
     agent_context_section = ""
     if agent_description:
         agent_context_section = f"""
-    ROL DEL AGENTE ASIGNADO PARA ESTE TOPIC EN CONCRETO (TÚ ERES ESTE AGENTE):
-    {agent_description}
+ROL DEL AGENTE ASIGNADO PARA ESTE TOPIC EN CONCRETO (TÚ ERES ESTE AGENTE):
+{agent_description}
 
-    INSTRUCCIÓN DE ROL: Tu estrategia de búsqueda DEBE estar alineada con este rol. Busca información que permita a este agente escribir un reporte excelente desde su perspectiva única.
-    """
+INSTRUCCIÓN DE ROL: Tu estrategia de búsqueda DEBE estar alineada con este rol. Busca información que permita a este agente escribir un reporte excelente desde su perspectiva única.
+"""
 
     # Sección de queries fallidas (para evitar repetir)
     failed_queries_section = ""
     if failed_queries:
-        failed_list = "\n    - ".join(failed_queries[-10:])  # Últimas 10
+        failed_list = "\n- ".join(failed_queries[-10:])  # Últimas 10
         failed_queries_section = f"""
-    
-    ⚠️ QUERIES QUE NO DIERON BUENOS RESULTADOS (EVITAR SIMILARES):
-    - {failed_list}
-    
-    INSTRUCCIÓN: Genera queries DIFERENTES que aborden el tema desde otro ángulo.
-    Prueba: sinónimos, términos más específicos, fuentes alternativas, otros idiomas (inglés si el tema es global), site:domain para fuentes específicas.
-    """
+
+⚠️ QUERIES QUE NO DIERON BUENOS RESULTADOS (EVITAR SIMILARES):
+- {failed_list}
+
+INSTRUCCIÓN: Genera queries DIFERENTES que aborden el tema desde otro ángulo.
+Prueba: sinónimos, términos más específicos, fuentes alternativas, otros idiomas (inglés si el tema es global), site:domain para fuentes específicas.
+"""
 
     # NOTA: El contexto de la empresa ahora viene de Airtable (campo Context en Proyectos)
     # No se usa company_context del JSON, se usa project_specific_context de Airtable
-    company_context_section = ""
     # company_context ya no se usa - el contexto viene de Airtable en project_specific_context
 
+    # Contexto variable del item (sufijo dinámico, al principio del mensaje de usuario)
+    item_context = f"{current_task_section}{hierarchical_section}{brief_section}{agent_context_section}{failed_queries_section}"
+
     # 1. Caso Default (sin fuentes, sin custom prompt)
-    default_system_msg = default_system_msg.replace("INSTRUCCIONES:", f"{project_context_section}{hierarchical_section}{brief_section}{agent_context_section}{company_context_section}{failed_queries_section}\n\n    INSTRUCCIONES:")
+    default_system_msg = default_system_msg.replace("INSTRUCCIONES:", f"{project_context_section}\n\n    INSTRUCCIONES:")
     
     # Si hay fuentes existentes, hacer gap analysis
     if existing_sources and existing_sources.strip():
@@ -126,9 +139,6 @@ async def generate_search_strategy(topic: str, custom_prompt: Optional[str] = No
         
 Tu misión es analizar las fuentes ya recopiladas e identificar QUÉ FALTA investigar.
 {project_context_section}
-{hierarchical_section}
-{brief_section}
-{agent_context_section}
 
 INSTRUCCIONES:
 1. PRIORIDAD EXTERNA: Enfócate en cubrir los gaps con información EXTERNA (mercado, competidores, tendencias globales). No busques información interna de la empresa del cliente ya que esa base ya está cubierta.
@@ -136,7 +146,7 @@ INSTRUCCIONES:
 3. NO generes queries para temas ya bien cubiertos.
 4. Enfócate en encontrar información complementaria y nueva del mercado exterior.
 5. RESTRICCIÓN EMPRESARIAL: NO incluyas el nombre de la empresa cliente en tus queries. Queremos una visión "outside-in" del mercado, no noticias corporativas internas. Si el tema es sobre infraestructuras, busca "infrastructure trends", "toll roads market", etc., sin mencionar a la empresa específica.
-6. ALINEACIÓN TOTAL CON EL PROYECTO: TU FOCO ES EXTRACTIVO Y DIFERENCIAL. Debes entender qué pide específicamente el tema '{topic}' dentro del objetivo del proyecto '{project_title}'. Busca EXCLUSIVAMENTE información que responda a este gap específico.
+6. ALINEACIÓN TOTAL CON EL PROYECTO: TU FOCO ES EXTRACTIVO Y DIFERENCIAL. Debes entender qué pide específicamente el tema (indicado en el mensaje del usuario) dentro del objetivo del proyecto '{project_title}'. Busca EXCLUSIVAMENTE información que responda a este gap específico.
 
 FORMATO JSON OBLIGATORIO:
 {{
@@ -157,7 +167,7 @@ FORMATO JSON OBLIGATORIO:
             system_msg = gap_analysis_base
             
         user_msg = f"""TEMA PRINCIPAL: {topic}
-
+{item_context}
 FUENTES YA RECOPILADAS:
 {existing_sources}
 
@@ -171,9 +181,6 @@ IMPORTANTE: Responde ÚNICAMENTE en formato JSON con la estructura especificada.
         if custom_prompt:
             system_msg = f"""{custom_prompt}
 {project_context_section}
-{hierarchical_section}
-{brief_section}
-{agent_context_section}
 
 Además, eres un experto OSINT (Open Source Intelligence). 
 Tu misión es generar queries de búsqueda efectivas para Tavily (API de búsqueda especializada en investigación).
@@ -188,7 +195,7 @@ INSTRUCCIONES:
 7. RESTRICCIÓN EMPRESARIAL: NO incluyas el nombre de la empresa cliente en tus queries.
 8. ALINEACIÓN TOTAL CON EL PROYECTO: 
    - TU FOCO ES EXTRACTIVO Y DIFERENCIAL. 
-   - Genera queries que busquen CÓMO el tema '{topic}' impacta o se relaciona con el objetivo del proyecto '{project_title}'.
+   - Genera queries que busquen CÓMO el tema (indicado en el mensaje del usuario) impacta o se relaciona con el objetivo del proyecto '{project_title}'.
    - Evita búsquedas genéricas si el proyecto pide un enfoque específico.
 
 FORMATO JSON OBLIGATORIO:
@@ -204,7 +211,7 @@ FORMATO JSON OBLIGATORIO:
             system_msg = default_system_msg
         user_msg = f"""TEMA A INVESTIGAR:
 {topic}
-
+{item_context}
 Genera el plan de búsqueda en formato JSON con la estructura especificada.
 IMPORTANTE: Responde ÚNICAMENTE en formato JSON, sin texto adicional antes o después."""
 
@@ -290,11 +297,16 @@ IMPORTANTE: Responde ÚNICAMENTE en formato JSON, sin texto adicional antes o de
     content = response.content.strip() if hasattr(response, "content") else str(response).strip()
     
     # Remove markdown code blocks
-    if "```" in content:
-        if "```json" in content:
-            content = content.split("```json")[-1].split("```")[0].strip()
-        else:
-            content = content.split("```")[1].split("```")[0].strip()
+    fence = content.rfind("```json")
+    if fence != -1:
+        fence += 7
+    else:
+        fence = content.find("```")
+        if fence != -1:
+            fence += 3
+    if fence != -1:
+        end = content.find("```", fence)
+        content = (content[fence:end] if end != -1 else content[fence:]).strip()
     
     # Attempt to extract outermost JSON object if extra text exists
     if not content.startswith("{") or not content.endswith("}"):
@@ -305,8 +317,7 @@ IMPORTANTE: Responde ÚNICAMENTE en formato JSON, sin texto adicional antes o de
 
     # FIX: Clean newlines inside strings that break JSON parsing
     # This regex looks for newlines that are inside double quotes
-    import re
-    content = re.sub(r'(?<=[^"\\])"(.*?)(?<!\\)"', lambda m: '"' + m.group(1).replace('\n', ' ') + '"', content, flags=re.DOTALL)
+    content = _QUOTED_STRING_RE.sub(lambda m: '"' + m.group(1).replace('\n', ' ') + '"', content)
 
     
     # Parsear JSON
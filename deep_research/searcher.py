@@ -211,11 +211,12 @@ async def execute_exa_step(query: str, max_results: int) -> List[Dict]:
 # ==========================================
 
 async def enrich_with_firecrawl(sources: List[Dict], playbook: Playbook) -> List[Dict]:
-    """Enriquecimiento inteligente con Firecrawl basado en política."""
-    from .firecrawl_client import firecrawl_manager
+    """Enriquecimiento inteligente con Firecrawl basado en política (un solo batch scrape)."""
+    from .config import FIRECRAWL_API_KEY, FIRECRAWL_TIMEOUT_SECONDS
+    from .firecrawl_client import fetch_firecrawl_markdown_batch
     
     candidates = search_policy.select_firecrawl_candidates(sources, playbook)
-    if not candidates:
+    if not candidates or not FIRECRAWL_API_KEY:
         return sources
 
     logger.log_info(f"🔥 Enriching {len(candidates)} candidates with Firecrawl...")
@@ -223,19 +224,22 @@ async def enrich_with_firecrawl(sources: List[Dict], playbook: Playbook) -> List
     # Mapeo para actualización rápida
     source_map = {canonicalize_url(s['url']): s for s in sources}
     
-    for cand in candidates:
-        url = cand['url']
-        try:
-            # firecrawl_manager ya maneja el cache internamente si está configurado
-            md = await firecrawl_manager.scrape_url(url)
-            if md:
-                canon = canonicalize_url(url)
-                if canon in source_map:
-                    source_map[canon]['raw_content'] = truncate_text(md, MAX_CHARS_PER_SOURCE)
-                    source_map[canon]['snippet'] = truncate_text(md, 2000) # Snippet corto para el analyst
-                    source_map[canon]['enriched_by'] = 'firecrawl'
-        except Exception as e:
-            logger.log_warning(f"Firecrawl failed for {url}: {e}")
+    # Un job /v1/batch/scrape para todas las candidatas en lugar de un POST por URL
+    try:
+        scraped = await fetch_firecrawl_markdown_batch(
+            [cand['url'] for cand in candidates], FIRECRAWL_API_KEY, FIRECRAWL_TIMEOUT_SECONDS * 2
+        )
+    except Exception as e:
+        logger.log_warning(f"Firecrawl batch failed: {e}")
+        return sources
+    
+    for url, (md, _meta) in scraped.items():
+        if md:
+            canon = canonicalize_url(url)
+            if canon in source_map:
+                source_map[canon]['raw_content'] = truncate_text(md, MAX_CHARS_PER_SOURCE)
+                source_map[canon]['snippet'] = truncate_text(md, 2000) # Snippet corto para el analyst
+                source_map[canon]['enriched_by'] = 'firecrawl'
             
     return list(source_map.values())
 
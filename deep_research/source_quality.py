@@ -3,13 +3,22 @@ Módulo Source Quality: Cache, pre-filtros de élite, métricas de confianza y d
 Optimiza tokens y llamadas al LLM judge.
 """
 
-import json
+import atexit
 import hashlib
+import os
+import threading
+import zlib
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timedelta
+from enum import Enum
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 import re
 
+from .settings_manager import settings
+from .utils import json_dumps_bytes, json_loads
+
 # ==========================================
 # CONFIGURACIÓN
 # ==========================================
@@ -17,6 +26,44 @@ import re
 CACHE_FILE = Path(__file__).parent.parent / ".evaluation_cache.json"
 CACHE_TTL_DAYS = 7  # Días antes de invalidar cache
 
+# Cache por contenido (context + título + snippet): reutiliza evaluaciones de
+# fuentes equivalentes publicadas en otra URL
+SEMANTIC_CACHE_FILE = Path(__file__).parent.parent / ".evaluation_semantic_cache.json"
+SEMANTIC_CACHE_MIN_SIMILARITY = 0.92  # Jaccard mínimo de tokens título+snippet
+
+
+class CacheMode(Enum):
+    """Modo de los caches de evaluaciones (URL y contenido)."""
+    ENABLED = "ENABLED"      # Lee y escribe
+    READ_ONLY = "READ_ONLY"  # Lee, no escribe
+    REPLAY = "REPLAY"        # Lee, no escribe; un miss no puede ir al LLM (CacheMissError)
+    DISABLED = "DISABLED"    # Ni lee ni escribe
+
+
+class CacheMissError(Exception):
+    """Fuente sin evaluación cacheada en modo REPLAY (re-ejecución sin coste de LLM)."""
+
+
+def _cache_mode_from_settings() -> CacheMode:
+    """Modo del cache: env EVAL_CACHE_MODE > [evaluator] cache_mode > ENABLED."""
+    value = (settings.get_env("EVAL_CACHE_MODE") or settings.get_nested("evaluator", "cache_mode") or "ENABLED")
+    try:
+        return CacheMode(str(value).upper().strip())
+    except ValueError:
+        print(f"   ⚠️ cache_mode desconocido '{value}', usando ENABLED")
+        return CacheMode.ENABLED
+
+
+CACHE_MODE = _cache_mode_from_settings()
+
+
+def _cache_reads_enabled() -> bool:
+    return CACHE_MODE is not CacheMode.DISABLED
+
+
+def _cache_writes_enabled() -> bool:
+    return CACHE_MODE is CacheMode.ENABLED
+
 # ==========================================
 # DOMINIOS DE ÉLITE (Fast-track sin LLM)
 # ==========================================
@@ -101,33 +148,63 @@ AUTO_REJECT_DOMAINS = [
 ]
 
 
+# Índice de auto-reject por host: host -> [(prefijo de path, entrada original)]
+# ('linkedin.com/posts' solo rechaza paths que empiezan por /posts)
+_AUTO_REJECT_INDEX: Dict[str, List[Tuple[str, str]]] = {}
+for _entry in AUTO_REJECT_DOMAINS:
+    _host, _sep, _path = _entry.partition('/')
+    _AUTO_REJECT_INDEX.setdefault(_host, []).append((_sep + _path, _entry))
+
+
+@lru_cache(maxsize=8192)
+def _split_url(url_lower: str) -> Tuple[Tuple[str, ...], str]:
+    """
+    Sufijos del host de más largo a más corto (www.ec.europa.eu -> ..., ec.europa.eu, europa.eu, eu)
+    y path de la URL.
+    """
+    if '://' not in url_lower:
+        url_lower = '//' + url_lower
+    try:
+        parts = urlsplit(url_lower)
+        host = parts.hostname or ''
+    except ValueError:
+        return (), ''
+    labels = host.split('.')
+    return tuple('.'.join(labels[i:]) for i in range(len(labels))), parts.path
+
+
 def get_elite_domain_scores(url: str) -> Optional[Dict]:
     """
     Retorna scores pre-asignados si el dominio es de élite.
     Ahorra llamada al LLM judge.
     
+    El lookup recorre los sufijos del host contra índices hash
+    (O(nº de labels)), en vez de buscar cada dominio como substring de la URL.
+    
     Returns:
         Dict con scores o None si no es élite
     """
     if not url:
         return None
     
-    url_lower = url.lower()
+    host_suffixes, path = _split_url(url.lower())
     
     # Check auto-reject primero
-    for reject_domain in AUTO_REJECT_DOMAINS:
-        if reject_domain in url_lower:
-            return {
-                'reliability': 0,
-                'authenticity': 0,
-                'domain': reject_domain,
-                'auto_reject': True,
-                'reason': f'Dominio en lista de rechazo automático: {reject_domain}'
-            }
-    
-    # Check élite
-    for domain, scores in ELITE_DOMAINS.items():
-        if domain in url_lower:
+    for host in host_suffixes:
+        for path_prefix, reject_domain in _AUTO_REJECT_INDEX.get(host, ()):
+            if path.startswith(path_prefix):
+                return {
+                    'reliability': 0,
+                    'authenticity': 0,
+                    'domain': reject_domain,
+                    'auto_reject': True,
+                    'reason': f'Dominio en lista de rechazo automático: {reject_domain}'
+                }
+    
+    # Check élite (el sufijo más específico gana: ec.europa.eu antes que europa.eu)
+    for domain in host_suffixes:
+        scores = ELITE_DOMAINS.get(domain)
+        if scores is not None:
             return {
                 **scores,
                 'domain': domain,
@@ -147,83 +224,415 @@ def is_elite_domain(url: str) -> bool:
 # CACHE DE EVALUACIONES
 # ==========================================
 
-def _load_cache() -> Dict:
-    """Carga cache desde archivo JSON."""
-    if CACHE_FILE.exists():
+def _read_json_file(path: Path, label: str) -> Dict:
+    """Lee un cache JSON; {} si no existe o está corrupto."""
+    if path.exists():
         try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_loads(path.read_bytes())
         except Exception as e:
-            print(f"   ⚠️ Error cargando cache: {e}")
+            print(f"   ⚠️ Error cargando {label}: {e}")
             return {}
     return {}
 
 
-def _save_cache(cache: Dict):
-    """Guarda cache a archivo JSON."""
+def _write_json_file(path: Path, data: Dict, label: str):
+    """
+    Escribe un cache JSON (UTF-8, sin escapar no-ASCII) en un archivo temporal y lo
+    sustituye con os.replace: un lector concurrente ve el archivo anterior o el nuevo,
+    nunca uno a medio escribir.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, ensure_ascii=False)
+        tmp_path.write_bytes(json_dumps_bytes(data))
+        os.replace(tmp_path, path)
     except Exception as e:
-        print(f"   ⚠️ Error guardando cache: {e}")
+        print(f"   ⚠️ Error guardando {label}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+# Campos de la evaluación que se cachean (scores, decisión y su procedencia:
+# pre_judge = "mimo" | "gemini" y la confianza de MiMo), nunca el contenido
+_CACHED_EVAL_FIELDS = frozenset({
+    'authenticity_score', 'reliability_score', 'relevance_score',
+    'currency_score', 'total_score', 'is_clickbait', 'keep', 'reasoning',
+    'pre_judge', 'confidence'
+})
+
+
+def _load_cache() -> Dict:
+    """Carga cache desde archivo JSON."""
+    return _read_json_file(CACHE_FILE, "cache")
+
+
+def _save_cache(cache: Dict):
+    """Guarda cache a archivo JSON."""
+    _write_json_file(CACHE_FILE, cache, "cache")
 
 
-def _url_hash(url: str) -> str:
-    """Genera hash único para URL."""
+def _cache_key(url: str, context: str = "") -> str:
+    """
+    Clave del cache: SHA256 de URL normalizada + tema de investigación.
+    La relevancia depende del tema, así que una evaluación no se reutiliza entre temas.
+    """
     normalized = url.lower().rstrip('/').split('?')[0]  # Normalizar y quitar params
-    return hashlib.md5(normalized.encode()).hexdigest()
+    return hashlib.sha256(f"{normalized}|{_normalize_text(context)}".encode()).hexdigest()
+
+
+# Negative cache en memoria: clave de cache -> (evaluación rechazada, fecha).
+# Las fuentes rechazadas (granjas SEO, afiliados...) reaparecen muchas veces en una
+# misma ejecución; se resuelven con un probe de dict sin releer el JSON del disco.
+_rejected_evaluations: Dict[str, Tuple[Dict, datetime]] = {}
 
 
-def get_cached_evaluation(url: str) -> Optional[Dict]:
+def _remember_rejection(key: str, evaluation: Dict, cached_at: datetime):
+    """Registra una evaluación rechazada en el negative cache en memoria."""
+    if evaluation and evaluation.get('keep') is False:
+        _rejected_evaluations[key] = (evaluation, cached_at)
+
+
+def get_cached_evaluation(url: str, context: str = "") -> Optional[Dict]:
     """
     Obtiene evaluación cacheada si existe y no ha expirado.
     
     Returns:
         Dict con evaluación o None si no hay cache válido
     """
+    if not _cache_reads_enabled():
+        return None
+    key = _cache_key(url, context)
+    
+    rejected = _rejected_evaluations.get(key)
+    if rejected is not None:
+        evaluation, cached_date = rejected
+        if datetime.now() - cached_date < timedelta(days=CACHE_TTL_DAYS):
+            return dict(evaluation)
+        del _rejected_evaluations[key]
+    
+    pending = _pending_cache_writes.get(key)
+    if pending is not None:
+        return pending['evaluation']
+    
     cache = _load_cache()
-    key = _url_hash(url)
     
     if key in cache:
-        entry = cache[key]
-        try:
-            cached_date = datetime.fromisoformat(entry.get('cached_at', '2000-01-01'))
-            if datetime.now() - cached_date < timedelta(days=CACHE_TTL_DAYS):
-                return entry.get('evaluation')
-        except (ValueError, TypeError):
-            pass
+        return _valid_cached_entry(key, cache[key], datetime.now())
+    return None
+
+
+def _valid_cached_entry(key: str, entry: Dict, now: datetime) -> Optional[Dict]:
+    """Evaluación de una entrada del cache si no ha expirado (y la recuerda si es rechazo)."""
+    try:
+        cached_date = datetime.fromisoformat(entry.get('cached_at', '2000-01-01'))
+        if now - cached_date < timedelta(days=CACHE_TTL_DAYS):
+            evaluation = entry.get('evaluation')
+            _remember_rejection(key, evaluation, cached_date)
+            return evaluation
+    except (ValueError, TypeError):
+        pass
     return None
 
 
-def cache_evaluation(url: str, evaluation: Dict):
+def get_cached_evaluations(urls: List[str], context: str = "") -> Dict[str, Dict]:
+    """
+    Versión batch de get_cached_evaluation: lee el archivo de cache una sola vez
+    para todas las URLs (en vez de una lectura + parseo del JSON por URL).
+    
+    Returns:
+        Dict url -> evaluación, solo para las URLs con cache válido
+    """
+    if not _cache_reads_enabled():
+        return {}
+    now = datetime.now()
+    found: Dict[str, Dict] = {}
+    cache = None
+    for url in urls:
+        key = _cache_key(url, context)
+        rejected = _rejected_evaluations.get(key)
+        if rejected is not None and now - rejected[1] < timedelta(days=CACHE_TTL_DAYS):
+            found[url] = dict(rejected[0])
+            continue
+        pending = _pending_cache_writes.get(key)
+        if pending is not None:
+            found[url] = pending['evaluation']
+            continue
+        if cache is None:
+            cache = _load_cache()
+        entry = cache.get(key)
+        evaluation = _valid_cached_entry(key, entry, now) if entry else None
+        if evaluation:
+            found[url] = evaluation
+    return found
+
+
+# Write-behind del cache por URL: las evaluaciones nuevas se acumulan en memoria
+# (visibles para las lecturas) y se vuelcan al JSON en una sola lectura+escritura
+_pending_cache_writes: Dict[str, Dict] = {}
+# Igual para el cache semántico (firma de contenido -> entrada)
+_pending_semantic_writes: Dict[str, Dict] = {}
+_pending_cache_lock = threading.Lock()
+_flush_cache_lock = threading.Lock()
+
+
+def queue_cache_evaluation(url: str, evaluation: Dict, context: str = ""):
     """
-    Guarda evaluación en cache.
+    Encola una evaluación para el cache sin tocar el disco (ver flush_cache_evaluations).
     Solo guarda los campos de scoring, no el contenido completo.
     """
-    cache = _load_cache()
-    key = _url_hash(url)
+    if not _cache_writes_enabled():
+        return
+    key = _cache_key(url, context)
     
     # Solo cachear campos de evaluación, no contenido
-    eval_fields = {
-        'authenticity_score', 'reliability_score', 'relevance_score', 
-        'currency_score', 'total_score', 'is_clickbait', 'keep', 'reasoning'
-    }
+    cached_eval = {k: v for k, v in evaluation.items() if k in _CACHED_EVAL_FIELDS}
     
-    cached_eval = {k: v for k, v in evaluation.items() if k in eval_fields}
+    now = datetime.now()
+    with _pending_cache_lock:
+        _pending_cache_writes[key] = {
+            'url': url,
+            'evaluation': cached_eval,
+            'cached_at': now.isoformat()
+        }
+    _rejected_evaluations.pop(key, None)
+    _remember_rejection(key, cached_eval, now)
+
+
+def has_pending_cache_writes() -> bool:
+    """True si hay evaluaciones encoladas (cache por URL o semántico) sin volcar a disco."""
+    return bool(_pending_cache_writes) or bool(_pending_semantic_writes)
+
+
+def flush_cache_evaluations() -> int:
+    """
+    Vuelca las evaluaciones encoladas a los archivos de cache por URL y semántico
+    (una lectura + una escritura por archivo). Seguro desde varios hilos.
+    
+    Las entradas siguen en la cola (visibles para las lecturas) hasta que su archivo
+    está escrito; solo entonces se retiran, salvo las re-encoladas entretanto.
+    
+    Returns:
+        Número de evaluaciones escritas
+    """
+    with _flush_cache_lock:
+        with _pending_cache_lock:
+            pending = dict(_pending_cache_writes)
+            pending_semantic = dict(_pending_semantic_writes)
+        if pending:
+            cache = _load_cache()
+            cache.update(pending)
+            _save_cache(cache)
+        if pending_semantic:
+            # El índice en memoria ya tiene estas entradas: si reflejaba el archivo, sigue
+            # vigente tras escribirlo (se evita reconstruirlo en el próximo lookup)
+            memo_in_sync = _semantic_memo['key'] == _semantic_file_key()
+            semantic_cache = _load_semantic_cache()
+            semantic_cache.update(pending_semantic)
+            _save_semantic_cache(semantic_cache)
+            if memo_in_sync:
+                _semantic_memo['key'] = _semantic_file_key()
+        with _pending_cache_lock:
+            for queue, written in ((_pending_cache_writes, pending), (_pending_semantic_writes, pending_semantic)):
+                for key, entry in written.items():
+                    if queue.get(key) is entry:
+                        del queue[key]
+        return len(pending) + len(pending_semantic)
+
+
+# Lo que quede encolado al terminar el proceso no se pierde
+atexit.register(flush_cache_evaluations)
+
+
+def cache_evaluation(url: str, evaluation: Dict, context: str = ""):
+    """
+    Guarda evaluación en cache (escritura inmediata).
+    Solo guarda los campos de scoring, no el contenido completo.
+    """
+    queue_cache_evaluation(url, evaluation, context)
+    flush_cache_evaluations()
+
+
+# ==========================================
+# CACHE SEMÁNTICO (por contenido)
+# ==========================================
+
+_SEMANTIC_TOKEN_RE = re.compile(r'\b\w{3,}\b')
+
+
+def _normalize_text(text: str) -> str:
+    """Minúsculas y espacios colapsados."""
+    return " ".join((text or "").lower().split())
+
+
+def _context_hash(context: str) -> str:
+    """Hash del tema de investigación (las evaluaciones solo se reutilizan dentro del mismo tema)."""
+    return hashlib.blake2b(_normalize_text(context).encode(), digest_size=16).hexdigest()
+
+
+def _content_signature(context: str, title: str, snippet: str) -> str:
+    """Firma exacta de (context, título, snippet[:300]) (blake2b: clave interna, no expuesta)."""
+    raw = "\n".join((_normalize_text(context), _normalize_text(title), _normalize_text((snippet or "")[:300])))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _content_token_ids(title: str, snippet: str) -> frozenset:
+    """
+    Tokens de título+snippet para la comparación aproximada, cuantizados a ids
+    CRC32 de 32 bits (más compactos que los strings en disco y en memoria).
+    """
+    text = f"{title or ''} {(snippet or '')[:300]}".lower()
+    return frozenset(zlib.crc32(token.encode()) for token in _SEMANTIC_TOKEN_RE.findall(text))
+
+
+def _load_semantic_cache() -> Dict:
+    """Carga cache semántico desde archivo JSON."""
+    return _read_json_file(SEMANTIC_CACHE_FILE, "cache semántico")
+
+
+def _save_semantic_cache(cache: Dict):
+    """Guarda cache semántico a archivo JSON."""
+    _write_json_file(SEMANTIC_CACHE_FILE, cache, "cache semántico")
+
+
+# Índice en memoria del cache semántico: se reconstruye solo si el archivo cambia
+# (clave: ruta, mtime, tamaño), en vez de releer y re-tokenizar en cada lookup
+_semantic_memo: Dict = {'key': None, 'cache': {}, 'index': {}}
+
+
+def _semantic_file_key() -> Optional[Tuple[str, int, int]]:
+    try:
+        stat = SEMANTIC_CACHE_FILE.stat()
+    except OSError:
+        return None
+    return (str(SEMANTIC_CACHE_FILE), stat.st_mtime_ns, stat.st_size)
+
+
+def _index_semantic_cache(cache: Dict) -> Dict[Tuple[str, Optional[str]], List[Tuple[frozenset, Dict]]]:
+    """Agrupa entradas por (contexto, categoría de fuente) con sus token ids como frozenset."""
+    index: Dict[Tuple[str, Optional[str]], List[Tuple[frozenset, Dict]]] = {}
+    for entry in cache.values():
+        bucket = (entry.get('context'), entry.get('category'))
+        index.setdefault(bucket, []).append((frozenset(entry.get('token_ids', ())), entry))
+    return index
+
+
+def _semantic_state() -> Tuple[Dict, Dict[Tuple[str, Optional[str]], List[Tuple[frozenset, Dict]]]]:
+    """(cache, índice por contexto y categoría) vigentes, incluidas las entradas encoladas."""
+    key = _semantic_file_key()
+    if _semantic_memo['key'] != key:
+        cache = _load_semantic_cache() if key is not None else {}
+        with _pending_cache_lock:
+            cache.update(_pending_semantic_writes)
+        _semantic_memo.update(key=key, cache=cache, index=_index_semantic_cache(cache))
+    return _semantic_memo['cache'], _semantic_memo['index']
+
+
+def get_semantic_cached_evaluation(
+    context: str, title: str, snippet: str, category: Optional[str] = None
+) -> Optional[Dict]:
+    """
+    Busca una evaluación de una fuente con el mismo contenido para el mismo tema.
+    
+    1. Firma exacta de (context, título, snippet)
+    2. Vecino más cercano por Jaccard de tokens >= SEMANTIC_CACHE_MIN_SIMILARITY,
+       con los scores penalizados proporcionalmente a la similitud
+    
+    Con category (source_category del evaluator) solo se reutilizan evaluaciones de fuentes
+    de la misma categoría: el mismo titular en un medio general no hereda la fiabilidad
+    de la versión institucional o de consultora.
+    
+    Returns:
+        Dict con evaluación (incluye 'semantic_similarity') o None si no hay match
+    """
+    if not (title or snippet) or not _cache_reads_enabled():
+        return None
+    
+    cache, index = _semantic_state()
+    if not cache:
+        return None
     
-    cache[key] = {
-        'url': url,
-        'evaluation': cached_eval,
+    now = datetime.now()
+    
+    def is_valid(entry: Dict) -> bool:
+        try:
+            cached_date = datetime.fromisoformat(entry.get('cached_at', '2000-01-01'))
+            return now - cached_date < timedelta(days=CACHE_TTL_DAYS)
+        except (ValueError, TypeError):
+            return False
+    
+    exact = cache.get(_content_signature(context, title, snippet))
+    if exact and is_valid(exact) and exact.get('category') == category:
+        return {**exact.get('evaluation', {}), 'semantic_similarity': 1.0}
+    
+    tokens = _content_token_ids(title, snippet)
+    if not tokens:
+        return None
+    
+    best_entry, best_similarity = None, 0.0
+    for entry_tokens, entry in index.get((_context_hash(context), category), ()):
+        # Cota superior de Jaccard por tamaños: descarta sin calcular la intersección
+        if min(len(tokens), len(entry_tokens)) < SEMANTIC_CACHE_MIN_SIMILARITY * max(len(tokens), len(entry_tokens)):
+            continue
+        intersection = len(tokens & entry_tokens)
+        similarity = intersection / (len(tokens) + len(entry_tokens) - intersection)
+        if similarity > best_similarity and is_valid(entry):
+            best_entry, best_similarity = entry, similarity
+    
+    if best_entry is None or best_similarity < SEMANTIC_CACHE_MIN_SIMILARITY:
+        return None
+    
+    # Penalización por no ser idéntica: escalar scores por la similitud
+    evaluation = dict(best_entry.get('evaluation', {}))
+    for field in ('relevance_score', 'total_score'):
+        if isinstance(evaluation.get(field), (int, float)):
+            evaluation[field] = round(evaluation[field] * best_similarity, 1)
+    evaluation['semantic_similarity'] = round(best_similarity, 3)
+    return evaluation
+
+
+def cache_semantic_evaluation(
+    context: str, title: str, snippet: str, evaluation: Dict, category: Optional[str] = None
+):
+    """
+    Guarda evaluación en el cache semántico (solo evaluaciones hechas con LLM).
+    Write-behind como el cache por URL: la entrada queda visible en el índice en memoria
+    y se vuelca a disco en flush_cache_evaluations.
+    """
+    if not (title or snippet) or not _cache_writes_enabled():
+        return
+    
+    signature = _content_signature(context, title, snippet)
+    token_ids = _content_token_ids(title, snippet)
+    entry = {
+        'context': _context_hash(context),
+        'category': category,
+        'token_ids': sorted(token_ids),
+        'evaluation': {k: v for k, v in evaluation.items() if k in _CACHED_EVAL_FIELDS},
         'cached_at': datetime.now().isoformat()
     }
-    _save_cache(cache)
+    cache, index = _semantic_state()
+    with _pending_cache_lock:
+        _pending_semantic_writes[signature] = entry
+    
+    # Añadir la entrada al índice en memoria (sustituyendo la anterior con la misma firma)
+    previous = cache.get(signature)
+    if previous is not None:
+        old_bucket = index.get((previous.get('context'), previous.get('category')), [])
+        old_bucket[:] = [item for item in old_bucket if item[1] is not previous]
+    cache[signature] = entry
+    index.setdefault((entry['context'], category), []).append((token_ids, entry))
 
 
 def clear_cache():
     """Limpia todo el cache de evaluaciones."""
+    _rejected_evaluations.clear()
+    with _pending_cache_lock:
+        _pending_cache_writes.clear()
+        _pending_semantic_writes.clear()
     if CACHE_FILE.exists():
         CACHE_FILE.unlink()
         print("   ✅ Cache de evaluaciones limpiado")
+    if SEMANTIC_CACHE_FILE.exists():
+        SEMANTIC_CACHE_FILE.unlink()
+    _semantic_memo.update(key=None, cache={}, index={})
 
 
 def get_cache_stats() -> Dict:
@@ -6,10 +6,32 @@ import json
 import os
 import asyncio
 import concurrent.futures
+import time
 from datetime import datetime
-from typing import List, Dict, Set, Any, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import tiktoken
 
+# orjson (C) si está disponible; sus errores heredan de json.JSONDecodeError
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parsea JSON (str o bytes) con orjson si está instalado; si no, con json."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(data) -> bytes:
+    """Serializa a JSON UTF-8 (bytes) con orjson si está instalado; si no, con json."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
 def count_tokens(text: str, model_name: str = "gpt-4") -> int:
     """
     Cuenta el número aproximado de tokens en un texto usando tiktoken.
@@ -139,9 +161,13 @@ def extract_rejected_urls_from_sources(sources_text: str) -> Set[str]:
     return rejected_urls
 
 
+@lru_cache(maxsize=16384)
 def canonicalize_url(url: str) -> str:
     """Canonicaliza URL para comparación/deduplicación.
 
+    Función pura sobre strings: se cachea porque la misma URL se canonicaliza en
+    searcher, evaluator, firecrawl, reporter y consolidación de referencias.
+
     - lower
     - strip trailing slash
     - remove fragments
@@ -307,6 +333,25 @@ def save_debug_sources(state: Dict[str, Any]) -> None:
         print(f"      ⚠️ No se pudo guardar el archivo de debug de fuentes: {e}")
 
 
+# Patrones de menús de navegación (is_useless_snippet)
+_NAVIGATION_KEYWORDS = (
+    'home', 'inicio', 'about', 'sobre', 'contact', 'contacto', 'privacy', 'privacidad',
+    'terms', 'términos', 'cookie', 'legal', 'sitemap', 'mapa del sitio',
+    'menu', 'menú', 'navigation', 'navegación', 'skip to', 'saltar a',
+    'sign in', 'iniciar sesión', 'login', 'register', 'registro',
+    'subscribe', 'suscribirse', 'newsletter', 'follow us', 'síguenos'
+)
+
+# Patrones de índices/TOC, compilados una vez (is_useless_snippet se llama por fuente)
+_TOC_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'\b(table of contents|índice|contenido|contents)\b',
+    r'\b(chapter \d+|capítulo \d+|section \d+|sección \d+)\b',
+    r'^\s*(\d+\.\s*[^\n]+\n?){3,}',  # Lista numerada (3+ items)
+    r'^\s*([a-z]\.\s*[^\n]+\n?){3,}',  # Lista alfabética (3+ items)
+))
+_URL_RE = re.compile(r'https?://[^\s\)]+')
+
+
 def is_useless_snippet(snippet: str, title: str = "") -> bool:
     """
     Detecta si un snippet es inútil (menús, índices, navegación).
@@ -325,34 +370,17 @@ def is_useless_snippet(snippet: str, title: str = "") -> bool:
     title_lower = (title or "").lower()
     combined = f"{snippet_lower} {title_lower}"
     
-    # Patrones de menús de navegación
-    navigation_keywords = [
-        'home', 'inicio', 'about', 'sobre', 'contact', 'contacto', 'privacy', 'privacidad',
-        'terms', 'términos', 'cookie', 'legal', 'sitemap', 'mapa del sitio',
-        'menu', 'menú', 'navigation', 'navegación', 'skip to', 'saltar a',
-        'sign in', 'iniciar sesión', 'login', 'register', 'registro',
-        'subscribe', 'suscribirse', 'newsletter', 'follow us', 'síguenos'
-    ]
-    
     # Si el snippet es principalmente palabras de navegación, es inútil
-    nav_word_count = sum(1 for kw in navigation_keywords if kw in snippet_lower)
+    nav_word_count = sum(1 for kw in _NAVIGATION_KEYWORDS if kw in snippet_lower)
     if nav_word_count >= 3:  # 3+ palabras de navegación = probablemente menú
         return True
     
     # Patrones de índices/TOC
-    toc_patterns = [
-        r'\b(table of contents|índice|contenido|contents)\b',
-        r'\b(chapter \d+|capítulo \d+|section \d+|sección \d+)\b',
-        r'^\s*(\d+\.\s*[^\n]+\n?){3,}',  # Lista numerada (3+ items)
-        r'^\s*([a-z]\.\s*[^\n]+\n?){3,}',  # Lista alfabética (3+ items)
-    ]
-    
-    for pattern in toc_patterns:
-        if re.search(pattern, snippet_lower, re.IGNORECASE | re.MULTILINE):
-            return True
+    if any(pattern.search(snippet_lower) for pattern in _TOC_PATTERNS):
+        return True
     
     # Detectar muchos enlaces sin contexto (probablemente menú)
-    url_count = len(re.findall(r'https?://[^\s\)]+', snippet))
+    url_count = len(_URL_RE.findall(snippet))
     word_count = len(snippet.split())
     if url_count > 0 and word_count > 0:
         url_ratio = url_count / word_count
@@ -466,6 +494,55 @@ def cleanup_temp_plots():
             print(f"❌ Error al limpiar la carpeta '{folder}': {e}")
 
 
+class AsyncTokenBucket:
+    """
+    Token bucket asíncrono de per_minute unidades por minuto (peticiones, tokens LLM...):
+    cada llamada reserva su coste y espera a que el bucket se rellene si no hay saldo,
+    en lugar de chocar con el límite del proveedor y entrar en reintentos con backoff.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        """Reserva amount unidades (acotado a la capacidad), esperando lo necesario."""
+        needed = min(float(amount), self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= needed:
+                    self.tokens -= needed
+                    return
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+
+class LoopLocal:
+    """
+    Instancia única por event loop: los primitivos de asyncio (Lock, Semaphore, buckets)
+    quedan ligados al loop donde se usan, así que factory() se vuelve a llamar si cambia
+    el loop en ejecución (p. ej. un asyncio.run por item).
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._value = None
+        self._loop = None
+
+    def get(self) -> Any:
+        """Instancia del event loop actual, creándola en el primer uso."""
+        loop = asyncio.get_running_loop()
+        if self._value is None or self._loop is not loop:
+            self._value = self._factory()
+            self._loop = loop
+        return self._value
+
+
 def run_async_safely(coro):
     """
     Ejecuta una coroutine de forma segura, evitando deadlocks.
@@ -605,6 +682,16 @@ def build_hierarchical_context(topic: str, full_index: List[str]) -> str:
 
     return "\n".join(lines)
 
+# Regex precompiladas de clean_and_parse_json
+_JSON_FENCE_RE = re.compile(r'```json\s*(.*?)\s*(?:```|$)', re.DOTALL)
+_CODE_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+_JS_LINE_COMMENT_RE = re.compile(r'//.*?\n')
+_JS_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_BAD_BACKSLASH_RE = re.compile(r'\\(?![\\/bfnrtu"]|u[0-9a-fA-F]{4})')
+_TRAILING_COMMA_RE = re.compile(r',\s*([\}\]])')
+_JSON_SPAN_RE = re.compile(r'(\{.*\})|(\[.*\])', re.DOTALL)
+
+
 def clean_and_parse_json(text: str) -> Any:
     """
     Limpia y parsea una cadena JSON generada por un LLM.
@@ -626,10 +713,11 @@ def clean_and_parse_json(text: str) -> Any:
     
     # 1. Extraer de bloques Markdown si existen
     if "```json" in content:
-        content = content.split("```json")[-1].split("```")[0].strip()
+        # Último bloque ```json (sin cierre si la respuesta vino truncada)
+        content = _JSON_FENCE_RE.findall(content)[-1]
     elif "```" in content:
         # Si no especifica 'json' pero hay bloques, tomar el más grande
-        blocks = re.findall(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
+        blocks = _CODE_FENCE_RE.findall(content)
         if blocks:
             content = max(blocks, key=len).strip()
     
@@ -652,7 +740,12 @@ def clean_and_parse_json(text: str) -> Any:
     # que json.loads con strict=False puede manejar si están dentro de comillas.
     # Nota: El error 'Invalid control character' a menudo se refiere a \n sin escapar.
     
-    # Primero intentamos parseo directo con strict=False (maneja \n en strings)
+    # Primero orjson (caso habitual: JSON válido); después strict=False (maneja \n en strings)
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except json.JSONDecodeError:
+            pass
     try:
         return json.loads(content, strict=False)
     except json.JSONDecodeError:
@@ -667,15 +760,15 @@ def clean_and_parse_json(text: str) -> Any:
         clean_content = "".join(c for c in content if ord(c) >= 32 or c in "\n\r\t")
         
         # Eliminar comentarios de estilo JS si el LLM los puso (común en 'chatty' responses)
-        clean_content = re.sub(r'//.*?\n', '\n', clean_content)
-        clean_content = re.sub(r'/\*.*?\*/', '', clean_content, flags=re.DOTALL)
+        clean_content = _JS_LINE_COMMENT_RE.sub('\n', clean_content)
+        clean_content = _JS_BLOCK_COMMENT_RE.sub('', clean_content)
         
         # Escapar backslashes solitarios que no son secuencias de escape válidas en JSON
-        clean_content = re.sub(r'\\(?![\\/bfnrtu"]|u[0-9a-fA-F]{4})', r'\\\\', clean_content)
+        clean_content = _BAD_BACKSLASH_RE.sub(r'\\\\', clean_content)
         
         # Eliminar comas finales (trailing commas) en objetos y listas
         # Ej: {"a": 1,} -> {"a": 1} o [1, 2,] -> [1, 2]
-        clean_content = re.sub(r',\s*([\}\]])', r'\1', clean_content)
+        clean_content = _TRAILING_COMMA_RE.sub(r'\1', clean_content)
         
         # Intentar arreglar comillas dobles internas no escapadas en strings (heurística limitada)
         # Esto busca "prop": "valor con "comillas" internas" -> "prop": "valor con \"comillas\" internas"
@@ -688,11 +781,11 @@ def clean_and_parse_json(text: str) -> Any:
         except json.JSONDecodeError as final_err:
             # Fallback final: si sigue fallando, intentar extraer solo lo que parece un objeto
             # Esto es útil si el LLM incluyó texto antes/después que confundió al extractor principal
-            match = re.search(r'(\{.*\})|(\[.*\])', clean_content, re.DOTALL)
+            match = _JSON_SPAN_RE.search(clean_content)
             if match:
                 extracted = match.group(0)
                 # Aplicar limpieza de comas finales también al extracto
-                extracted = re.sub(r',\s*([\}\]])', r'\1', extracted)
+                extracted = _TRAILING_COMMA_RE.sub(r'\1', extracted)
                 try:
                     return json.loads(extracted, strict=False)
                 except:
@@ -708,3 +801,101 @@ def clean_and_parse_json(text: str) -> Any:
                         except:
                             pass
             raise final_err
+
+
+# Streaming de respuestas JSON del LLM (evaluador, extractor)
+class JsonStreamScanner:
+    """
+    Detecta en un stream de texto el cierre del primer valor JSON de nivel
+    superior ({...} o [...]), ignorando llaves dentro de strings.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Añade texto; devuelve el JSON candidato completo si acaba de cerrarse."""
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._start < 0:
+                if c == '{' or c == '[':
+                    self._start, self._depth = i, 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == '{' or c == '[':
+                self._depth += 1
+            elif c == '}' or c == ']':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    candidate = text[self._start:i + 1]
+                    self._start = -1  # Si no parsea, seguir buscando el siguiente
+                    return candidate
+        self._pos = len(text)
+        return None
+
+
+def is_response_format_rejection(e: BaseException) -> bool:
+    """
+    True si el error es el rechazo de response_format/json_schema por el proveedor
+    (400 / BadRequest o parámetro no soportado). Rate limits, timeouts y errores de red
+    no cuentan: se reintentan sin desactivar el structured output.
+    """
+    message = str(e).lower()
+    if not any(name in message for name in ("response_format", "json_schema", "structured output")):
+        return False
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return status == 400
+    return (
+        type(e).__name__ == "BadRequestError" or "400" in message
+        or "unsupported" in message or "not supported" in message
+    )
+
+
+def _chunk_text(chunk) -> str:
+    """Texto de un chunk de astream (str o lista de bloques de contenido)."""
+    content = getattr(chunk, 'content', chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+
+async def astream_json(llm, messages: List[Dict]) -> str:
+    """
+    Consume la respuesta en streaming y corta la generación en cuanto se ha
+    recibido un valor JSON completo y válido (no se pagan tokens de texto posterior).
+    Si el modelo no emite JSON válido, devuelve la respuesta completa para el parseo habitual.
+    """
+    scanner = JsonStreamScanner()
+    stream = llm.astream(messages)
+    try:
+        async for chunk in stream:
+            candidate = scanner.feed(_chunk_text(chunk))
+            if candidate is None:
+                continue
+            try:
+                json_loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            return candidate
+    finally:
+        await stream.aclose()
+    return scanner.text
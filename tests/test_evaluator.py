@@ -0,0 +1,716 @@
+"""
+Unit tests for evaluator module deterministic helpers.
+Tests can run offline (no LLM calls).
+"""
+
+import asyncio
+import itertools
+from collections import OrderedDict
+
+import pytest
+from tenacity import wait_none
+
+from deep_research import evaluator
+from deep_research.evaluator import (
+    TransientLLMError,
+    _ainvoke_llm,
+    _astream_json,
+    _ainvoke_with_retry,
+    _cheap_prefilter_reason,
+    _is_transient_llm_error,
+    _apply_keep_rules,
+    _parse_mimo_batch,
+    _strip_markdown_json,
+    classify_source,
+    classify_source_category,
+    evaluate_source_fast,
+    is_methodological_source,
+    get_consulting_priority,
+    quick_relevance_score,
+    refresh_profile,
+)
+from deep_research.utils import JsonStreamScanner
+
+
+class TestClassifySource:
+    """Tests for the fused single-pass source classification."""
+
+    def test_consulting_high_priority(self):
+        """Big 4 / MBB are consulting with high priority."""
+        url = "https://www.mckinsey.com/industries/energy/our-insights"
+        assert classify_source(url, "mckinsey.com") == ("consulting", False, 2)
+
+    def test_institutional_methodological(self):
+        """International organisations are institutional and methodological."""
+        url = "https://www.oecd.org/en/publications/economic-outlook.html"
+        category, is_methodological, priority = classify_source(url, "oecd.org")
+        assert category == "institutional"
+        assert is_methodological is True
+        assert priority == 0
+
+    def test_consulting_takes_precedence(self):
+        """Consulting keywords win over institutional ones (legacy precedence)."""
+        url = "https://www2.deloitte.com/us/en/insights/industry/public-sector/gov.html"
+        assert classify_source_category(url) == "consulting"
+
+    def test_domain_defaults_to_url(self):
+        """An empty domain falls back to the URL itself."""
+        url = "https://arxiv.org/abs/2401.00001"
+        assert classify_source_category(url, "") == "academic"
+
+    def test_other(self):
+        """Unknown domains fall back to 'other'."""
+        url = "https://example.org/articles/whatever"
+        assert classify_source(url, "example.org") == ("other", False, 0)
+
+    def test_wrappers_match_fused_result(self):
+        """Public wrappers agree with the fused classification."""
+        url = "https://www.rand.org/pubs/research_reports/RRA1234.html"
+        category, is_methodological, priority = classify_source(url, "rand.org")
+        assert classify_source_category(url, "rand.org") == category
+        assert is_methodological_source(url, "rand.org") == is_methodological
+        assert get_consulting_priority(url, "rand.org") == priority
+
+
+class TestQuickRelevanceScore:
+    """Tests for the Jaccard-based quick relevance score."""
+
+    def test_empty_inputs_default(self):
+        """Missing context or content returns the neutral default."""
+        assert quick_relevance_score("", "Title", "Snippet") == 5.0
+        assert quick_relevance_score("packaging market", "", "") == 5.0
+
+    def test_matches_set_jaccard(self):
+        """Score equals 25 * |A & B| / |A | B| clamped to 0-10."""
+        context = "European packaging market recycling regulation"
+        title = "EU recycling regulation reshapes packaging"
+        snippet = "Circular economy rules for plastic packaging producers"
+        a = {"european", "packaging", "market", "recycling", "regulation"}
+        b = {"recycling", "regulation", "reshapes", "packaging", "circular",
+             "economy", "rules", "plastic", "producers"}
+        expected = round(min(10.0, len(a & b) / len(a | b) * 25), 1)
+        assert quick_relevance_score(context, title, snippet) == expected
+
+    def test_no_overlap(self):
+        """Disjoint vocabularies score zero."""
+        assert quick_relevance_score("quantum computing", "Football results", "League table") == 0.0
+
+
+class TestEvaluateSourceFast:
+    """Tests for the deterministic searcher-side quality check."""
+
+    def test_no_url_rejected(self):
+        """Sources without URL are rejected."""
+        assert evaluate_source_fast({"title": "x"}) is False
+
+    def test_auto_reject_domain(self):
+        """Blacklisted domains are rejected before classification."""
+        assert evaluate_source_fast({"url": "https://www.facebook.com/some/page", "title": "x"}) is False
+
+    def test_empty_content_uses_neutral_relevance(self):
+        """Without title/snippet only the category decides (neutral relevance)."""
+        assert evaluate_source_fast({"url": "https://www.oecd.org/report"}) is True
+        assert evaluate_source_fast({"url": "https://example.org/page"}) is True
+        assert evaluate_source_fast({"url": "https://www.mckinsey.com/insights"}) is False
+
+
+class TestApplyKeepRules:
+    """Tests for the shared MiMo/Judge keep rule."""
+
+    @staticmethod
+    def _legacy_keep(total, relevance, authenticity, reliability, clickbait):
+        """Branching form of the rule as previously written in both branches."""
+        if clickbait:
+            return False
+        if (total >= evaluator.TOTAL_SCORE_THRESHOLD and relevance >= evaluator.RELEVANCE_THRESHOLD
+                and authenticity >= evaluator.AUTHENTICITY_THRESHOLD
+                and reliability >= evaluator.RELIABILITY_THRESHOLD):
+            return True
+        if reliability >= 8 and total >= evaluator.TOTAL_SCORE_THRESHOLD and relevance >= 6:
+            return authenticity >= evaluator.AUTHENTICITY_THRESHOLD
+        return False
+
+    def test_matches_legacy_rule(self):
+        """The single boolean expression agrees with the branching rule on a score grid."""
+        grid = [0.0, 4.0, 5.5, 6.0, 6.5, 7.0, 8.0, 10.0]
+        for total, relevance, authenticity, reliability, clickbait in itertools.product(
+            grid, grid, grid, grid, (False, True)
+        ):
+            evaluation = {
+                "total_score": total, "relevance_score": relevance, "authenticity_score": authenticity,
+                "reliability_score": reliability, "is_clickbait": clickbait,
+            }
+            expected = self._legacy_keep(total, relevance, authenticity, reliability, clickbait)
+            assert _apply_keep_rules(evaluation) == expected
+            assert evaluation["keep"] == expected
+
+    def test_category_hard_rules(self):
+        """Consulting needs higher relevance; strong institutional sources are rescued."""
+        consulting = {
+            "total_score": 8.0, "relevance_score": evaluator.EVAL_CONSULTING_MIN_RELEVANCE - 0.5,
+            "authenticity_score": 8.0, "reliability_score": 9.0, "is_clickbait": False, "reasoning": "ok",
+        }
+        assert _apply_keep_rules(dict(consulting)) is True
+        assert _apply_keep_rules(consulting, "consulting") is False
+        assert "Hard rule: consulting" in consulting["reasoning"]
+
+        institutional = {
+            "total_score": evaluator.TOTAL_SCORE_THRESHOLD - 0.5,
+            "relevance_score": evaluator.EVAL_INSTITUTIONAL_MIN_RELEVANCE,
+            "authenticity_score": 8.0, "reliability_score": 9.0, "is_clickbait": False,
+        }
+        assert _apply_keep_rules(dict(institutional)) is False
+        assert _apply_keep_rules(institutional, "institutional") is True
+
+
+class TestMimoTrust:
+    """Tests for adaptive per-domain MiMo trust."""
+
+    GRAY = {
+        "authenticity_score": 8, "reliability_score": 8, "relevance_score": 6, "currency_score": 6,
+        "total_score": 6, "is_clickbait": False, "confidence": "HIGH",
+    }
+
+    def test_streak_stops_escalation_until_disagreement(self, monkeypatch):
+        """Agreeing N times stops escalating gray-zone HIGH cases; a disagreement resets it."""
+        monkeypatch.setattr(evaluator, "_mimo_trust", {})
+        monkeypatch.setattr(evaluator, "EVAL_MIMO_TRUST_STREAK", 2)
+        monkeypatch.setattr(evaluator, "USE_CHEAP_OPENROUTER_MODELS", False)
+        mimo_keep = evaluator._mimo_implied_keep(self.GRAY)
+
+        assert evaluator._review_mimo_evaluation(dict(self.GRAY), "a.example")[1] is True
+        evaluator._record_mimo_agreement("a.example", mimo_keep, mimo_keep)
+        evaluator._record_mimo_agreement("a.example", mimo_keep, mimo_keep)
+        assert evaluator._review_mimo_evaluation(dict(self.GRAY), "a.example")[1] is False
+        assert evaluator._review_mimo_evaluation(dict(self.GRAY, confidence="PARTIAL"), "a.example")[1] is True
+
+        evaluator._record_mimo_agreement("a.example", mimo_keep, not mimo_keep)
+        assert evaluator._review_mimo_evaluation(dict(self.GRAY), "a.example")[1] is True
+
+
+class TestParseMimoBatch:
+    """Tests for parsing batched MiMo pre-evaluations."""
+
+    def test_maps_by_index(self):
+        """Entries are keyed by their index, out-of-range ones dropped."""
+        content = '```json\n[{"index": 1, "total_score": 7}, {"index": 0, "total_score": 4}, {"index": 9}]\n```'
+        parsed = _parse_mimo_batch(content, 2)
+        assert parsed == {0: {"total_score": 4}, 1: {"total_score": 7}}
+
+    def test_wrapped_list(self):
+        """A JSON object wrapping the array is tolerated."""
+        parsed = _parse_mimo_batch('{"evaluations": [{"index": 0, "keep": true}]}', 1)
+        assert parsed == {0: {"keep": True}}
+
+    def test_invalid_json(self):
+        """Malformed responses yield no entries (individual fallback)."""
+        assert _parse_mimo_batch("not json", 3) == {}
+
+
+class TestEvaluateMimoBatch:
+    """Tests for the single-request MiMo batch pre-evaluation."""
+
+    def test_one_request_with_fallback_for_missing(self, monkeypatch):
+        """One structured MiMo call per batch; sources missing from it are evaluated individually."""
+        calls = []
+
+        async def fake_invoke_mimo(messages, schema=None):
+            calls.append(schema)
+            return '{"evaluations": [{"index": 1, "total_score": 8}]}'
+
+        async def fake_finalize(source, context, mimo_evaluation, needs_detailed_review, prompt_fields=None):
+            return {"url": source["url"], "via": "batch", "total_score": mimo_evaluation.get("total_score")}
+
+        async def fake_single(source, context):
+            return {"url": source["url"], "via": "single"}
+
+        monkeypatch.setattr(evaluator, "_invoke_mimo", fake_invoke_mimo)
+        monkeypatch.setattr(evaluator, "_review_mimo_evaluation", lambda evaluation, domain: (evaluation, False))
+        monkeypatch.setattr(evaluator, "_finalize_evaluation", fake_finalize)
+        monkeypatch.setattr(evaluator, "_evaluate_with_llm", fake_single)
+
+        sources = [{"url": "https://a.example"}, {"url": "https://b.example"}]
+        results = asyncio.run(evaluator._evaluate_mimo_batch(sources, "topic"))
+        assert calls == [evaluator._MIMO_BATCH_EVAL_SCHEMA]
+        assert results == [
+            {"url": "https://a.example", "via": "single"},
+            {"url": "https://b.example", "via": "batch", "total_score": 8},
+        ]
+
+
+class TestBatchDedup:
+    """Tests for canonical-URL deduplication in evaluate_sources_batch."""
+
+    def test_duplicates_share_one_evaluation(self, monkeypatch):
+        """Duplicate URLs are evaluated once and the result is copied to each."""
+        evaluated = []
+
+        async def fake_batch(batch, context):
+            evaluated.extend(s["url"] for s in batch)
+            return [{**s, "keep": True, "total_score": 8.0} for s in batch]
+
+        async def no_flush():
+            return None
+
+        monkeypatch.setattr(evaluator, "_evaluate_without_llm", lambda source, context, url_cache=None: None)
+        monkeypatch.setattr(evaluator, "get_cached_evaluations", lambda urls, context="": {})
+        monkeypatch.setattr(evaluator, "_evaluate_mimo_batch", fake_batch)
+        monkeypatch.setattr(evaluator, "flush_pending_cache_writes", no_flush)
+
+        sources = [
+            {"url": "https://example.com/a", "title": "first"},
+            {"url": "http://www.example.com/a/?utm_source=x", "title": "second"},
+            {"url": "https://example.com/b", "title": "third"},
+        ]
+        validated, rejected = asyncio.run(evaluator.evaluate_sources_batch(sources, "topic"))
+        assert evaluated == ["https://example.com/a", "https://example.com/b"]
+        assert rejected == []
+        assert [s["title"] for s in validated] == ["first", "second", "third"]
+        assert validated[1]["url"] == "http://www.example.com/a/?utm_source=x"
+        assert all(s["total_score"] == 8.0 for s in validated)
+
+
+class TestStripMarkdownJson:
+    """Tests for removing markdown fences around LLM JSON."""
+
+    def test_fenced(self):
+        """```json and bare ``` fences are removed."""
+        assert _strip_markdown_json('```json\n{"a": 1}\n```') == '{"a": 1}'
+        assert _strip_markdown_json('Result:\n```\n[1, 2]\n``` done') == '[1, 2]'
+
+    def test_unterminated_fence(self):
+        """A truncated response without closing fence keeps the payload."""
+        assert _strip_markdown_json('```json\n{"a": 1}') == '{"a": 1}'
+
+    def test_plain(self):
+        """Plain JSON is returned untouched."""
+        assert _strip_markdown_json('{"a": 1}') == '{"a": 1}'
+
+
+class _FailingLLM:
+    """Fake LLM that always raises the given error."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        raise self.error
+
+
+class TestLLMRetry:
+    """Tests for transient error classification and retry policy."""
+
+    def test_transient_classification(self):
+        """Rate limits and gateway errors are transient, others are not."""
+        assert _is_transient_llm_error(Exception("Error code: 429 - rate limited"))
+        assert _is_transient_llm_error(Exception("502 Bad Gateway"))
+        assert not _is_transient_llm_error(ValueError("invalid api key"))
+
+    def test_non_transient_not_retried(self):
+        """Non-transient errors propagate after a single call."""
+        llm = _FailingLLM(ValueError("invalid api key"))
+        with pytest.raises(ValueError):
+            asyncio.run(_ainvoke_with_retry(llm, []))
+        assert llm.calls == 1
+
+    def test_transient_wrapped(self, monkeypatch):
+        """Transient errors are retried and surface as TransientLLMError when exhausted."""
+        monkeypatch.setattr(evaluator, "wait_random_exponential", lambda **kwargs: wait_none())
+        llm = _FailingLLM(Exception("429 rate limit"))
+        with pytest.raises(TransientLLMError):
+            asyncio.run(_ainvoke_with_retry(llm, []))
+        assert llm.calls == 3
+
+    def test_structured_fallback_only_on_response_format_rejection(self, monkeypatch):
+        """A 400 naming response_format falls back to prompt JSON; other errors propagate."""
+        llm, structured = object(), object()
+        errors = {}
+
+        async def fake_retry(client, messages):
+            if client is structured:
+                raise errors["structured"]
+            return "prompt-json"
+
+        monkeypatch.setattr(evaluator, "_with_structured_output", lambda client, schema: structured)
+        monkeypatch.setattr(evaluator, "_ainvoke_with_retry", fake_retry)
+        monkeypatch.setattr(evaluator, "_structured_output_unsupported", set())
+        schema = ("s", {})
+
+        errors["structured"] = ValueError("Error code: 401 - invalid api key")
+        with pytest.raises(ValueError):
+            asyncio.run(evaluator._ainvoke_llm_uncached(llm, [], schema))
+        assert id(llm) not in evaluator._structured_output_unsupported
+
+        errors["structured"] = ValueError("Error code: 400 - response_format json_schema is not supported")
+        assert asyncio.run(evaluator._ainvoke_llm_uncached(llm, [], schema)) == "prompt-json"
+        assert id(llm) in evaluator._structured_output_unsupported
+
+
+class TestTokenBucket:
+    """Tests for the tokens-per-minute limiter in front of LLM calls."""
+
+    def test_request_bucket_disabled_by_default(self, monkeypatch):
+        """requests_per_minute = 0 disables the RPM bucket; a positive value enables it."""
+        async def run():
+            return evaluator._get_request_bucket()
+
+        monkeypatch.setattr(evaluator, "EVAL_REQUESTS_PER_MINUTE", 0)
+        assert asyncio.run(run()) is None
+        monkeypatch.setattr(evaluator, "EVAL_REQUESTS_PER_MINUTE", 60)
+        assert asyncio.run(run()).capacity == 60
+
+    def test_estimate_includes_response(self):
+        """Estimate is ~chars/4 plus the reserved response tokens."""
+        messages = [{"role": "user", "content": "x" * 400}]
+        assert evaluator._estimate_request_tokens(messages) == 100 + evaluator._RESPONSE_TOKEN_ESTIMATE
+
+
+class TestLLMUsage:
+    """Tests for real token accounting of evaluator LLM calls."""
+
+    def test_usage_metadata_summed_with_estimate_fallback(self, monkeypatch):
+        """Provider usage is summed; responses without it add the request estimate."""
+        class FakeMessage:
+            def __init__(self, usage_metadata):
+                self.usage_metadata = usage_metadata
+
+        class FakeLLM:
+            def __init__(self, usage_metadata):
+                self.usage_metadata = usage_metadata
+
+            async def ainvoke(self, messages):
+                return FakeMessage(self.usage_metadata)
+
+        monkeypatch.setattr(evaluator, "EVAL_STREAM_LLM", False)
+        monkeypatch.setattr(evaluator, "EVAL_TOKENS_PER_MINUTE", 0)
+        monkeypatch.setattr(evaluator, "EVAL_REQUESTS_PER_MINUTE", 0)
+        messages = [{"role": "user", "content": "x" * 400}]
+
+        async def run():
+            with evaluator.track_llm_usage() as usage:
+                await asyncio.gather(
+                    evaluator._invoke_with_classification(FakeLLM({"total_tokens": 1234}), messages),
+                    evaluator._invoke_with_classification(FakeLLM(None), messages),
+                )
+            # Fuera del bloque no se acumula
+            await evaluator._invoke_with_classification(FakeLLM({"total_tokens": 99}), messages)
+            return usage
+
+        usage = asyncio.run(run())
+        assert usage.total_tokens == 1234 + evaluator._estimate_request_tokens(messages)
+        assert usage.estimated_calls == 1
+
+
+class TestEvaluateWithoutLLM:
+    """Tests for the deterministic steps before any LLM call."""
+
+    def test_auto_reject_skips_cache(self, monkeypatch):
+        """Auto-rejected domains are decided before (and without) any cache access."""
+        def no_cache(*args, **kwargs):
+            raise AssertionError("cache should not be consulted")
+
+        monkeypatch.setattr(evaluator, "get_cached_evaluation", no_cache)
+        monkeypatch.setattr(evaluator, "get_semantic_cached_evaluation", no_cache)
+        monkeypatch.setattr(evaluator, "_cache_write", no_cache)
+        source = {"url": "https://www.facebook.com/some/page", "source_domain": "facebook.com", "title": "x"}
+        result = evaluator._evaluate_without_llm(source, "topic")
+        assert result["keep"] is False
+        assert result["fast_track"] == "auto_reject"
+
+    def test_near_semantic_hit_reapplies_keep_rules(self, monkeypatch):
+        """Scaled near-match scores are re-checked against the category's hard rule."""
+        monkeypatch.setattr(evaluator, "get_cached_evaluation", lambda *a, **k: None)
+        cached = {
+            "authenticity_score": 9.0, "reliability_score": 9.0, "relevance_score": 8.3,
+            "currency_score": 9.0, "total_score": 8.3, "is_clickbait": False,
+            "keep": True, "reasoning": "ok", "semantic_similarity": 0.93,
+        }
+        monkeypatch.setattr(evaluator, "get_semantic_cached_evaluation", lambda *a, **k: dict(cached))
+        source = {"url": "https://www.elpais.com/economia/a", "source_domain": "elpais.com", "title": "x"}
+        result = evaluator._evaluate_without_llm(source, "topic")
+        assert result["from_cache"] is True
+        assert result["keep"] is False
+
+    def test_replay_miss_raises(self, monkeypatch):
+        """In REPLAY cache mode a source that would need the LLM raises instead."""
+        monkeypatch.setattr(evaluator, "CACHE_MODE", evaluator.CacheMode.REPLAY)
+        monkeypatch.setattr(evaluator, "_evaluate_without_llm", lambda source, context: None)
+        with pytest.raises(evaluator.CacheMissError):
+            asyncio.run(evaluator.evaluate_source({"url": "https://a.example/x"}, "topic"))
+
+
+class TestCheapPrefilter:
+    """Tests for the pre-LLM clickbait / empty-content filter."""
+
+    def test_clickbait_title(self):
+        """Clickbait markers are rejected."""
+        assert _cheap_prefilter_reason("You won't believe what packaging firms did", "x") == "clickbait"
+
+    def test_short_title_without_snippet(self):
+        """Nothing to evaluate: short title and no snippet."""
+        assert _cheap_prefilter_reason("Home", "") == "sin contenido evaluable"
+
+    def test_regular_source_passes(self):
+        """Short titles with a snippet, or normal titles, go to the LLM."""
+        assert _cheap_prefilter_reason("EU PPWR", "Regulation on packaging waste") is None
+        assert _cheap_prefilter_reason("Top 10 packaging trends for 2025 in Europe", "") is None
+
+
+class TestRefreshProfile:
+    """Tests for the cached TEST-profile flag."""
+
+    def test_refresh_follows_env(self, monkeypatch):
+        """refresh_profile re-reads ENV_PROFILE."""
+        monkeypatch.setattr(evaluator, "_IS_TEST_MODE", evaluator._IS_TEST_MODE)
+        monkeypatch.setenv("ENV_PROFILE", "TEST")
+        assert refresh_profile() is True
+        monkeypatch.setenv("ENV_PROFILE", "PRODUCTION")
+        assert refresh_profile() is False
+
+
+class _StreamingLLM:
+    """Fake LLM streaming the given chunks and recording how many were consumed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+
+class TestJsonStreaming:
+    """Tests for early termination of streamed JSON responses."""
+
+    def test_scanner_ignores_braces_in_strings(self):
+        """Braces inside string values do not close the object."""
+        scanner = JsonStreamScanner()
+        assert scanner.feed('```json\n{"reasoning": "a } b", ') is None
+        assert scanner.feed('"keep": true}\n```') == '{"reasoning": "a } b", "keep": true}'
+
+    def test_stream_stops_after_json(self):
+        """Generation is cut as soon as a valid JSON value has arrived."""
+        llm = _StreamingLLM(['{"keep": ', 'false}', ' trailing', ' text'])
+        assert asyncio.run(_astream_json(llm, [])) == '{"keep": false}'
+        assert llm.consumed == 2
+
+    def test_stream_without_json_returns_full_text(self):
+        """Non-JSON output is returned whole for the regular parser."""
+        llm = _StreamingLLM(["no ", "json [here]"])
+        assert asyncio.run(_astream_json(llm, [])) == "no json [here]"
+
+
+class _CountingLLM:
+    """Deterministic fake LLM that counts calls."""
+
+    temperature = 0.0
+    model_name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"response {self.calls}"
+
+
+class TestResponseDedup:
+    """Tests for the single-flight / LRU response cache."""
+
+    def test_concurrent_identical_calls_share_one_request(self, monkeypatch):
+        """Concurrent and repeated identical requests hit the model once."""
+        monkeypatch.setattr(evaluator, "EVAL_STREAM_LLM", False)
+        monkeypatch.setattr(evaluator, "_response_cache", OrderedDict())
+        llm = _CountingLLM()
+        messages = [{"role": "user", "content": "same"}]
+
+        async def run():
+            first = await asyncio.gather(_ainvoke_llm(llm, messages), _ainvoke_llm(llm, messages))
+            again = await _ainvoke_llm(llm, messages)
+            return first, again
+
+        (a, b), again = asyncio.run(run())
+        assert a == b == again == "response 1"
+        assert llm.calls == 1
+
+    def test_cancelled_leader_does_not_cancel_waiters(self, monkeypatch):
+        """If the leading call is cancelled, a waiter repeats the request instead of failing."""
+        monkeypatch.setattr(evaluator, "EVAL_STREAM_LLM", False)
+        monkeypatch.setattr(evaluator, "_response_cache", OrderedDict())
+        llm = _CountingLLM()
+        messages = [{"role": "user", "content": "leader"}]
+
+        async def run():
+            leader = asyncio.create_task(_ainvoke_llm(llm, messages))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(_ainvoke_llm(llm, messages))
+            await asyncio.sleep(0.001)
+            leader.cancel()
+            results = await asyncio.gather(leader, waiter, return_exceptions=True)
+            return results, dict(evaluator._inflight_requests)
+
+        (leader_result, waiter_result), inflight = asyncio.run(run())
+        assert isinstance(leader_result, asyncio.CancelledError)
+        assert waiter_result == "response 2"
+        assert inflight == {}
+
+    def test_key_uses_stable_client_attributes(self):
+        """Equivalent clients share a key; a different model does not."""
+        messages = [{"role": "user", "content": "x"}]
+        other_model = _CountingLLM()
+        other_model.model_name = "other"
+        key = evaluator._response_cache_key(_CountingLLM(), messages, None)
+        assert key == evaluator._response_cache_key(_CountingLLM(), messages, None)
+        assert key != evaluator._response_cache_key(other_model, messages, None)
+
+    def test_non_deterministic_not_cached(self, monkeypatch):
+        """Models with temperature > 0 are always called."""
+        monkeypatch.setattr(evaluator, "EVAL_STREAM_LLM", False)
+        llm = _CountingLLM()
+        llm.temperature = 0.7
+        messages = [{"role": "user", "content": "other"}]
+        asyncio.run(_ainvoke_llm(llm, messages))
+        asyncio.run(_ainvoke_llm(llm, messages))
+        assert llm.calls == 2
+
+
+class TestMimoJudgeMetrics:
+    """Tests for the thread-safe MiMo vs Judge counters."""
+
+    def test_concurrent_increments_are_not_lost(self):
+        """Increments from several threads all land in the exported dict."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        evaluator.reset_mimo_judge_metrics()
+
+        def bump(_):
+            for _ in range(1000):
+                evaluator._incr_mimo_judge_metric("mimo_accepted")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(bump, range(8)))
+
+        metrics = evaluator.get_mimo_judge_metrics()
+        assert metrics["mimo_accepted"] == 8000
+        assert metrics["judge_only_evaluations"] == 0
+        evaluator.reset_mimo_judge_metrics()
+        assert evaluator.get_mimo_judge_metrics()["mimo_accepted"] == 0
+
+
+class TestEvaluationStats:
+    """Tests for get_evaluation_stats."""
+
+    def test_counts_fast_tracks_in_one_pass(self):
+        """Cache hits and fast-track types are counted across both lists."""
+        validated = [
+            {"from_cache": True, "fast_track": "elite"},
+            {"fast_track": "elite"},
+            {},
+        ]
+        rejected = [
+            {"fast_track": "auto_reject"},
+            {"fast_track": "internal_filter"},
+            {"fast_track": "cheap_prefilter"},
+            {"from_cache": True},
+        ]
+        stats = evaluator.get_evaluation_stats(validated, rejected)
+        assert stats["total"] == 7
+        assert stats["cache_hits"] == 2
+        assert stats["elite_fast_tracks"] == 2
+        assert stats["auto_rejects"] == 1
+        assert stats["internal_filters"] == 1
+        assert stats["cheap_prefilters"] == 1
+        assert stats["llm_calls_saved"] == 7
+        assert stats["llm_evaluated"] == 0
+
+
+class TestFinalizeEvaluation:
+    """Tests for the MiMo / Judge finalization split."""
+
+    def test_mimo_path_skips_judge(self, monkeypatch):
+        """Without detailed review the MiMo evaluation is final and counted."""
+        monkeypatch.setattr(evaluator, "_cache_write", lambda *a, **k: None)
+        monkeypatch.setattr(evaluator, "cache_semantic_evaluation", lambda *a, **k: None)
+
+        async def no_judge(*args, **kwargs):
+            raise AssertionError("Judge should not be called")
+
+        monkeypatch.setattr(evaluator, "_invoke_judge", no_judge)
+        evaluator.reset_mimo_judge_metrics()
+        mimo = {
+            "authenticity_score": 8, "reliability_score": 8, "relevance_score": 8,
+            "currency_score": 8, "total_score": 8, "reasoning": "ok", "confidence": "HIGH",
+        }
+        source = {"url": "https://example.com/a", "source_domain": "example.com"}
+        result = asyncio.run(evaluator._finalize_evaluation(source, "ctx", mimo, False))
+        assert result["pre_judge"] == "mimo"
+        assert result["keep"] is True
+        assert evaluator.get_mimo_judge_metrics()["mimo_accepted"] == 1
+        evaluator.reset_mimo_judge_metrics()
+
+    def test_judge_path_parses_response(self, monkeypatch):
+        """With detailed review the Judge response is parsed and tracked."""
+        monkeypatch.setattr(evaluator, "_cache_write", lambda *a, **k: None)
+        monkeypatch.setattr(evaluator, "cache_semantic_evaluation", lambda *a, **k: None)
+
+        async def judge(*args, **kwargs):
+            return (
+                '```json\n{"authenticity_score": 3, "reliability_score": 3, "relevance_score": 3,'
+                ' "currency_score": 3, "total_score": 3, "is_clickbait": false,'
+                ' "keep": true, "reasoning": "weak"}\n```'
+            )
+
+        monkeypatch.setattr(evaluator, "_invoke_judge", judge)
+        evaluator.reset_mimo_judge_metrics()
+        source = {"url": "https://example.com/b", "source_domain": "example.com"}
+        result = asyncio.run(evaluator._finalize_evaluation(source, "ctx", {}, True))
+        assert result["pre_judge"] == "gemini"
+        assert result["keep"] is False
+        assert evaluator.get_mimo_judge_metrics()["judge_only_evaluations"] == 1
+        evaluator.reset_mimo_judge_metrics()
+
+    def test_escalated_mimo_decision_is_tracked(self, monkeypatch):
+        """An escalated MiMo evaluation counts against the Judge via its implied keep."""
+        monkeypatch.setattr(evaluator, "_cache_write", lambda *a, **k: None)
+        monkeypatch.setattr(evaluator, "cache_semantic_evaluation", lambda *a, **k: None)
+        monkeypatch.setattr(evaluator, "_mimo_trust", {})
+
+        async def judge(*args, **kwargs):
+            return (
+                '{"authenticity_score": 9, "reliability_score": 9, "relevance_score": 9,'
+                ' "currency_score": 9, "total_score": 9, "is_clickbait": false, "reasoning": "strong"}'
+            )
+
+        monkeypatch.setattr(evaluator, "_invoke_judge", judge)
+        evaluator.reset_mimo_judge_metrics()
+        mimo = {
+            "authenticity_score": 9, "reliability_score": 9, "relevance_score": 9,
+            "currency_score": 9, "total_score": 9, "is_clickbait": False, "confidence": "PARTIAL",
+        }
+        source = {"url": "https://example.com/d", "source_domain": "example.com"}
+        result = asyncio.run(evaluator._finalize_evaluation(source, "ctx", mimo, True))
+        metrics = evaluator.get_mimo_judge_metrics()
+        assert result["keep"] is True
+        assert "keep" not in mimo
+        assert metrics["mimo_accepted_then_judge_accepted"] == 1
+        assert metrics["judge_only_evaluations"] == 0
+        assert evaluator._mimo_trust["example.com"] == 1
+        evaluator.reset_mimo_judge_metrics()
+
+    @pytest.mark.parametrize("payload", [
+        '{"authenticity_score": 8}',
+        '{"authenticity_score": "8", "reliability_score": 8, "relevance_score": 8,'
+        ' "currency_score": 8, "total_score": 8, "is_clickbait": false}',
+        '{"authenticity_score": 11, "reliability_score": 8, "relevance_score": 8,'
+        ' "currency_score": 8, "total_score": 8, "is_clickbait": false}',
+        'not json',
+    ])
+    def test_judge_response_rejected_when_invalid(self, payload):
+        """Missing fields, non-numeric or out-of-range scores and bad JSON yield None."""
+        source = {"url": "https://example.com/c", "source_domain": "example.com"}
+        assert evaluator._finalize_from_judge(payload, source, "ctx", {}) is None
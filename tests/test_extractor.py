@@ -0,0 +1,362 @@
+"""
+Unit tests for the evidence extractor.
+Tests can run offline (no LLM calls).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from deep_research import extractor
+
+
+class _BatchLLM:
+    """Fake LLM that records abatch calls."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def abatch(self, inputs, return_exceptions=False):
+        self.batches.append(len(inputs))
+        return [
+            ValueError("bad") if messages[-1]["content"] == "fail" else f"ok:{messages[-1]['content']}"
+            for messages in inputs
+        ]
+
+
+class TestBatchedExtractor:
+    """Tests for the dynamic extraction batcher."""
+
+    def test_concurrent_submits_share_one_call(self):
+        """Concurrent submissions are grouped up to max_batch_size per abatch call."""
+        llm = _BatchLLM()
+
+        async def run():
+            batcher = extractor._BatchedExtractor(llm, max_batch_size=3, wait_s=0.05)
+            return await asyncio.gather(*(
+                batcher.submit([{"role": "user", "content": str(i)}]) for i in range(5)
+            ))
+
+        results = asyncio.run(run())
+        assert results == [f"ok:{i}" for i in range(5)]
+        assert llm.batches == [3, 2]
+
+    def test_item_error_only_fails_its_caller(self):
+        """An exception for one element is raised only to that submitter."""
+        llm = _BatchLLM()
+
+        async def run():
+            batcher = extractor._BatchedExtractor(llm, max_batch_size=8, wait_s=0.05)
+            return await asyncio.gather(
+                batcher.submit([{"role": "user", "content": "a"}]),
+                batcher.submit([{"role": "user", "content": "fail"}]),
+                return_exceptions=True,
+            )
+
+        ok, failed = asyncio.run(run())
+        assert ok == "ok:a"
+        assert isinstance(failed, ValueError)
+        assert llm.batches == [2]
+
+
+class _StreamingExtractorLLM:
+    """Fake LLM that streams a JSON object followed by padding."""
+
+    def __init__(self):
+        self.chunks_sent = 0
+
+    async def astream(self, messages):
+        for chunk in ['{"evidence_points": ', '[]}', " trailing", " explanation"]:
+            self.chunks_sent += 1
+            yield chunk
+
+
+class TestBatchedExtractorStreaming:
+    """Tests for early-stop streaming in the extractor batcher."""
+
+    def test_stream_stops_at_complete_json(self, monkeypatch):
+        """Streaming models stop being consumed once the JSON object closes."""
+        monkeypatch.setattr(extractor, "EXTRACTOR_STREAM_LLM", True)
+        llm = _StreamingExtractorLLM()
+
+        async def run():
+            batcher = extractor._BatchedExtractor(llm, max_batch_size=8, wait_s=0.01)
+            return await batcher.submit([{"role": "user", "content": "x"}])
+
+        assert asyncio.run(run()) == '{"evidence_points": []}'
+        assert llm.chunks_sent == 2
+
+
+class _RejectingLLM:
+    """Fake structured LLM whose provider rejects response_format."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def abatch(self, inputs, return_exceptions=False):
+        self.calls += 1
+        return [ValueError("response_format not supported")] * len(inputs)
+
+
+class TestBatchedExtractorStructuredOutput:
+    """Tests for json_schema response_format in the extractor batcher."""
+
+    def test_schema_is_strict(self):
+        """Evidence schema closes every object, as strict mode requires."""
+        item = extractor._EVIDENCE_SCHEMA["properties"]["evidence_points"]["items"]
+        assert extractor._EVIDENCE_SCHEMA["additionalProperties"] is False
+        assert item["additionalProperties"] is False
+        assert set(item["required"]) == set(item["properties"])
+
+    def test_non_openai_llm_is_not_bound(self):
+        """Only OpenAI-compatible clients get response_format."""
+        assert extractor._with_evidence_schema(_BatchLLM()) is None
+
+    def test_openai_llm_is_prebound(self):
+        """OpenAI-compatible models get temperature/max_tokens (and the schema) bound once."""
+        from langchain_openai import ChatOpenAI
+
+        batcher = extractor._BatchedExtractor(ChatOpenAI(model="m", api_key="dummy"), max_batch_size=8, wait_s=0.01)
+        assert batcher._llm.kwargs == extractor._EXTRACTOR_CALL_KWARGS
+        if extractor.EXTRACTOR_STRUCTURED_OUTPUT:
+            assert batcher._structured_llm.kwargs["max_tokens"] == extractor.EXTRACTOR_MAX_TOKENS
+            assert "response_format" in batcher._structured_llm.kwargs
+
+    def test_falls_back_to_prompt_json(self):
+        """If the whole structured batch fails, it is retried once without the schema."""
+        llm = _BatchLLM()
+        structured = _RejectingLLM()
+
+        async def run():
+            batcher = extractor._BatchedExtractor(llm, max_batch_size=8, wait_s=0.01)
+            batcher._structured_llm = structured
+            first = await batcher.submit([{"role": "user", "content": "a"}])
+            second = await batcher.submit([{"role": "user", "content": "b"}])
+            return first, second, batcher._structured_llm
+
+        first, second, remaining = asyncio.run(run())
+        assert (first, second) == ("ok:a", "ok:b")
+        assert remaining is None
+        assert structured.calls == 1
+        assert llm.batches == [1, 1]
+
+    def test_rate_limit_keeps_structured_output(self):
+        """A 429 from the structured client is returned for retry, not treated as a rejection."""
+        llm = _BatchLLM()
+
+        class _RateLimitedLLM:
+            async def abatch(self, inputs, return_exceptions=False):
+                return [RuntimeError("Error code: 429 - rate limit exceeded")] * len(inputs)
+
+        structured = _RateLimitedLLM()
+
+        async def run():
+            batcher = extractor._BatchedExtractor(llm, max_batch_size=8, wait_s=0.01)
+            batcher._structured_llm = structured
+            with pytest.raises(RuntimeError, match="429"):
+                await batcher.submit([{"role": "user", "content": "a"}])
+            return batcher._structured_llm
+
+        assert asyncio.run(run()) is structured
+        assert llm.batches == []
+
+
+class TestCreditLimiter:
+    """Tests for the extractor RPM / concurrency limiter."""
+
+    def test_waits_for_credits(self):
+        """Without credits left, acquire waits for the refill instead of a fixed sleep."""
+        async def run():
+            limiter = extractor._CreditLimiter(requests_per_minute=600, max_concurrent=2)
+            limiter.bucket.tokens = 0.0
+            limiter.bucket.updated = time.monotonic()
+            start = time.monotonic()
+            async with limiter.acquire(1):
+                pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.08
+
+    def test_zero_rpm_only_limits_concurrency(self):
+        """RPM 0 disables the credit bucket; the concurrency cap still applies."""
+        async def run():
+            limiter = extractor._CreditLimiter(requests_per_minute=0, max_concurrent=1)
+            async with limiter.acquire(5):
+                return limiter.bucket is None and limiter.semaphore.locked()
+
+        assert asyncio.run(run()) is True
+
+
+class _FakeBatcher:
+    """Batcher stub that returns a fixed LLM response."""
+
+    def __init__(self, content):
+        self.content = content
+
+    async def submit(self, messages):
+        class _Response:
+            content = self.content
+        return _Response()
+
+
+class TestExtractEvidencePackage:
+    """Tests for source selection and reassembly in extract_evidence_package."""
+
+    def test_only_on_topic_sources_reach_llm(self, monkeypatch):
+        """Short and off-topic sources are kept unchanged without an LLM call."""
+        calls = []
+
+        async def fake_process(topic, url, title, content):
+            calls.append(url)
+            return {"evidence_points": [{"fact": "f"}], "extracted": True}
+
+        monkeypatch.setattr(extractor, "_process_single_source", fake_process)
+        sources = [
+            {"url": "short", "snippet": "mercado baterías"},
+            {"url": "off", "snippet": "Recetas de cocina mediterránea con aceite de oliva y tomate fresco."},
+            {"url": "on", "title": "Litio", "raw_content": "El mercado de baterías de litio creció un 30% en 2025 según la AIE."},
+        ]
+
+        result = asyncio.run(extractor.extract_evidence_package("mercado baterías litio", sources))
+        assert calls == ["on"]
+        assert result[:2] == sources[:2]
+        assert result[2] == {**sources[2], "evidence_points": [{"fact": "f"}], "extracted": True}
+
+    def test_iter_yields_in_completion_order(self, monkeypatch):
+        """Fast sources are yielded before slow ones, tagged with their input index."""
+        async def fake_process(topic, url, title, content):
+            await asyncio.sleep(0.05 if url == "slow" else 0)
+            return {"evidence_points": [{"fact": url}], "extracted": True}
+
+        monkeypatch.setattr(extractor, "_process_single_source", fake_process)
+        sources = [
+            {"url": "slow", "snippet": "Informe del mercado de baterías de litio en Europa durante 2025."},
+            {"url": "fast", "snippet": "Precios del litio y capacidad de baterías instalada en China, Chile y Australia."},
+        ]
+
+        async def run():
+            return [(i, s["url"]) async for i, s in extractor.iter_evidence_package("mercado baterías litio", sources)]
+
+        assert asyncio.run(run()) == [(1, "fast"), (0, "slow")]
+
+
+class TestCompactContent:
+    """Tests for whitespace compaction before the content limit."""
+
+    def test_collapses_blank_lines_and_spaces(self):
+        """Runs of blank lines and inline spaces shrink without touching words."""
+        assert extractor._compact_content("a\n\n\n\nb    c\t\td") == "a\n\nb c d"
+
+    def test_limit_applies_after_compaction(self, monkeypatch):
+        """Padding no longer consumes the content budget."""
+        monkeypatch.setattr(extractor, "_CONTENT_LIMIT", 10)
+        assert extractor._compact_content("uno" + " " * 8 + "dos tres cuatro") == "uno dos tr"
+
+
+class TestNearDuplicates:
+    """Tests for SimHash near-duplicate grouping."""
+
+    ARTICLE = (
+        "El mercado europeo de baterías de litio creció un 30% en 2025 según la Agencia "
+        "Internacional de la Energía, impulsado por la demanda de vehículos eléctricos, "
+        "el almacenamiento estacionario y nuevas gigafactorías en Alemania, Suecia y Hungría. "
+    ) * 3
+
+    def test_mirror_collapses_into_one_group(self):
+        """A mirror with a small edit joins the original; unrelated content stays apart."""
+        contents = [
+            self.ARTICLE,
+            self.ARTICLE + " Publicado originalmente",
+            "Recetas de cocina mediterránea con aceite de oliva, tomate fresco y albahaca del huerto.",
+        ]
+        groups = extractor._near_duplicate_groups(contents, [0, 1, 2])
+        assert groups == {1: [0, 1], 2: [2]}
+
+    def test_duplicates_share_one_extraction(self, monkeypatch):
+        """Only the representative is extracted; every member receives its evidence."""
+        calls = []
+
+        async def fake_process(topic, url, title, content):
+            calls.append(url)
+            return {"evidence_points": [{"fact": "f"}], "extracted": True}
+
+        monkeypatch.setattr(extractor, "_process_single_source", fake_process)
+        sources = [{"url": "a", "snippet": self.ARTICLE}, {"url": "b", "snippet": self.ARTICLE}]
+
+        result = asyncio.run(extractor.extract_evidence_package("mercado baterías litio", sources))
+        assert calls == ["a"]
+        assert [s["extracted"] for s in result] == [True, True]
+
+
+class TestExtractorRunState:
+    """Tests for the per-run rate-limit kill switch."""
+
+    def test_rate_limit_does_not_leak_across_runs(self, monkeypatch):
+        """A run tripped by rate limiting skips its pending sources, not the next run's."""
+        calls = []
+
+        async def fake_process(topic, url, title, content):
+            calls.append(url)
+            extractor._current_run.get().rate_limited = True
+            return None
+
+        monkeypatch.setattr(extractor, "_process_single_source", fake_process)
+        sources = [
+            {"url": "0", "snippet": "Informe del mercado de baterías de litio en Europa durante 2025."},
+            {"url": "1", "snippet": "Precios del litio y capacidad de baterías instalada en China, Chile y Australia."},
+            {"url": "2", "snippet": "Reciclaje de baterías de litio: nuevas plantas y regulación europea del mercado."},
+        ]
+
+        async def run():
+            await extractor.extract_evidence_package("mercado baterías litio", sources)
+            await extractor.extract_evidence_package("mercado baterías litio", sources)
+
+        asyncio.run(run())
+        assert calls == ["0", "0"]
+        assert extractor._current_run.get() is None
+
+
+class TestProcessSingleSource:
+    """Tests for parsing extractor responses."""
+
+    SOURCE = ("https://example.com", "T", "x" * 60)
+
+    @pytest.fixture(autouse=True)
+    def empty_evidence_cache(self, monkeypatch):
+        """Each test starts from an empty in-memory evidence cache."""
+        monkeypatch.setattr(extractor, "_evidence_cache", {})
+        monkeypatch.setattr(extractor, "_evidence_cache_dirty", False)
+
+    def test_repairs_fenced_json_with_trailing_comma(self, monkeypatch):
+        """Fenced JSON with trailing commas is parsed into evidence points."""
+        content = '```json\n{"evidence_points": [{"fact": "f", "exact_quote": "q", "category": "fact"},],}\n```'
+        monkeypatch.setattr(extractor, "_get_extractor_batcher", lambda: _FakeBatcher(content))
+        result = asyncio.run(extractor._process_single_source("topic", *self.SOURCE))
+        assert result["extracted"] is True
+        assert result["evidence_points"] == [{"fact": "f", "exact_quote": "q", "category": "fact"}]
+
+    def test_unparseable_response_keeps_source(self, monkeypatch):
+        """A response without JSON yields None so the original source is kept."""
+        monkeypatch.setattr(extractor, "_get_extractor_batcher", lambda: _FakeBatcher("no json here"))
+        assert asyncio.run(extractor._process_single_source("topic", *self.SOURCE)) is None
+
+    def test_repeated_content_uses_cache(self, monkeypatch):
+        """The same topic + content is extracted once; the repeat is served from cache."""
+        calls = []
+
+        class _CountingBatcher(_FakeBatcher):
+            async def submit(self, messages):
+                calls.append(messages)
+                return await super().submit(messages)
+
+        content = '{"evidence_points": [{"fact": "f", "exact_quote": "q", "category": "data"}]}'
+        monkeypatch.setattr(extractor, "_get_extractor_batcher", lambda: _CountingBatcher(content))
+        first = asyncio.run(extractor._process_single_source("topic", *self.SOURCE))
+        second = asyncio.run(extractor._process_single_source("topic", *self.SOURCE))
+        other_topic = asyncio.run(extractor._process_single_source("other", *self.SOURCE))
+        assert len(calls) == 2
+        assert second["evidence_points"] == first["evidence_points"]
+        assert second["evidence_from_cache"] is True
+        assert "from_cache" not in second
+        assert "evidence_from_cache" not in other_topic
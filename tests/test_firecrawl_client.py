@@ -0,0 +1,161 @@
+"""
+Unit tests for the Firecrawl client.
+Tests can run offline (no HTTP calls).
+"""
+
+import asyncio
+import time
+
+from deep_research import firecrawl_client
+
+
+class TestSharedSession:
+    """Tests for the pooled aiohttp session."""
+
+    def test_session_reused_within_loop(self):
+        """Calls in one event loop share a session, closed when that loop ends."""
+        async def get_twice():
+            first = await firecrawl_client._get_session()
+            second = await firecrawl_client._get_session()
+            return first, second
+
+        async def get_and_close():
+            session = await firecrawl_client._get_session()
+            await firecrawl_client.close_firecrawl_session()
+            return session
+
+        first, second = asyncio.run(get_twice())
+        assert first is second
+        assert first.closed
+        other = asyncio.run(get_and_close())
+        assert other is not first
+        assert other.closed
+
+
+class _FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.payload
+
+
+class _FakeSession:
+    """Session stub: batch submit, one in-progress poll, then a completed poll."""
+
+    def __init__(self):
+        self.posts = []
+        self.polls = [
+            {"status": "scraping"},
+            {"status": "completed", "data": [
+                {"markdown": "# A", "metadata": {"sourceURL": "https://a.example/", "statusCode": 200}},
+                {"markdown": "", "metadata": {"sourceURL": "https://b.example", "statusCode": 404}},
+            ]},
+        ]
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.posts.append((url, json))
+        return _FakeResponse({"success": True, "id": "job-1"})
+
+    def get(self, url, headers=None, timeout=None):
+        return _FakeResponse(self.polls.pop(0))
+
+
+class TestBatchScrape:
+    """Tests for the /v1/batch/scrape client."""
+
+    def test_one_submit_and_results_per_url(self, monkeypatch):
+        """All URLs go in one job; pages map back to each URL, missing ones report no content."""
+        session = _FakeSession()
+
+        async def fake_get_session():
+            return session
+
+        monkeypatch.setattr(firecrawl_client, "_get_session", fake_get_session)
+        monkeypatch.setattr(firecrawl_client, "_BATCH_POLL_INITIAL_DELAY", 0.001)
+        urls = ["https://a.example", "https://b.example", "https://c.example"]
+        results = asyncio.run(firecrawl_client.fetch_firecrawl_markdown_batch(urls, "key", timeout_seconds=5))
+
+        assert len(session.posts) == 1
+        assert session.posts[0][1]["urls"] == urls
+        assert results["https://a.example"][0] == "# A"
+        assert results["https://a.example"][1]["status"] == "success"
+        assert results["https://b.example"] == (None, {
+            "url": "https://b.example", "status": "no_content", "status_code": 404,
+            "error": "Response missing markdown content",
+        })
+        assert results["https://c.example"][1]["status"] == "no_content"
+
+
+class TestAdmissionController:
+    """Tests for the adaptive Firecrawl concurrency limit."""
+
+    def test_overload_shrinks_limit_retries_and_recovers(self, monkeypatch):
+        """A 429 halves the limit and is retried; consecutive successes raise it back."""
+        responses = [(None, {"status": "rate_limited", "status_code": 429})] + [("# ok", {"status": "success"})] * 7
+        calls = []
+
+        async def fake_fetch(url, api_key, timeout_seconds):
+            calls.append(url)
+            return responses[len(calls) - 1]
+
+        monkeypatch.setattr(firecrawl_client, "fetch_firecrawl_markdown", fake_fetch)
+        monkeypatch.setattr(firecrawl_client, "_ADMISSION_BACKOFF_INITIAL", 0)
+        controller = firecrawl_client.AdmissionController(4)
+
+        async def run():
+            first = await controller.fetch("https://a.com", "key")
+            limit_after_retry = controller.limit
+            for _ in range(6):
+                await controller.fetch("https://b.com", "key")
+            return first, limit_after_retry
+
+        first, limit_after_retry = asyncio.run(run())
+        assert first == ("# ok", {"status": "success"})
+        assert calls[:2] == ["https://a.com", "https://a.com"]
+        assert limit_after_retry == 2
+        assert controller.limit == 4
+
+    def test_in_flight_never_exceeds_limit(self):
+        """Tasks wait on the condition until a slot frees up."""
+        controller = firecrawl_client.AdmissionController(2)
+        peak = []
+
+        async def worker():
+            async with controller:
+                peak.append(controller.in_flight)
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(6)))
+
+        asyncio.run(run())
+        assert max(peak) == 2
+        assert controller.in_flight == 0
+
+
+class TestRequestBucket:
+    """Tests for the client-side Firecrawl RPM limit."""
+
+    def test_acquire_waits_for_refill_when_empty(self, monkeypatch):
+        """With no tokens left, a request waits until one refills (600 RPM = one per 0.1 s)."""
+        monkeypatch.setattr(firecrawl_client, "FIRECRAWL_REQUESTS_PER_MINUTE", 600)
+
+        async def run():
+            bucket = firecrawl_client._request_bucket.get()
+            bucket.tokens = 0
+            bucket.updated = time.monotonic()
+            start = time.monotonic()
+            await firecrawl_client._acquire_request()
+            return time.monotonic() - start, bucket
+
+        elapsed, bucket = asyncio.run(run())
+        assert elapsed >= 0.09
+        assert bucket.capacity == 600
@@ -0,0 +1,375 @@
+"""
+Unit tests for graph nodes.
+Tests can run offline (search/LLM calls are replaced by fakes).
+"""
+
+import asyncio
+
+import pytest
+
+from deep_research import firecrawl_client, graph, plan_cache
+
+
+class TestSearcherNode:
+    """Tests for concurrent search tasks in searcher_node."""
+
+    @pytest.fixture(autouse=True)
+    def plain_search(self, monkeypatch):
+        """Smart search without ContextManager variants."""
+        monkeypatch.setattr(graph, "SMART_SEARCH_ENABLED", True)
+        monkeypatch.setattr(graph, "CONTEXT_QUERY_VARIANTS_ENABLED", False)
+
+    def test_tasks_run_concurrently_in_order(self, monkeypatch):
+        """Tasks overlap in time; results keep task order and their task_topic."""
+        in_flight = []
+        peak = []
+
+        async def fake_search(queries, **kwargs):
+            in_flight.append(queries[0])
+            peak.append(len(in_flight))
+            # La primera tarea es la más lenta: sin concurrencia terminaría primero igualmente
+            await asyncio.sleep(0.05 if queries[0] == "q1" else 0.01)
+            in_flight.remove(queries[0])
+            return [{"url": f"https://example.com/{queries[0]}"}]
+
+        monkeypatch.setattr(graph, "execute_search_smart", fake_search)
+        state = {
+            "topic": "topic",
+            "search_strategy": [
+                {"topic": "t1", "queries": ["q1"]},
+                {"topic": "t2", "queries": ["q2"]},
+                {"topic": "t3", "queries": []},
+            ],
+            "existing_sources_text": "",
+        }
+
+        result = asyncio.run(graph.searcher_node(state))
+        assert [s["task_topic"] for s in result["found_sources"]] == ["t1", "t2"]
+        assert max(peak) == 2
+
+    def test_cross_task_duplicates_are_dropped(self, monkeypatch):
+        """A URL returned by two tasks is kept once, under the first task."""
+        async def fake_search(queries, **kwargs):
+            return [{"url": "https://example.com/shared/"}, {"url": f"https://example.com/{queries[0]}"}]
+
+        monkeypatch.setattr(graph, "execute_search_smart", fake_search)
+        state = {
+            "topic": "topic",
+            "search_strategy": [{"topic": "t1", "queries": ["q1"]}, {"topic": "t2", "queries": ["q2"]}],
+            "existing_sources_text": "",
+        }
+
+        result = asyncio.run(graph.searcher_node(state))
+        assert [(s["url"], s["task_topic"]) for s in result["found_sources"]] == [
+            ("https://example.com/shared/", "t1"),
+            ("https://example.com/q1", "t1"),
+            ("https://example.com/q2", "t2"),
+        ]
+
+
+    def test_known_urls_from_text_are_cached(self, monkeypatch):
+        """Existing/rejected URLs are parsed once per text and filter later searches."""
+        parsed = []
+        real_extract = graph.extract_urls_from_sources
+
+        def counting_extract(text):
+            parsed.append(text)
+            return real_extract(text)
+
+        async def fake_search(queries, **kwargs):
+            return [{"url": "http://www.example.com/old"}, {"url": "https://example.com/new"}]
+
+        monkeypatch.setattr(graph, "extract_urls_from_sources", counting_extract)
+        monkeypatch.setattr(graph, "execute_search_smart", fake_search)
+        state = {
+            "topic": "topic",
+            "search_strategy": [{"topic": "t1", "queries": ["q1"]}],
+            "existing_sources_text": "- URL: https://example.com/old/\nRECHAZADA: https://example.com/bad",
+        }
+
+        first = asyncio.run(graph.searcher_node(state))
+        second = asyncio.run(graph.searcher_node(state))
+        assert [s["url"] for s in first["found_sources"]] == ["https://example.com/new"]
+        assert second["found_sources"] == first["found_sources"]
+        assert len(parsed) == 1
+
+
+class TestPlannerNodeCache:
+    """Tests for reusing planner strategies with identical inputs."""
+
+    @pytest.fixture(autouse=True)
+    def empty_plan_cache(self, monkeypatch, tmp_path):
+        """Each test starts from an empty plan cache file."""
+        monkeypatch.setattr(plan_cache, "PLAN_CACHE_FILE", tmp_path / "plan_cache.json")
+        monkeypatch.setattr(plan_cache, "_plan_cache", None)
+        monkeypatch.setattr(plan_cache, "CACHE_MODE", plan_cache.CacheMode.ENABLED)
+        monkeypatch.setattr(graph, "PLAN_CACHE_ENABLED", True)
+
+    def test_identical_inputs_reuse_plan(self, monkeypatch):
+        """The second run with the same inputs skips the planner LLM; new inputs do not."""
+        calls = []
+
+        async def fake_strategy(**kwargs):
+            calls.append(kwargs["topic"])
+            return [{"topic": kwargs["topic"], "queries": ["q"]}]
+
+        monkeypatch.setattr(graph, "generate_search_strategy", fake_strategy)
+        state = {"topic": "1.1 Mercado", "existing_sources_text": ""}
+
+        first = asyncio.run(graph.planner_node(state))
+        second = asyncio.run(graph.planner_node(state))
+        asyncio.run(graph.planner_node({**state, "failed_queries": ["q"]}))
+        assert second["search_strategy"] == first["search_strategy"]
+        assert calls == ["1.1 Mercado", "1.1 Mercado"]
+
+
+class TestPlannerNodeInputs:
+    """Tests for capping long planner inputs."""
+
+    def test_existing_sources_tail_and_brief_head(self, monkeypatch):
+        """Only the most recent whole lines of existing sources and the start of the brief are sent."""
+        received = {}
+
+        async def fake_strategy(**kwargs):
+            received.update(kwargs)
+            return [{"topic": kwargs["topic"], "queries": ["q"]}]
+
+        monkeypatch.setattr(graph, "generate_search_strategy", fake_strategy)
+        monkeypatch.setattr(graph, "PLAN_CACHE_ENABLED", False)
+        monkeypatch.setattr(graph, "PLANNER_EXISTING_SOURCES_MAX_CHARS", 25)
+        monkeypatch.setattr(graph, "PLANNER_BRIEF_MAX_CHARS", 10)
+        existing = "\n".join(f"https://example.com/{i}" for i in range(5))
+        state = {"topic": "1.1 Mercado", "existing_sources_text": existing, "brief": "b" * 50}
+
+        asyncio.run(graph.planner_node(state))
+        assert received["existing_sources"] == "https://example.com/4"
+        assert len(received["brief"]) == 10
+
+
+class TestEvaluatorNode:
+    """Tests for batched source evaluation in evaluator_node."""
+
+    def test_sources_grouped_by_task_topic(self, monkeypatch):
+        """One evaluate_sources_batch call per task_topic; results are merged."""
+        calls = []
+
+        async def fake_batch(sources, context):
+            calls.append((context, [s["url"] for s in sources]))
+            return [{**s, "keep": True} for s in sources[:1]], [{**s, "keep": None} for s in sources[1:]]
+
+        monkeypatch.setattr(graph, "evaluate_sources_batch", fake_batch)
+        monkeypatch.setattr(graph.logger, "display_evaluation_results", lambda validated, rejected: None)
+        state = {
+            "topic": "topic",
+            "found_sources": [
+                {"url": "https://a.com", "task_topic": "t1"},
+                {"url": "https://b.com", "task_topic": "t2"},
+                {"url": "https://c.com", "task_topic": "t1"},
+                {"url": "https://a.com/", "task_topic": "t1"},
+            ],
+        }
+
+        result = asyncio.run(graph.evaluator_node(state))
+        assert sorted(calls) == [("t1", ["https://a.com", "https://c.com"]), ("t2", ["https://b.com"])]
+        assert sorted(s["url"] for s in result["validated_sources"]) == ["https://a.com", "https://b.com"]
+        assert [s["keep"] for s in result["rejected_sources"]] == [False]
+
+    def test_overlap_prefetches_validated_sources(self, monkeypatch):
+        """With overlap enabled, each group's validated sources are prefetched before the node returns."""
+        prefetched = []
+
+        async def fake_batch(sources, context):
+            return [s for s in sources if s["url"].endswith("keep")], [s for s in sources if not s["url"].endswith("keep")]
+
+        async def fake_prefetch(topic, sources):
+            await asyncio.sleep(0.01)
+            prefetched.extend(s["url"] for s in sources)
+
+        monkeypatch.setattr(graph, "evaluate_sources_batch", fake_batch)
+        monkeypatch.setattr(graph, "prefetch_evidence_package", fake_prefetch)
+        monkeypatch.setattr(graph, "EXTRACTOR_OVERLAP_EVALUATION", True)
+        monkeypatch.setattr(graph.logger, "display_evaluation_results", lambda validated, rejected: None)
+        state = {
+            "topic": "topic",
+            "found_sources": [
+                {"url": "https://a.com/keep", "task_topic": "t1"},
+                {"url": "https://b.com/drop", "task_topic": "t1"},
+                {"url": "https://c.com/keep", "task_topic": "t2"},
+            ],
+        }
+
+        asyncio.run(graph.evaluator_node(state))
+        assert sorted(prefetched) == ["https://a.com/keep", "https://c.com/keep"]
+
+
+    def test_tiered_evaluation_skips_reserve_when_enough(self, monkeypatch):
+        """Best pre-ranked sources go first; the reserve is evaluated only below min_accepted_sources."""
+        evaluated = []
+        keep = {"value": True}
+
+        async def fake_batch(sources, context):
+            evaluated.extend(s["url"] for s in sources)
+            if keep["value"]:
+                return [{**s, "keep": True} for s in sources], []
+            return [], [{**s, "keep": False} for s in sources]
+
+        monkeypatch.setattr(graph, "evaluate_sources_batch", fake_batch)
+        monkeypatch.setattr(graph, "EVAL_TIERED_FACTOR", 1)
+        monkeypatch.setattr(graph, "get_dynamic_config", lambda report_type: {"max_accepted_sources": 2, "min_accepted_sources": 2})
+        monkeypatch.setattr(graph, "get_domain_tier", lambda url: 1 if "elite" in url else 4)
+        monkeypatch.setattr(graph.logger, "display_evaluation_results", lambda validated, rejected: None)
+        state = {
+            "topic": "topic",
+            "found_sources": [
+                {"url": "https://a.com", "snippet": "x"},
+                {"url": "https://elite.org/1", "snippet": "x"},
+                {"url": "https://b.com", "snippet": "x" * 100},
+                {"url": "https://elite.org/2", "snippet": "x"},
+            ],
+        }
+
+        result = asyncio.run(graph.evaluator_node(state))
+        assert sorted(evaluated) == ["https://elite.org/1", "https://elite.org/2"]
+        assert len(result["validated_sources"]) == 2
+
+        evaluated.clear()
+        keep["value"] = False
+        result = asyncio.run(graph.evaluator_node(state))
+        assert evaluated[:2] == ["https://elite.org/1", "https://elite.org/2"]
+        assert sorted(evaluated[2:]) == ["https://a.com", "https://b.com"]
+        assert len(result["rejected_sources"]) == 4
+
+
+class TestQualityGateNode:
+    """Tests for the accepted-sources cap in quality_gate_node."""
+
+    def test_cap_keeps_top_scores_in_stable_order(self, monkeypatch):
+        """The top max_accepted_sources by total_score are kept; ties and bad scores keep input order."""
+        monkeypatch.setattr(graph, "get_dynamic_config", lambda report_type: {"max_accepted_sources": 3})
+        validated = [
+            {"url": "a", "total_score": 5},
+            {"url": "b", "total_score": "n/a"},
+            {"url": "c", "total_score": 9},
+            {"url": "d", "total_score": "5"},
+            {"url": "e", "total_score": None},
+        ]
+
+        result = asyncio.run(graph.quality_gate_node({"topic": "topic", "validated_sources": validated}))
+        assert [s["url"] for s in result["validated_sources"]] == ["c", "a", "d"]
+
+
+class TestFirecrawlNode:
+    """Tests for concurrent Firecrawl enrichment in firecrawl_node."""
+
+    @pytest.fixture(autouse=True)
+    def firecrawl_enabled(self, monkeypatch):
+        """Firecrawl enabled with a fake key and no per-item cap."""
+        monkeypatch.setattr(graph, "FIRECRAWL_ENABLED", True)
+        monkeypatch.setattr(graph, "FIRECRAWL_API_KEY", "fake")
+        monkeypatch.setattr(graph, "FIRECRAWL_CONCURRENCY", 2)
+        monkeypatch.setattr(graph, "get_dynamic_config", lambda report_type: {"max_firecrawl_calls": 0})
+
+    def test_bounded_concurrency_and_failures_keep_sources(self, monkeypatch):
+        """At most FIRECRAWL_CONCURRENCY scrapes run at once; failed URLs keep all their instances."""
+        in_flight = []
+        peak = []
+
+        async def fake_fetch(url, api_key, timeout_seconds):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(url)
+            if url.endswith("boom"):
+                raise RuntimeError("boom")
+            return f"# {url}", {"status": "ok"}
+
+        monkeypatch.setattr(firecrawl_client, "fetch_firecrawl_markdown", fake_fetch)
+        state = {
+            "topic": "topic",
+            "validated_sources": [
+                {"url": "https://a.com"},
+                {"url": "https://b.com/boom"},
+                {"url": "https://c.com"},
+                {"url": "https://a.com/"},
+            ],
+        }
+
+        result = asyncio.run(graph.firecrawl_node(state))
+        by_method = sorted((s["url"], s["extraction_method"]) for s in result["validated_sources"])
+        assert by_method == [
+            ("https://a.com", "firecrawl"),
+            ("https://a.com/", "firecrawl"),
+            ("https://b.com/boom", "tavily/exa"),
+            ("https://c.com", "firecrawl"),
+        ]
+        assert max(peak) == 2
+
+    def test_results_keep_input_order_when_completed_out_of_order(self, monkeypatch):
+        """Results are merged as they complete, but the output keeps the input order."""
+        completed = []
+
+        async def fake_fetch(url, api_key, timeout_seconds):
+            await asyncio.sleep(0.05 if url.endswith("slow") else 0.0)
+            completed.append(url)
+            return f"# {url}", {"status": "ok"}
+
+        monkeypatch.setattr(firecrawl_client, "fetch_firecrawl_markdown", fake_fetch)
+        state = {
+            "topic": "topic",
+            "validated_sources": [{"url": "https://a.com/slow"}, {"url": "https://b.com"}, {"url": "https://c.com"}],
+        }
+
+        result = asyncio.run(graph.firecrawl_node(state))
+        assert completed[-1] == "https://a.com/slow"
+        assert [s["url"] for s in result["validated_sources"]] == ["https://a.com/slow", "https://b.com", "https://c.com"]
+
+    def test_duplicate_urls_are_scraped_once(self, monkeypatch):
+        """Instances sharing a canonical URL get one scrape and all receive its content."""
+        fetched = []
+
+        async def fake_fetch(url, api_key, timeout_seconds):
+            fetched.append(url)
+            return f"# {url}", {"status": "ok"}
+
+        monkeypatch.setattr(firecrawl_client, "fetch_firecrawl_markdown", fake_fetch)
+        state = {
+            "topic": "topic",
+            "validated_sources": [{"url": "https://a.com/x"}, {"url": "https://a.com/x/"}, {"url": "https://b.com"}],
+        }
+
+        result = asyncio.run(graph.firecrawl_node(state))
+        assert fetched == ["https://a.com/x", "https://b.com"]
+        assert [s["raw_content"] for s in result["validated_sources"]] == ["# https://a.com/x", "# https://a.com/x", "# https://b.com"]
+        assert all("_source_list" not in s for s in result["validated_sources"])
+
+    def test_cancelling_node_cancels_pending_scrapes(self, monkeypatch):
+        """Cancelling firecrawl_node mid-flight leaves no scrape task running."""
+        started = []
+        cancelled = []
+
+        async def fake_fetch(url, api_key, timeout_seconds):
+            started.append(url)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+            return f"# {url}", {"status": "ok"}
+
+        monkeypatch.setattr(firecrawl_client, "fetch_firecrawl_markdown", fake_fetch)
+        state = {
+            "topic": "topic",
+            "validated_sources": [{"url": "https://a.com"}, {"url": "https://b.com"}, {"url": "https://c.com"}],
+        }
+
+        async def run():
+            node = asyncio.create_task(graph.firecrawl_node(state))
+            await asyncio.sleep(0.01)
+            node.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await node
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        leftover = asyncio.run(run())
+        assert sorted(cancelled) == sorted(started) == ["https://a.com", "https://b.com"]
+        assert leftover == []
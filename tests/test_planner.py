@@ -0,0 +1,39 @@
+"""
+Unit tests for planner prompt construction.
+Tests can run offline (the planner LLM is replaced by a fake).
+"""
+
+import asyncio
+
+from deep_research import planner
+
+
+class FakePlannerLLM:
+    """Records the messages of each call and returns a minimal valid plan."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        return type("Response", (), {"content": '{"tasks": [{"topic": "t", "queries": ["q"]}]}', "response_metadata": {}})()
+
+
+class TestPromptPrefix:
+    """Tests for the static system prefix shared across items of a project."""
+
+    def test_system_message_identical_across_items(self, monkeypatch):
+        """Per-item fields go to the user message; the system message stays byte-identical."""
+        llm = FakePlannerLLM()
+        monkeypatch.setattr(planner, "llm_planner", llm)
+        project = dict(project_title="Proyecto", full_index=["1.1 Mercado", "1.2 Competencia"], agent_description="")
+
+        for topic, brief, failed in (("1.1 Mercado", "brief A", []), ("1.2 Competencia", "brief B", ["q fallida"])):
+            tasks = asyncio.run(planner.generate_search_strategy(topic=topic, brief=brief, failed_queries=failed, **project))
+            assert tasks == [{"topic": "t", "queries": ["q"]}]
+
+        (first_system, first_user), (second_system, second_user) = llm.calls
+        assert first_system == second_system
+        assert "1.2 Competencia" in second_user["content"] and "brief B" in second_user["content"]
+        assert "q fallida" in second_user["content"]
+        assert "brief A" not in first_system["content"]
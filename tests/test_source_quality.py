@@ -0,0 +1,245 @@
+"""
+Unit tests for source_quality caches.
+Tests can run offline (no LLM calls).
+"""
+
+import pytest
+
+from deep_research import source_quality
+from deep_research.source_quality import (
+    cache_evaluation,
+    get_cached_evaluation,
+    get_cached_evaluations,
+    flush_cache_evaluations,
+    queue_cache_evaluation,
+    cache_semantic_evaluation,
+    get_elite_domain_scores,
+    get_semantic_cached_evaluation,
+)
+
+
+EVALUATION = {
+    "authenticity_score": 8.0,
+    "reliability_score": 8.0,
+    "relevance_score": 9.0,
+    "currency_score": 7.0,
+    "total_score": 8.0,
+    "is_clickbait": False,
+    "keep": True,
+    "reasoning": "ok",
+    "url": "https://example.org/a",
+}
+
+CONTEXT = "European packaging market"
+TITLE = "EU packaging regulation reshapes plastic recycling targets for producers"
+SNIPPET = ("The new regulation sets binding recycling targets for plastic packaging "
+           "producers across member states from 2030 onwards with penalties")
+
+
+class TestSemanticCache:
+    """Tests for the content-keyed evaluation cache."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_semantic_cache(self, tmp_path, monkeypatch):
+        """Each test gets its own semantic cache file, write-behind queue and index."""
+        monkeypatch.setattr(source_quality, "SEMANTIC_CACHE_FILE", tmp_path / "sem.json")
+        monkeypatch.setattr(source_quality, "_pending_semantic_writes", {})
+        monkeypatch.setattr(source_quality, "_pending_cache_writes", {})
+        monkeypatch.setattr(source_quality, "_semantic_memo", {"key": None, "cache": {}, "index": {}})
+
+    def test_exact_hit(self):
+        """Same context/title/snippet reuses the evaluation unchanged."""
+        cache_semantic_evaluation(CONTEXT, TITLE, SNIPPET, EVALUATION)
+        cached = get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET)
+        assert cached["total_score"] == 8.0
+        assert cached["semantic_similarity"] == 1.0
+        assert "url" not in cached
+
+    def test_near_duplicate_decayed(self):
+        """A near-identical snippet hits with scores scaled by similarity."""
+        cache_semantic_evaluation(CONTEXT, TITLE, SNIPPET, EVALUATION)
+        cached = get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET + " applied")
+        assert cached is not None
+        assert 0.92 <= cached["semantic_similarity"] < 1.0
+        assert cached["total_score"] < 8.0
+        assert cached["keep"] is True
+
+    def test_other_context_or_content_misses(self):
+        """Different topic or different content never hits."""
+        cache_semantic_evaluation(CONTEXT, TITLE, SNIPPET, EVALUATION)
+        assert get_semantic_cached_evaluation("Quantum computing", TITLE, SNIPPET) is None
+        assert get_semantic_cached_evaluation(CONTEXT, "Football results", "League table") is None
+
+
+    def test_other_category_misses(self):
+        """Evaluations are only reused for sources of the same category."""
+        cache_semantic_evaluation(CONTEXT, TITLE, SNIPPET, EVALUATION, "institutional")
+        assert get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET, "general_media") is None
+        assert get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET + " applied", "general_media") is None
+        assert get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET, "institutional") is not None
+
+    def test_write_behind_then_flushed_without_reindex(self, monkeypatch):
+        """Entries are readable before the flush, persisted in one write, and the index is reused."""
+        cache_semantic_evaluation(CONTEXT, TITLE, SNIPPET, EVALUATION)
+        cache_semantic_evaluation(CONTEXT, "Other headline about packaging levies", SNIPPET, EVALUATION)
+        assert not source_quality.SEMANTIC_CACHE_FILE.exists()
+        assert get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET)["semantic_similarity"] == 1.0
+
+        assert flush_cache_evaluations() == 2
+        assert len(source_quality._load_semantic_cache()) == 2
+
+        def no_reindex(cache):
+            raise AssertionError("index rebuilt")
+
+        monkeypatch.setattr(source_quality, "_index_semantic_cache", no_reindex)
+        assert get_semantic_cached_evaluation(CONTEXT, TITLE, SNIPPET + " applied") is not None
+
+
+class TestEliteDomainScores:
+    """Tests for the host-suffix elite/auto-reject lookup."""
+
+    def test_subdomain_matches_elite(self):
+        """Subdomains resolve to their elite registrable domain."""
+        result = get_elite_domain_scores("https://www2.deloitte.com/us/en/insights.html")
+        assert result["domain"] == "deloitte.com"
+        assert result["auto_reject"] is False
+
+    def test_most_specific_suffix_wins(self):
+        """ec.europa.eu is matched before europa.eu."""
+        assert get_elite_domain_scores("https://ec.europa.eu/eurostat")["domain"] == "ec.europa.eu"
+
+    def test_substring_of_host_does_not_match(self):
+        """Hosts merely containing an elite domain are not elite (journey.com vs ey.com)."""
+        assert get_elite_domain_scores("https://www.journey.com/blog") is None
+
+    def test_auto_reject_path_prefix(self):
+        """Path-scoped rejects only apply to that path."""
+        assert get_elite_domain_scores("https://www.linkedin.com/posts/someone")["auto_reject"] is True
+        assert get_elite_domain_scores("https://www.linkedin.com/pulse/article") is None
+        assert get_elite_domain_scores("https://medium.com/@author/post")["domain"] == "medium.com/@"
+
+
+class TestRejectedMemo:
+    """Tests for the in-memory negative cache in front of the URL cache."""
+
+    def test_rejection_served_without_disk(self, tmp_path, monkeypatch):
+        """Rejected evaluations are answered from memory even if the file is gone."""
+        cache_file = tmp_path / "cache.json"
+        monkeypatch.setattr(source_quality, "CACHE_FILE", cache_file)
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        cache_evaluation("https://spam.example/a", {**EVALUATION, "keep": False})
+        cache_file.unlink()
+        assert get_cached_evaluation("https://spam.example/a")["keep"] is False
+
+    def test_accepted_not_memoized(self, tmp_path, monkeypatch):
+        """Accepted evaluations still come from the persistent cache."""
+        cache_file = tmp_path / "cache.json"
+        monkeypatch.setattr(source_quality, "CACHE_FILE", cache_file)
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        cache_evaluation("https://good.example/a", EVALUATION)
+        cache_file.unlink()
+        assert get_cached_evaluation("https://good.example/a") is None
+
+
+class TestBulkCachedEvaluations:
+    """Tests for the single-read batch URL cache lookup."""
+
+    def test_matches_single_lookups(self, tmp_path, monkeypatch):
+        """Bulk lookup returns the same evaluations as per-URL lookups, only for hits."""
+        monkeypatch.setattr(source_quality, "CACHE_FILE", tmp_path / "cache.json")
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        cache_evaluation("https://a.example/report", EVALUATION)
+        cache_evaluation("https://b.example/post", {**EVALUATION, "keep": False})
+        urls = ["https://a.example/report", "https://b.example/post", "https://c.example/none"]
+        found = get_cached_evaluations(urls)
+        assert set(found) == set(urls[:2])
+        for url in urls[:2]:
+            assert found[url] == get_cached_evaluation(url)
+
+
+class TestWriteBehindCache:
+    """Tests for queued URL cache writes."""
+
+    def test_queued_visible_then_flushed(self, tmp_path, monkeypatch):
+        """Queued evaluations are readable before the flush and persisted in one write."""
+        cache_file = tmp_path / "cache.json"
+        monkeypatch.setattr(source_quality, "CACHE_FILE", cache_file)
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        monkeypatch.setattr(source_quality, "_pending_cache_writes", {})
+        queue_cache_evaluation("https://a.example/1", EVALUATION)
+        queue_cache_evaluation("https://a.example/2", EVALUATION)
+        assert not cache_file.exists()
+        assert get_cached_evaluation("https://a.example/1")["total_score"] == 8.0
+        assert flush_cache_evaluations() == 2
+        assert flush_cache_evaluations() == 0
+        assert set(get_cached_evaluations(["https://a.example/1", "https://a.example/2"])) == {
+            "https://a.example/1", "https://a.example/2"
+        }
+        assert len(source_quality._load_cache()) == 2
+
+
+    def test_lookup_during_slow_flush_still_hits(self, tmp_path, monkeypatch):
+        """Entries being flushed stay visible until the file is written, then come from disk."""
+        import threading
+
+        cache_file = tmp_path / "cache.json"
+        monkeypatch.setattr(source_quality, "CACHE_FILE", cache_file)
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        monkeypatch.setattr(source_quality, "_pending_cache_writes", {})
+        writing, release = threading.Event(), threading.Event()
+        original_save = source_quality._save_cache
+
+        def slow_save(cache):
+            writing.set()
+            release.wait(5)
+            original_save(cache)
+
+        monkeypatch.setattr(source_quality, "_save_cache", slow_save)
+        queue_cache_evaluation("https://a.example/1", EVALUATION)
+        flusher = threading.Thread(target=flush_cache_evaluations)
+        flusher.start()
+        assert writing.wait(5)
+        assert get_cached_evaluation("https://a.example/1")["total_score"] == 8.0
+        assert set(get_cached_evaluations(["https://a.example/1"])) == {"https://a.example/1"}
+        release.set()
+        flusher.join(5)
+        assert source_quality._pending_cache_writes == {}
+        assert get_cached_evaluation("https://a.example/1")["total_score"] == 8.0
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestCacheKeyAndMode:
+    """Tests for topic-scoped cache keys and cache modes."""
+
+    def test_context_scoped(self, tmp_path, monkeypatch):
+        """An evaluation cached for one topic is not reused for another."""
+        monkeypatch.setattr(source_quality, "CACHE_FILE", tmp_path / "cache.json")
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        cache_evaluation("https://a.example/report", EVALUATION, CONTEXT)
+        assert get_cached_evaluation("https://a.example/report", CONTEXT)["total_score"] == 8.0
+        assert get_cached_evaluation("https://a.example/report", "Quantum computing") is None
+
+    def test_provenance_preserved(self, tmp_path, monkeypatch):
+        """pre_judge and MiMo confidence survive the cache round trip; content does not."""
+        monkeypatch.setattr(source_quality, "CACHE_FILE", tmp_path / "cache.json")
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        evaluation = {**EVALUATION, "pre_judge": "mimo", "confidence": "HIGH", "snippet": "long text"}
+        cache_evaluation("https://a.example/report", evaluation, CONTEXT)
+        cached = get_cached_evaluation("https://a.example/report", CONTEXT)
+        assert cached["pre_judge"] == "mimo"
+        assert cached["confidence"] == "HIGH"
+        assert "snippet" not in cached
+
+    def test_read_only_and_disabled(self, tmp_path, monkeypatch):
+        """READ_ONLY reads without writing; DISABLED neither reads nor writes."""
+        monkeypatch.setattr(source_quality, "CACHE_FILE", tmp_path / "cache.json")
+        monkeypatch.setattr(source_quality, "_rejected_evaluations", {})
+        cache_evaluation("https://a.example/report", EVALUATION, CONTEXT)
+
+        monkeypatch.setattr(source_quality, "CACHE_MODE", source_quality.CacheMode.READ_ONLY)
+        cache_evaluation("https://b.example/report", EVALUATION, CONTEXT)
+        assert get_cached_evaluation("https://a.example/report", CONTEXT) is not None
+        assert get_cached_evaluation("https://b.example/report", CONTEXT) is None
+
+        monkeypatch.setattr(source_quality, "CACHE_MODE", source_quality.CacheMode.DISABLED)
+        assert get_cached_evaluation("https://a.example/report", CONTEXT) is None
@@ -0,0 +1,91 @@
+"""
+Unit tests for utils JSON and URL helpers.
+Tests can run offline (no LLM calls).
+"""
+
+import asyncio
+
+from deep_research.utils import AsyncTokenBucket, LoopLocal, canonicalize_url, clean_and_parse_json, is_response_format_rejection
+
+
+class TestCleanAndParseJson:
+    """Tests for parsing LLM JSON output."""
+
+    def test_last_json_fence(self):
+        """The last ```json block wins, like the previous split-based extraction."""
+        text = 'Draft:\n```json\n{"v": 1}\n```\nFinal:\n```json\n{"v": 2}\n```'
+        assert clean_and_parse_json(text) == {"v": 2}
+
+    def test_unterminated_fence(self):
+        """A truncated response without closing fence is still parsed."""
+        assert clean_and_parse_json('```json\n[1, 2, 3]') == [1, 2, 3]
+
+    def test_largest_plain_fence(self):
+        """Without a json tag, the largest fenced block is used."""
+        assert clean_and_parse_json('```\n{}\n```\n```\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+
+    def test_raw_newline_and_trailing_comma(self):
+        """Raw newlines inside strings and trailing commas are tolerated."""
+        assert clean_and_parse_json('{"a": "x\ny"}') == {"a": "x\ny"}
+        assert clean_and_parse_json('Result: {"a": [1, 2,],}') == {"a": [1, 2]}
+
+
+class TestCanonicalizeUrl:
+    """Tests for cached URL canonicalization."""
+
+    def test_variants_share_canonical_form(self):
+        """Protocol, www, fragment, tracking params and trailing slash are normalized."""
+        assert canonicalize_url("http://www.Example.com/a/?utm_source=x&id=1#top") == "https://example.com/a/?id=1"
+        assert canonicalize_url("example.com/a/") == "https://example.com/a"
+        assert canonicalize_url("") == ""
+
+    def test_repeated_urls_hit_cache(self):
+        """A URL already canonicalized is served from the cache."""
+        canonicalize_url.cache_clear()
+        canonicalize_url("https://example.com/cached")
+        canonicalize_url("https://example.com/cached")
+        assert canonicalize_url.cache_info().hits == 1
+
+
+class TestIsResponseFormatRejection:
+    """Tests for detecting a provider rejecting structured output."""
+
+    def test_only_bad_request_about_response_format_counts(self):
+        """400s naming response_format count; rate limits, timeouts and other errors do not."""
+        class _StatusError(Exception):
+            def __init__(self, message, status_code):
+                super().__init__(message)
+                self.status_code = status_code
+
+        assert is_response_format_rejection(_StatusError("response_format json_schema is invalid", 400))
+        assert is_response_format_rejection(ValueError("response_format not supported"))
+        assert not is_response_format_rejection(_StatusError("rate limit (response_format request)", 429))
+        assert not is_response_format_rejection(RuntimeError("Error code: 429 - rate limit exceeded"))
+        assert not is_response_format_rejection(TimeoutError("timed out"))
+        assert not is_response_format_rejection(_StatusError("invalid api key", 401))
+
+
+class TestAsyncTokenBucket:
+    """Tests for the shared per-minute token bucket."""
+
+    def test_waits_for_refill(self):
+        """Once the budget is spent, the next call waits for the refill."""
+        async def run():
+            bucket = AsyncTokenBucket(6000)  # 100 tokens/s
+            start = asyncio.get_running_loop().time()
+            await bucket.acquire(6000)
+            await bucket.acquire(10)
+            return asyncio.get_running_loop().time() - start
+
+        assert asyncio.run(run()) >= 0.09
+
+    def test_loop_local_recreated_per_loop(self):
+        """LoopLocal returns one instance per running event loop."""
+        local = LoopLocal(object)
+
+        async def get_twice():
+            return local.get(), local.get()
+
+        first, second = asyncio.run(get_twice())
+        assert first is second
+        assert asyncio.run(get_twice())[0] is not first